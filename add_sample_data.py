@@ -1,16 +1,21 @@
 #!/usr/bin/env python
+"""
+Add four hand-written people with a few conversations, pings and relationships.
+
+For larger datasets use `python manage.py generate_dataset`.
+"""
 import os
 import sys
 import django
 from datetime import date, timedelta
 
-from orbit.models import Person, Conversation, ContactAttempt, Relationship
-
 # Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'orbit.settings')
-sys.path.append('/Users/jonathangiuffrida/.virtualenvs/orbitenv/orbit')
 django.setup()
 
+from orbit.models import Person, Conversation, ContactAttempt, Relationship  # noqa: E402
+
 
 # Check if data already exists
 if Person.objects.exists():
@@ -23,7 +28,9 @@ maya = Person.objects.create(
     name_ext="from coding bootcamp",
     email="maya.patel@email.com",
     phone="555-2847",
-    birthday=date(1993, 6, 12),
+    birthday_month=6,
+    birthday_day=12,
+    birth_year=1993,
     how_we_met="Met during a coding bootcamp in 2019",
     notes="Full-stack developer, loves rock climbing and board games"
 )
@@ -31,7 +38,9 @@ maya = Person.objects.create(
 finn = Person.objects.create(
     name="Finn O'Connor",
     email="finn.oconnor@email.com",
-    birthday=date(1988, 9, 4),
+    birthday_month=9,
+    birthday_day=4,
+    birth_year=1988,
     how_we_met="Neighbor across the street",
     notes="Freelance graphic designer, has a golden retriever named Buster"
 )
@@ -48,7 +57,9 @@ jasper = Person.objects.create(
     name="Jasper Kim",
     email="j.kim@company.com",
     phone="555-7521",
-    birthday=date(1991, 2, 28),
+    birthday_month=2,
+    birthday_day=28,
+    birth_year=1991,
     how_we_met="Started same day at current job",
     notes="Product manager, marathon runner, great at karaoke"
 )
@@ -93,7 +104,7 @@ ContactAttempt.objects.create(
     date=date.today() - timedelta(days=8),
     type="text",
     notes="Sent a text asking about her rock climbing plans",
-    led_to_conversation=conv1
+    led_to_conversation=True
 )
 
 ContactAttempt.objects.create(
@@ -101,7 +112,7 @@ ContactAttempt.objects.create(
     date=date.today() - timedelta(days=15),
     type="call",
     notes="Called to schedule coffee meetup",
-    led_to_conversation=conv2
+    led_to_conversation=True
 )
 
 ContactAttempt.objects.create(
@@ -135,6 +146,6 @@ Relationship.objects.create(
 
 print("Sample data added successfully!")
 print(f"Created {Person.objects.count()} people")
-print(f"Created {Conversation.objects.count()} conversations") 
+print(f"Created {Conversation.objects.count()} conversations")
 print(f"Created {ContactAttempt.objects.count()} contact attempts")
 print(f"Created {Relationship.objects.count()} relationships")
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Time every GET endpoint in orbit.api_urls at several dataset sizes and compare
+the results with a checked-in baseline.
+
+Creates a throwaway test database and, for each size, empties it, fills it
+with generate_dataset(), then requests each endpoint --repeat times as a logged-in
+user. The cache is cleared before every request, so dashboards are measured on
+a miss. Records p50 and p95 latency, the query count and the response size.
+Queries are counted on an untimed request with DASHBOARD_WORKERS=1, so the
+dashboard's sections are counted too.
+
+With --baseline (default benchmarks/endpoints_baseline.json) each result is
+compared with the baseline and the script exits with status 1 if any endpoint
+regressed: more queries, a response more than --bytes-tolerance larger, or a
+p95 more than --tolerance slower (and at least --min-slowdown ms). Latency
+depends on the machine, so regenerate the baseline with --write-baseline when
+running somewhere new.
+
+Usage: SECRET_KEY=x python benchmarks/endpoints.py [--sizes 100,1000] [--repeat 20] [--write-baseline]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'orbit.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from orbit import api_urls  # noqa: E402
+from orbit.datasets import generate_dataset  # noqa: E402
+from orbit.models import Person, Conversation, ContactAttempt, Relationship  # noqa: E402
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'endpoints_baseline.json')
+
+# Endpoints that only accept writes
+SKIPPED = {'login', 'logout', 'person-bulk', 'conversation-bulk', 'contactattempt-bulk'}
+
+# Query strings for endpoints that do nothing useful without one
+PARAMS = {
+    'search': {'q': 'ski trip'},
+    'location-suggestions': {'q': 'b'},
+    'company-suggestions': {'q': 'a'},
+    'conversation-location-suggestions': {'q': 'c'},
+}
+
+
+def endpoint_names():
+    names = {pattern.name for pattern in api_urls.router.urls} | {
+        pattern.name for pattern in api_urls.urlpatterns if getattr(pattern, 'name', None)
+    }
+    return sorted(names - SKIPPED)
+
+
+def endpoint_urls():
+    """URL for each endpoint; person endpoints use the best-connected person"""
+    people = Person.objects.annotate(activity=Count('conversations')).order_by('-activity', 'pk')
+    hub, quiet = people.first(), people.last()
+    details = {
+        'person-detail': hub,
+        'conversation-detail': Conversation.objects.order_by('-date', 'pk').first(),
+        'contactattempt-detail': ContactAttempt.objects.order_by('-date', 'pk').first(),
+        'relationship-detail': Relationship.objects.order_by('pk').first(),
+    }
+    kwargs = {
+        'export': {'kind': 'conversations', 'fmt': 'csv'},
+        'person-overview': {'pk': hub.pk},
+        'person-connections': {'pk': hub.pk},
+        'person-neighborhood': {'pk': hub.pk},
+        'person-path': {'pk': hub.pk, 'target': quiet.pk},
+        'person-activity': {'pk': hub.pk},
+        **{name: {'pk': instance.pk} for name, instance in details.items()},
+    }
+    return {name: reverse(name, kwargs=kwargs.get(name)) for name in endpoint_names()}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def fetch(client, url, params):
+    """(body, milliseconds) for GET `url`"""
+    start = time.perf_counter()
+    response = client.get(url, params)
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return body, elapsed
+
+
+def measure(client, url, params, repeat):
+    # The first request warms process-local indexes and is not counted
+    cache.clear()
+    fetch(client, url, params)
+    # Dashboard sections on pool threads use connections CaptureQueriesContext can't see, so count serially
+    cache.clear()
+    with override_settings(DASHBOARD_WORKERS=1), CaptureQueriesContext(connection) as queries:
+        fetch(client, url, params)
+    # Later requests reset the connection's query log
+    query_count = len(queries.captured_queries)
+    samples = []
+    for _ in range(repeat):
+        cache.clear()
+        body, elapsed = fetch(client, url, params)
+        samples.append(elapsed)
+    return {
+        'p50_ms': round(statistics.median(samples), 2),
+        'p95_ms': round(percentile(samples, 0.95), 2),
+        'queries': query_count,
+        'bytes': len(body),
+    }
+
+
+def run_size(size, options):
+    call_command('flush', interactive=False, verbosity=0)
+    user = User.objects.create_user(username='bench', is_staff=True)
+    generate_dataset(size, seed=options.seed, user=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return {
+        name: measure(client, url, PARAMS.get(name), options.repeat)
+        for name, url in endpoint_urls().items()
+    }
+
+
+def regressions(result, baseline, options):
+    """Descriptions of how `result` is worse than `baseline`"""
+    found = []
+    if result['queries'] > baseline['queries']:
+        found.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result['bytes'] > baseline['bytes'] * (1 + options.bytes_tolerance):
+        found.append(f"bytes {baseline['bytes']} -> {result['bytes']}")
+    slowdown = result['p95_ms'] - baseline['p95_ms']
+    if slowdown > options.min_slowdown and result['p95_ms'] > baseline['p95_ms'] * (1 + options.tolerance):
+        found.append(f"p95 {baseline['p95_ms']}ms -> {result['p95_ms']}ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000', help='Comma-separated numbers of people')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--write-baseline', action='store_true', help='Save these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed p95 slowdown, as a fraction')
+    parser.add_argument('--min-slowdown', type=float, default=2.0, help='p95 slowdowns below this (ms) are noise')
+    parser.add_argument('--bytes-tolerance', type=float, default=0.1, help='Allowed response growth, as a fraction')
+    options = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(options.baseline) and not options.write_baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)['sizes']
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    results, failures = {}, []
+    try:
+        for size in [int(size) for size in options.sizes.split(',')]:
+            print(f"\n{size:,} people")
+            print(f"{'endpoint':36}{'p50':>10}{'p95':>10}{'queries':>9}{'bytes':>10}")
+            results[str(size)] = run_size(size, options)
+            for name, result in results[str(size)].items():
+                previous = baseline.get(str(size), {}).get(name)
+                problems = regressions(result, previous, options) if previous else []
+                failures.extend(f"{name} at {size:,} people: {problem}" for problem in problems)
+                print(
+                    f"{name:36}{result['p50_ms']:8.2f}ms{result['p95_ms']:8.2f}ms"
+                    f"{result['queries']:9}{result['bytes']:10}"
+                    + ('  REGRESSED' if problems else '' if previous or not baseline else '  (new)')
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if options.write_baseline:
+        with open(options.baseline, 'w') as file:
+            json.dump({'repeat': options.repeat, 'seed': options.seed, 'sizes': results}, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f"\nBaseline written to {options.baseline}")
+    elif failures:
+        print('\nRegressions against the baseline:')
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Hammer a file-backed SQLite database with concurrent reads and writes, with
+and without the connection tuning in settings.SQLITE_PRAGMAS.
+
+"before" is a bare sqlite3 connection: rollback journal, deferred
+transactions and no pragmas, with writes made in autocommit as views did
+before WriteTransactionMiddleware. "after" uses the configured pragmas and
+sends each write through the middleware. Both report operations per second
+and how many operations failed with a locking error.
+
+Usage: SECRET_KEY=x python benchmarks/sqlite_concurrency.py [--threads 8] [--seconds 5] [--write-ratio 0.2]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'orbit.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from orbit.middleware import WriteTransactionMiddleware, is_locked_error  # noqa: E402
+from orbit.models import Person, Conversation, ContactAttempt  # noqa: E402
+
+
+CONFIGURATIONS = {
+    'before': {'pragmas': {'journal_mode': 'DELETE'}, 'options': {}, 'middleware': False},
+    'after': {'pragmas': {}, 'options': settings.DATABASES['default']['OPTIONS'], 'middleware': True},
+}
+
+
+def configure(name):
+    """Point new connections at the benchmark configuration"""
+    configuration = CONFIGURATIONS[name]
+    connections.close_all()
+    connections.settings['default']['OPTIONS'] = dict(configuration['options'])
+    with connection.cursor() as cursor:
+        # journal_mode persists in the database file, so set it both ways explicitly
+        for pragma, value in configuration['pragmas'].items():
+            cursor.execute(f'PRAGMA {pragma}={value}')
+    connections.close_all()
+    return configuration
+
+
+def seed(people):
+    user = User.objects.create_user(username='bench')
+    Person.objects.bulk_create([Person(name=f'Person {i}', created_by=user) for i in range(people)])
+    return user, list(Person.objects.values_list('id', flat=True))
+
+
+def write(user, person_ids):
+    """What a conversation POST does: the row, its participants, and the signal handlers' derived rows"""
+    conversation = Conversation.objects.create(
+        date=date.today() - timedelta(days=random.randrange(365)), type='phone', notes='Benchmark',
+        created_by=user,
+    )
+    conversation.participants.add(*random.sample(person_ids, 2))
+    ContactAttempt.objects.create(person_id=random.choice(person_ids), date=date.today(), type='text', created_by=user)
+    return HttpResponse(status=201)
+
+
+def read(user):
+    rows = Conversation.objects.visible_to(user).order_by('-date', 'id')
+    return rows.count(), list(rows[:50])
+
+
+def hammer(name, options, user, person_ids):
+    configuration = configure(name)
+    middleware = WriteTransactionMiddleware(lambda request: write(user, person_ids))
+    factory = RequestFactory()
+    deadline = time.monotonic() + options.seconds
+    totals = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def worker():
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        while time.monotonic() < deadline:
+            try:
+                if random.random() < options.write_ratio:
+                    if configuration['middleware']:
+                        middleware(factory.post('/api/conversations/'))
+                    else:
+                        write(user, person_ids)
+                    counts['writes'] += 1
+                else:
+                    read(user)
+                    counts['reads'] += 1
+            except OperationalError as error:
+                if not is_locked_error(error):
+                    raise
+                counts['locked'] += 1
+        connections.close_all()
+        with lock:
+            for key, value in counts.items():
+                totals[key] += value
+
+    threads = [threading.Thread(target=worker) for _ in range(options.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    completed = totals['reads'] + totals['writes']
+    print(
+        f"{name:8} {completed / options.seconds:10.0f} ops/s  "
+        f"{totals['reads']:8} reads {totals['writes']:8} writes {totals['locked']:6} locked"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        # A file database: in-memory test databases use shared-cache locking instead of WAL
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        connections.settings['default']['NAME'] = connection.settings_dict['NAME']
+        try:
+            user, person_ids = seed(200)
+            print(f"{options.threads} threads, {options.write_ratio:.0%} writes, {options.seconds:g}s each")
+            for name in CONFIGURATIONS:
+                hammer(name, options, user, person_ids)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
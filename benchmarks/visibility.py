@@ -0,0 +1,127 @@
+"""
+Benchmark visible_to() against the inline visibility filter it replaced and
+against evaluating public and private rows as two separate branches.
+
+Creates a throwaway test database, fills it with --rows conversations and
+pings (a quarter of them private, spread over five users), and times the
+queries the list endpoints run with each strategy. The branches strategy
+counts each branch separately and pages through a UNION ALL of the two.
+
+Usage: SECRET_KEY=x python benchmarks/visibility.py [--rows 100000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'orbit.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Q, Value  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from orbit.models import Person, Conversation, ContactAttempt  # noqa: E402
+
+
+def seed(rows):
+    random.seed(0)
+    users = [User.objects.create_user(username=f'user{i}') for i in range(5)]
+    people = Person.objects.bulk_create([Person(name=f'Person {i}') for i in range(rows // 50)])
+    today = date.today()
+
+    def row_fields():
+        return {
+            'date': today - timedelta(days=random.randrange(3650)),
+            'private': random.random() < 0.25,
+            'created_by': random.choice(users),
+        }
+
+    conversations = Conversation.objects.bulk_create(
+        [Conversation(type='phone', notes='', **row_fields()) for _ in range(rows)], batch_size=5000
+    )
+    Participation = Conversation.participants.through
+    Participation.objects.bulk_create([
+        Participation(conversation_id=conversation.id, person_id=random.choice(people).id)
+        for conversation in conversations
+    ], batch_size=5000)
+    ContactAttempt.objects.bulk_create(
+        [ContactAttempt(person=random.choice(people), type='text', **row_fields()) for _ in range(rows)],
+        batch_size=5000,
+    )
+    connection.cursor().execute('ANALYZE')
+    return users[0], people[0]
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        print(f"Seeding {options.rows:,} conversations and pings...")
+        user, person = seed(options.rows)
+
+        strategies = {
+            'inline filter': lambda model: [model.objects.filter(Q(private=False) | Q(private=True, created_by=user))],
+            'visible_to': lambda model: [model.objects.visible_to(user)],
+            'two branches': lambda model: [
+                model.objects.filter(private=Value(False)),
+                model.objects.filter(private=Value(True), created_by=user),
+            ],
+        }
+
+        def count(branches):
+            return sum(branch.count() for branch in branches)
+
+        def page(branches, ordering, size):
+            first, *rest = [branch.order_by() for branch in branches]
+            rows = first.union(*rest, all=True) if rest else first
+            return list(rows.order_by(*ordering)[:size])
+
+        year_ago = date.today() - timedelta(days=365)
+        cases = [
+            ('conversations count', Conversation, {}, None),
+            ('conversations page', Conversation, {}, 50),
+            ('pings count', ContactAttempt, {}, None),
+            ('pings page', ContactAttempt, {}, 50),
+            ('person conversations count', Conversation, {'participants': person}, None),
+            ('person pings page', ContactAttempt, {'person': person}, 10),
+            ('last year count', Conversation, {'date__gte': year_ago}, None),
+            ('last year page', Conversation, {'date__gte': year_ago}, 10),
+        ]
+        print(f"{'query':28}" + ''.join(f"{name:>16}" for name in strategies))
+        for label, model, filters, size in cases:
+            timings = []
+            for strategy in strategies.values():
+                def run():
+                    branches = [branch.filter(**filters) for branch in strategy(model)]
+                    return count(branches) if size is None else page(branches, ['-date', 'id'], size)
+                timings.append(timed(run, options.repeat))
+            print(f"{label:28}" + ''.join(f"{timing:14.2f}ms" for timing in timings))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
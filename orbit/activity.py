@@ -0,0 +1,366 @@
+"""
+Columnar store of who was in contact when, behind the person activity endpoint.
+
+Every conversation participation and every ping is one row in a set of
+parallel NumPy arrays: the day ordinal, the person's index, the kind of row
+(conversation or ping), the private flag, the creator's id and the
+conversation or ping id it came from. The rows are kept sorted by person and
+then day, so the rows of one person over a span of days are a slice found by
+binary search. Their weekly heatmap and rolling counts then come from one
+bincount of that slice into daily counts rather than from a query.
+
+Like the relationship graph, the store is built from one pass over the tables
+on first use and patched by signal handlers once a write commits. Patched
+rows go to a small unsorted buffer that queries scan alongside the sorted
+rows, and which is merged into them once it holds MERGE_AT rows. Every
+committed write also bumps a generation counter in the cache; a process that
+finds the counter moved past its own writes rebuilds, so with a shared
+CACHE_URL writes from other processes show up on their next request. Writes
+that bypass the signals are picked up by a rebuild after REBUILD_AFTER
+seconds, or at once by reset_activity_store().
+"""
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from .models import Conversation, ContactAttempt
+
+
+# Other processes' writes are caught by the generation, so this only bounds
+# how long a write that bypassed the signals goes unseen
+REBUILD_AFTER = 3600
+MERGE_AT = 1024
+
+GENERATION_KEY = 'orbit:activity:generation'
+
+CONVERSATION, PING = 0, 1
+KINDS = {CONVERSATION: 'conversations', PING: 'contact_attempts'}
+NO_CREATOR = -1
+
+DEFAULT_WEEKS = 52
+MAX_WEEKS = 520
+DEFAULT_WINDOW = 30
+MAX_WINDOW = 365
+
+COLUMNS = {
+    'person': np.int32,
+    'day': np.int32,
+    'kind': np.int8,
+    'private': np.bool_,
+    'creator': np.int64,
+    # The 128-bit conversation or ping id, split in two
+    'source_high': np.uint64,
+    'source_low': np.uint64,
+}
+
+LOW_BITS = (1 << 64) - 1
+
+# What person_rows() reads
+QUERY_COLUMNS = ['day', 'kind', 'private', 'creator']
+
+
+def _block(rows=()):
+    """Column arrays from rows of values in COLUMNS order"""
+    columns = list(zip(*rows)) or [()] * len(COLUMNS)
+    return {name: np.array(values, dtype=dtype) for (name, dtype), values in zip(COLUMNS.items(), columns)}
+
+
+def _select(block, index):
+    return {name: column[index] for name, column in block.items()}
+
+
+def _concatenate(*blocks):
+    return {name: np.concatenate([block[name] for block in blocks]) for name in COLUMNS}
+
+
+def _increment_generation():
+    """Bump the shared generation and return its new value"""
+    if cache.add(GENERATION_KEY, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # The key was evicted between add() and incr()
+        cache.set(GENERATION_KEY, 1, timeout=None)
+        return 1
+
+
+class ActivityStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._generation = None
+        self._people = {}            # person id -> index in the person column
+        self._person_ids = []        # index -> person id
+        self._rows = _block()        # sorted by (person, day)
+        self._live = np.ones(0, dtype=bool)   # False for sorted rows removed since the last merge
+        self._pending = _block()     # rows added since the last merge, unsorted
+
+    def reset(self):
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_current(self):
+        generation = cache.get(GENERATION_KEY, 0)
+        if (
+            self._built_at is not None and generation == self._generation
+            and time.monotonic() - self._built_at < REBUILD_AFTER
+        ):
+            return
+        # Read before the tables so a write committed during the build causes another
+        self._build(generation)
+
+    def _build(self, generation):
+        people = {}
+        rows = []
+        # Ids as text skip a UUID object per row; each distinct person is converted once below
+        participation = Conversation.participants.through.objects.annotate(
+            person_key=Cast('person_id', CharField()), source_key=Cast('conversation_id', CharField()),
+        ).values_list(
+            'person_key', 'conversation__date', 'conversation__private', 'conversation__created_by_id', 'source_key',
+        )
+        pings = ContactAttempt.objects.annotate(
+            person_key=Cast('person_id', CharField()), source_key=Cast('id', CharField()),
+        ).values_list('person_key', 'date', 'private', 'created_by_id', 'source_key')
+        for kind, queryset in ((CONVERSATION, participation), (PING, pings)):
+            for person_key, day, private, creator_id, source_key in queryset.order_by().iterator(chunk_size=10000):
+                person = people.setdefault(person_key, len(people))
+                rows.append(self._row(person, day, kind, private, creator_id, int(source_key.replace('-', ''), 16)))
+        block = _block(rows)
+        block = _select(block, np.lexsort((block['day'], block['person'])))
+        person_ids = [uuid.UUID(key) for key in people]
+        with self._lock:
+            self._people = {person_id: index for index, person_id in enumerate(person_ids)}
+            self._person_ids = person_ids
+            self._rows = block
+            self._live = np.ones(len(block['day']), dtype=bool)
+            self._pending = _block()
+            self._generation = generation
+            self._built_at = time.monotonic()
+
+    @staticmethod
+    def _row(person, day, kind, private, creator_id, source):
+        creator = NO_CREATOR if creator_id is None else creator_id
+        return (person, day.toordinal(), kind, private, creator, source >> 64, source & LOW_BITS)
+
+    def _patch(self, apply):
+        """Apply a committed write if the store is built, and record it in the shared generation"""
+        with self._lock:
+            if self._built_at is not None:
+                apply()
+                if len(self._pending['day']) >= MERGE_AT:
+                    self._merge()
+            generation = _increment_generation()
+            if self._generation is not None and generation == self._generation + 1:
+                self._generation = generation
+            else:
+                # Another process wrote since we last looked
+                self._built_at = None
+
+    def _merge(self):
+        block = _concatenate(_select(self._rows, self._live), self._pending)
+        self._rows = _select(block, np.lexsort((block['day'], block['person'])))
+        self._live = np.ones(len(self._rows['day']), dtype=bool)
+        self._pending = _block()
+
+    def _person_slice(self, person_id):
+        person = self._people.get(person_id)
+        if person is None:
+            return slice(0, 0)
+        # Keys of the column's own type, or NumPy converts the whole column to theirs
+        start, stop = np.searchsorted(self._rows['person'], np.array([person, person + 1], dtype=COLUMNS['person']))
+        return slice(int(start), int(stop))
+
+    def _matches(self, block, kind, source_ids=None, person_ids=None):
+        """Boolean mask of `block`'s rows of `kind` from any of `source_ids` and `person_ids` (None for all)"""
+        if source_ids is not None:
+            # The low halves alone almost always single the rows out; confirm on those few
+            wanted = {(pk.int >> 64, pk.int & LOW_BITS) for pk in source_ids}
+            lows = np.array([low for _, low in wanted], dtype=COLUMNS['source_low'])
+            # isin() sorts; a single id is cheaper to compare
+            found = block['source_low'] == lows[0] if len(lows) == 1 else np.isin(block['source_low'], lows)
+            index = np.flatnonzero(found)
+            pairs = zip(block['source_high'][index].tolist(), block['source_low'][index].tolist())
+            index = index[np.array([pair in wanted for pair in pairs], dtype=bool)]
+        else:
+            index = np.arange(len(block['day']))
+        index = index[block['kind'][index] == kind]
+        if person_ids is not None:
+            people = [self._people[pk] for pk in person_ids if pk in self._people]
+            index = index[np.isin(block['person'][index], people)]
+        mask = np.zeros(len(block['day']), dtype=bool)
+        mask[index] = True
+        return mask
+
+    def _remove(self, kind, source_ids=None, person_ids=None):
+        """Remove matching rows and return the person ids they belonged to"""
+        if person_ids is not None:
+            # Only those people's slices of the sorted rows need looking at
+            slices = [self._person_slice(pk) for pk in person_ids]
+        else:
+            slices = [slice(0, len(self._live))]
+        removed = []
+        for part in slices:
+            rows = _select(self._rows, part)
+            mask = self._matches(rows, kind, source_ids, person_ids) & self._live[part]
+            self._live[part] &= ~mask
+            removed.append(rows['person'][mask])
+        mask = self._matches(self._pending, kind, source_ids, person_ids)
+        removed.append(self._pending['person'][mask])
+        self._pending = _select(self._pending, ~mask)
+        return {self._person_ids[index] for index in np.unique(np.concatenate(removed)).tolist()}
+
+    def _index(self, person_id):
+        if person_id not in self._people:
+            self._people[person_id] = len(self._person_ids)
+            self._person_ids.append(person_id)
+        return self._people[person_id]
+
+    def _add(self, rows):
+        """Add rows of (person id, date, kind, private, creator id, source id)"""
+        if rows:
+            rows = [
+                self._row(self._index(person_id), day, kind, private, creator_id, source_id.int)
+                for person_id, day, kind, private, creator_id, source_id in rows
+            ]
+            self._pending = _concatenate(self._pending, _block(rows))
+
+    def put_pings(self, pings):
+        """Add pings given as (id, person id, date, private, creator id), replacing their previous rows"""
+        def apply():
+            self._remove(PING, [ping[0] for ping in pings])
+            self._add([
+                (person_id, day, PING, private, creator_id, ping_id)
+                for ping_id, person_id, day, private, creator_id in pings
+            ])
+        self._patch(apply)
+
+    def discard_ping(self, ping_id, person_id):
+        self._patch(lambda: self._remove(PING, [ping_id], [person_id]))
+
+    def put_conversations(self, conversations, participants=None):
+        """Rewrite the rows of conversations given as (id, date, private, creator id).
+
+        `participants` maps conversation ids to their person ids; without it
+        each conversation keeps the participants it had.
+        """
+        def apply():
+            if participants is None:
+                people = {
+                    conversation[0]: self._remove(CONVERSATION, [conversation[0]]) for conversation in conversations
+                }
+            else:
+                self._remove(CONVERSATION, [conversation[0] for conversation in conversations])
+                people = participants
+            self._add([
+                (person_id, day, CONVERSATION, private, creator_id, conversation_id)
+                for conversation_id, day, private, creator_id in conversations
+                for person_id in people.get(conversation_id, ())
+            ])
+        self._patch(apply)
+
+    def discard_conversation(self, conversation_id):
+        self._patch(lambda: self._remove(CONVERSATION, [conversation_id]))
+
+    def add_participants(self, conversation_id, day, private, creator_id, person_ids):
+        def apply():
+            self._remove(CONVERSATION, [conversation_id], person_ids)
+            self._add([
+                (person_id, day, CONVERSATION, private, creator_id, conversation_id) for person_id in person_ids
+            ])
+        self._patch(apply)
+
+    def remove_participants(self, person_ids, conversation_ids=None):
+        """Remove people from the given conversations, or from all of theirs"""
+        self._patch(lambda: self._remove(CONVERSATION, conversation_ids, person_ids))
+
+    def discard_person(self, person_id):
+        def apply():
+            for kind in KINDS:
+                self._remove(kind, person_ids=[person_id])
+        self._patch(apply)
+
+    def person_rows(self, person_id, user_id, since):
+        """(day ordinals in order, kinds) of `person_id`'s rows from the day ordinal `since` on.
+
+        Only rows visible to `user_id` are included; None sees public rows only.
+        """
+        self._ensure_current()
+        with self._lock:
+            part = self._person_slice(person_id)
+            # A person's sorted rows are in day order
+            part = slice(part.start + int(np.searchsorted(self._rows['day'][part], since)), part.stop)
+            live = self._live[part]
+            rows = {name: self._rows[name][part][live] for name in QUERY_COLUMNS}
+            pending = (self._pending['person'] == self._people.get(person_id, -1)) & (self._pending['day'] >= since)
+            if pending.any():
+                rows = {name: np.concatenate([rows[name], self._pending[name][pending]]) for name in QUERY_COLUMNS}
+                order = np.argsort(rows['day'], kind='stable')
+                rows = {name: column[order] for name, column in rows.items()}
+        visible = ~rows['private']
+        if user_id is not None:
+            visible |= rows['creator'] == user_id
+        return rows['day'][visible], rows['kind'][visible]
+
+
+def daily_counts(days, kinds, first_day, span):
+    """Counts per kind and day for the `span` days from the day ordinal `first_day`, shape (kinds, span)"""
+    offsets = days - first_day
+    within = (offsets >= 0) & (offsets < span)
+    cells = kinds[within].astype(np.int64) * span + offsets[within]
+    return np.bincount(cells, minlength=len(KINDS) * span).reshape(len(KINDS), span)
+
+
+def rolling_sums(counts, ends, window):
+    """Sums over the last axis of the `window` values up to and including each index in `ends`"""
+    totals = np.zeros(counts.shape[:-1] + (counts.shape[-1] + 1,), dtype=np.int64)
+    np.cumsum(counts, axis=-1, out=totals[..., 1:])
+    return totals[..., ends + 1] - totals[..., np.maximum(ends + 1 - window, 0)]
+
+
+def person_activity(person_id, user, today, weeks=DEFAULT_WEEKS, window=DEFAULT_WINDOW):
+    """Weekly heatmaps and rolling contact counts for one person, as seen by `user`.
+
+    The heatmaps count conversations and pings per weekday over the last
+    `weeks` weeks up to today, oldest week first and Monday first, and the
+    totals are their sums. The trends count them over the `window` days up to
+    the end of each of those weeks. Both come from one array of daily counts
+    over the span, so only the rows in it are read from the store.
+    """
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    first_week = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    start = first_week.toordinal()
+    # The first week's window reaches back before the week itself
+    first_day = min(start, start + 7 - window)
+    days, kinds = activity_store.person_rows(person_id, user_id, first_day)
+    daily = daily_counts(days, kinds, first_day, today.toordinal() + 1 - first_day)
+    # Pad the rest of the current week with zeros
+    daily = np.pad(daily, ((0, 0), (0, 6 - today.weekday())))
+    heatmap = daily[:, start - first_day:].reshape(len(KINDS), weeks, 7)
+    # The current week ends today
+    ends = np.minimum(start + 6 + 7 * np.arange(weeks), today.toordinal()) - first_day
+    trend = rolling_sums(daily, ends, window)
+    return {
+        'start': first_week,
+        'end': today,
+        'window_days': window,
+        'weeks': [first_week + timedelta(weeks=week) for week in range(weeks)],
+        'totals': {name: int(heatmap[kind].sum()) for kind, name in KINDS.items()},
+        'heatmap': {name: heatmap[kind].tolist() for kind, name in KINDS.items()},
+        'trend': {name: trend[kind].tolist() for kind, name in KINDS.items()},
+    }
+
+
+activity_store = ActivityStore()
+
+
+def reset_activity_store():
+    """Drop the store here and in every other process; used by tests and after bulk imports"""
+    activity_store.reset()
+    _increment_generation()
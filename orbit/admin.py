@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Person, Conversation, ContactAttempt, Relationship
 
 
@@ -25,8 +26,12 @@ class PersonAdmin(admin.ModelAdmin):
         })
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(conversation_count=Count('conversations'))
+
     def conversations_(self, obj):
-        return obj.conversations.count()
+        return obj.conversation_count
+    conversations_.admin_order_field = 'conversation_count'
 
 
 @admin.register(Conversation)
@@ -37,6 +42,9 @@ class ConversationAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at',)
     filter_horizontal = ('participants',)
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('participants')
+    
     def get_participants(self, obj):
         return ", ".join([p.name for p in obj.participants.all()])
     get_participants.short_description = 'Participants'
@@ -2,9 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     PersonViewSet, ConversationViewSet, ContactAttemptViewSet, RelationshipViewSet,
-    current_user, login_view, logout_view, csrf_token, dashboard_analytics,
+    current_user, login_view, logout_view, csrf_token, dashboard_analytics, dashboard_cache_status,
     location_suggestions, company_suggestions, conversation_location_suggestions,
-    birthday_timeline
+    birthday_timeline, full_text_search, export_data, reach_out
 )
 
 router = DefaultRouter()
@@ -16,7 +16,11 @@ router.register('relationships', RelationshipViewSet, basename='relationship')
 urlpatterns = [
     path('', include(router.urls)),
     path('dashboard/', dashboard_analytics, name='dashboard-analytics'),
+    path('dashboard/cache/', dashboard_cache_status, name='dashboard-cache-status'),
     path('birthdays/', birthday_timeline, name='birthday-timeline'),
+    path('search/', full_text_search, name='search'),
+    path('reach-out/', reach_out, name='reach-out'),
+    path('export/<str:kind>.<str:fmt>', export_data, name='export'),
     path('suggestions/locations/', location_suggestions, name='location-suggestions'),
     path('suggestions/companies/', company_suggestions, name='company-suggestions'),
     path('suggestions/conversation-locations/', conversation_location_suggestions, name='conversation-location-suggestions'),
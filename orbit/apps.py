@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class OrbitConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'orbit'
+
+    def ready(self):
+        # Register signal handlers that keep derived tables in sync
+        from . import signals  # noqa: F401
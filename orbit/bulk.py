@@ -0,0 +1,251 @@
+"""
+Bulk create and update for the API viewsets.
+
+POST <list>/bulk/ takes a list of objects to create, and PATCH <list>/bulk/ a
+list of partial updates that each carry an `id`. All items are validated before
+anything is written, with the people they reference loaded in one query. If
+any item is invalid nothing is saved and the response is a 400 listing each
+invalid item's index and errors. Otherwise every row, including conversation
+participants, is written with bulk_create/bulk_update in one transaction, and
+the saved objects are returned in request order.
+
+bulk_create and bulk_update bypass the handlers in orbit/signals.py, so
+update_derived_data() applies the same changes for the whole batch at once.
+"""
+from collections import Counter
+from functools import partial
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .activity import activity_store
+from .dashboard_cache import invalidate_dashboards, invalidate_dashboards_for_row
+from .models import Person, Conversation, ContactAttempt, Relationship, Tombstone
+from .person_stats import refresh_person_stats
+from .rollups import apply_rollup_delta, rollup_key
+from .search import ROW_BUILDERS as SEARCH_MODELS, index_instances
+from .suggestions import INDEXES as SUGGESTION_INDEXES
+
+
+MAX_ITEMS = 500
+
+Participation = Conversation.participants.through
+
+
+def primary_key(model, value):
+    """`value` as a primary key of `model`, or None if it can't be one"""
+    try:
+        return model._meta.pk.to_python(value)
+    except (DjangoValidationError, TypeError, ValueError):
+        return None
+
+
+def stored_values(instance):
+    return {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+
+
+class BulkChange:
+    """One saved row: its values before the write (None when created) and participants before and after"""
+
+    def __init__(self, instance, previous=None, previous_participants=(), participants=None):
+        self.instance = instance
+        self.previous = previous
+        self.previous_participants = set(previous_participants)
+        self.participants = self.previous_participants if participants is None else set(participants)
+
+
+def update_derived_data(model, changes):
+    """What the signal handlers would have done for each change, in set-based form"""
+    now = timezone.now()
+    if model in (Conversation, ContactAttempt):
+        deltas = Counter()
+        scopes = set()
+        affected_people = set()
+        tombstones = []
+        for change in changes:
+            instance, previous = change.instance, change.previous
+            deltas[rollup_key(model, instance.date, instance.private, instance.created_by_id)] += 1
+            scopes.add((instance.private, instance.created_by_id))
+            if previous is not None:
+                deltas[rollup_key(model, previous['date'], previous['private'], previous['created_by_id'])] -= 1
+                scopes.add((previous['private'], previous['created_by_id']))
+                if not previous['private'] and instance.private:
+                    # Other users can no longer see the row, so to them it is deleted
+                    tombstones.append(Tombstone(model=model._meta.model_name, object_id=instance.pk))
+            if model is Conversation:
+                affected_people |= change.previous_participants | change.participants
+            else:
+                affected_people |= {instance.person_id, previous and previous['person_id']}
+        for key, delta in deltas.items():
+            apply_rollup_delta(key, delta)
+        for private, created_by_id in scopes:
+            invalidate_dashboards_for_row(private, created_by_id)
+        refresh_person_stats(affected_people)
+        Tombstone.objects.bulk_create(tombstones)
+
+    if model is Conversation:
+        rows = [
+            (change.instance.pk, change.instance.date, change.instance.private, change.instance.created_by_id)
+            for change in changes
+        ]
+        participants = {change.instance.pk: change.participants for change in changes}
+        # The store is shared by every request, so only apply committed changes
+        transaction.on_commit(partial(activity_store.put_conversations, rows, participants))
+    elif model is ContactAttempt:
+        instances = [change.instance for change in changes]
+        rows = [
+            (instance.pk, instance.person_id, instance.date, instance.private, instance.created_by_id)
+            for instance in instances
+        ]
+        transaction.on_commit(partial(activity_store.put_pings, rows))
+
+    if model is Person:
+        invalidate_dashboards()
+        renamed = [
+            change.instance.pk for change in changes
+            if change.previous is not None and any(
+                change.previous[field] != getattr(change.instance, field) for field in ['name', 'name_ext']
+            )
+        ]
+        if renamed:
+            # Conversations, pings and relationships include person names
+            Conversation.objects.filter(participants__in=renamed).update(updated_at=now)
+            ContactAttempt.objects.filter(person__in=renamed).update(updated_at=now)
+            Relationship.objects.filter(Q(person1__in=renamed) | Q(person2__in=renamed)).update(updated_at=now)
+
+    if model in SEARCH_MODELS:
+        index_instances([change.instance for change in changes])
+
+    for index in SUGGESTION_INDEXES.get(model, []):
+        for change in changes:
+            before = change.previous and index.entry(change.previous)
+            after = index.instance_entry(change.instance)
+            if before != after:
+                # The indexes are shared by every request, so only apply committed changes
+                transaction.on_commit(partial(index.move, before, after))
+
+
+class BulkWriteMixin:
+    """Adds POST and PATCH <list>/bulk/ to a ModelViewSet"""
+
+    # Request fields holding ids of other rows, and the model they refer to
+    bulk_reference_fields = {}
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            raise ValidationError({'error': 'Expected a non-empty list of objects'})
+        if len(items) > MAX_ITEMS:
+            raise ValidationError({'error': f'At most {MAX_ITEMS} objects per request'})
+
+        creating = request.method == 'POST'
+        context = dict(self.get_serializer_context(), preloaded=self.preload_references(items))
+        targets = {} if creating else self.bulk_targets(items)
+        serializers, errors = [], []
+        seen = set()
+        for index, item in enumerate(items):
+            if creating:
+                serializer = self.get_serializer_class()(data=item, context=context)
+            else:
+                instance = targets.get(primary_key(self.get_queryset().model, item.get('id')))
+                if instance is None or instance.pk in seen:
+                    message = 'Not found.' if instance is None else 'Duplicate id.'
+                    errors.append({'index': index, 'errors': {'id': [message]}})
+                    continue
+                seen.add(instance.pk)
+                serializer = self.get_serializer_class()(instance, data=item, partial=True, context=context)
+            if serializer.is_valid():
+                serializers.append(serializer)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            saved = self.bulk_save(serializers, creating)
+        # Read back through get_queryset() for its annotations and prefetches. A row the
+        # caller just made private to someone else is no longer in it; send what was saved.
+        rows = self.get_queryset().in_bulk([instance.pk for instance in saved])
+        data = self.get_serializer([rows.get(instance.pk, instance) for instance in saved], many=True).data
+        return Response(
+            {'results': data}, status=status.HTTP_201_CREATED if creating else status.HTTP_200_OK
+        )
+
+    def preload_references(self, items):
+        """Load every row the items refer to, with one query per referenced model"""
+        ids = {}
+        for field, model in self.bulk_reference_fields.items():
+            for item in items:
+                values = item.get(field)
+                # Invalid ids are left for the serializer to report
+                ids.setdefault(model, set()).update(
+                    primary_key(model, value) for value in (values if isinstance(values, list) else [values])
+                )
+        preloaded = {}
+        for model, keys in ids.items():
+            keys.discard(None)
+            preloaded[model] = dict.fromkeys(keys)
+            preloaded[model].update(model.objects.in_bulk(keys))
+        return preloaded
+
+    def bulk_targets(self, items):
+        """The rows a PATCH may update, by primary key, in one query"""
+        model = self.get_queryset().model
+        ids = {primary_key(model, item.get('id')) for item in items} - {None}
+        # get_queryset() applies visibility; its ordering isn't needed here
+        return {row.pk: row for row in self.get_queryset().filter(pk__in=ids).order_by()}
+
+    def bulk_save(self, serializers, creating):
+        model = self.get_queryset().model
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        now = timezone.now()
+        instances, changes, updated_fields, participants = [], [], set(), {}
+        previous_participants = {}
+        if not creating and model is Conversation:
+            pks = [serializer.instance.pk for serializer in serializers]
+            for conversation_id, person_id in Participation.objects.filter(
+                conversation_id__in=pks
+            ).values_list('conversation_id', 'person_id'):
+                previous_participants.setdefault(conversation_id, set()).add(person_id)
+
+        for serializer in serializers:
+            data = dict(serializer.validated_data)
+            related = {name: data.pop(name) for name in many_to_many if name in data}
+            if creating:
+                instance = model(**data, created_by=self.request.user)
+                previous = None
+            else:
+                instance = serializer.instance
+                previous = stored_values(instance)
+                for name, value in data.items():
+                    setattr(instance, name, value)
+                instance.updated_at = now
+                updated_fields.update(data)
+            instances.append(instance)
+            if 'participants' in related:
+                participants[instance.pk] = {person.pk for person in related['participants']}
+            changes.append(BulkChange(
+                instance, previous, previous_participants.get(instance.pk, ()), participants.get(instance.pk),
+            ))
+
+        if creating:
+            model.objects.bulk_create(instances)
+        elif updated_fields:
+            model.objects.bulk_update(instances, [*updated_fields, 'updated_at'])
+        else:
+            model.objects.filter(pk__in=[instance.pk for instance in instances]).update(updated_at=now)
+        if participants:
+            Participation.objects.filter(conversation_id__in=list(participants)).delete()
+            Participation.objects.bulk_create([
+                Participation(conversation_id=conversation_id, person_id=person_id)
+                for conversation_id, people in participants.items() for person_id in people
+            ])
+        update_derived_data(model, changes)
+        return instances
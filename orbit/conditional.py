@@ -0,0 +1,74 @@
+"""
+Conditional GET support for the API.
+
+ETags come from cheap version stamps rather than from the response body. For
+each table a response depends on, the stamp is the newest updated_at among the
+rows the caller can see plus the newest tombstone they can see. Both are single
+MAX() lookups on indexed columns, so a revalidation that ends in a 304 never
+runs the list query or the serializer. The stamps are hashed together with the
+request path and query string, the caller and the local date, since ages and
+day counts in the payloads move with the date.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+
+from .sync import visible_tombstones
+
+
+def table_version(model, user):
+    """Version stamp for the rows of `model` visible to `user`"""
+    rows = model.objects.all()
+    if hasattr(rows, 'visible_to'):
+        rows = rows.visible_to(user)
+    updated = rows.aggregate(latest=Max('updated_at'))['latest']
+    deleted = visible_tombstones(user).filter(
+        model=model._meta.model_name
+    ).aggregate(latest=Max('deleted_at'))['latest']
+    return '/'.join(stamp.isoformat() if stamp else '-' for stamp in (updated, deleted))
+
+
+def make_etag(request, *versions):
+    parts = [request.get_full_path(), str(request.user.pk), timezone.localdate().isoformat(), *versions]
+    return '"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def payload_etag(data):
+    """ETag hashed from a payload, for responses that are already cached whole"""
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"%s"' % hashlib.md5(body.encode()).hexdigest()
+
+
+def not_modified(request, etag):
+    """Return a 304 response if the client's copy matches `etag`, otherwise None"""
+    return get_conditional_response(request, etag=etag)
+
+
+class ConditionalGetMixin:
+    """Adds ETags and 304 responses to a ModelViewSet's list and retrieve actions"""
+    etag_models = ()
+
+    def get_etag(self, request):
+        return make_etag(request, *(table_version(model, request.user) for model in self.etag_models))
+
+    def list(self, request, *args, **kwargs):
+        if 'updated_since' in request.query_params:
+            # Delta responses carry a fresh sync token, so they are never identical
+            return super().list(request, *args, **kwargs)
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = not_modified(request, etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+        return response
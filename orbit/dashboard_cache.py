@@ -0,0 +1,99 @@
+"""
+Per-user cache for the assembled dashboard payload.
+
+The privacy filter makes each user's dashboard different, so payloads are
+cached per user. Every key embeds two generation counters: one shared by all
+users, bumped when a person or public conversation/ping changes, and one per
+user, bumped when that user's private rows change. Bumping a generation
+orphans the old entries, so writes invalidate exactly the affected
+dashboards. Keys also embed the local date and expire at local midnight
+because the activity windows and birthday countdowns move with the date.
+Requests for a subset of the sections are cached separately from the full
+dashboard, under the same generations.
+
+Generations are bumped once the writing transaction commits, so a dashboard
+built from the rows before the write can't be stored under the new key. A
+miss stores the payload under the key it looked up, not one recomputed after
+the build, for the same reason.
+"""
+from datetime import datetime, time, timedelta
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+KEY_PREFIX = 'orbit:dashboard'
+PUBLIC_SCOPE = 'public'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+
+
+def _generation_key(scope):
+    return f'{KEY_PREFIX}:generation:{scope}'
+
+
+def _dashboard_key(user, today, sections):
+    generations = cache.get_many([_generation_key(PUBLIC_SCOPE), _generation_key(user.pk)])
+    return ':'.join([
+        KEY_PREFIX, str(user.pk), today.isoformat(), '+'.join(sorted(sections)) if sections else 'all',
+        str(generations.get(_generation_key(PUBLIC_SCOPE), 0)),
+        str(generations.get(_generation_key(user.pk), 0)),
+    ])
+
+
+def _seconds_until_midnight():
+    now = timezone.localtime()
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), time.min))
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def _increment(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # The key was evicted between add() and incr()
+            cache.set(key, 1, timeout=None)
+
+
+def get_cached_dashboard(user, sections=None):
+    """Return (payload or None on a miss, key) for `user` and `sections` (None for all).
+
+    Pass the key to cache_dashboard() after building the payload on a miss.
+    """
+    key = _dashboard_key(user, timezone.localdate(), sections)
+    data = cache.get(key)
+    _increment(HITS_KEY if data is not None else MISSES_KEY)
+    return data, key
+
+
+def cache_dashboard(key, data):
+    cache.set(key, data, timeout=_seconds_until_midnight())
+
+
+def invalidate_dashboards(owner_id=None):
+    """Invalidate every user's dashboard, or only `owner_id`'s when their private rows change"""
+    # Readers only see the write after the commit; outside a transaction this runs at once
+    transaction.on_commit(partial(_increment, _generation_key(PUBLIC_SCOPE if owner_id is None else owner_id)))
+
+
+def invalidate_dashboards_for_row(private, created_by_id):
+    """Invalidate the dashboards that can see a conversation or ping with these values"""
+    if not private:
+        invalidate_dashboards()
+    elif created_by_id is not None:
+        invalidate_dashboards(created_by_id)
+
+
+def dashboard_cache_stats():
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 3) if total else None,
+    }
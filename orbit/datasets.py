@@ -0,0 +1,201 @@
+"""
+Deterministic synthetic datasets for benchmarks and load testing.
+
+generate_dataset() fills the database with people, conversations, pings and
+relationships using bulk inserts. The same seed always produces the same rows,
+primary keys included, with dates counted back from `today`. The shapes follow
+a real address book rather than a uniform spread:
+
+- a few people account for most of the activity (Zipf-like popularity);
+- most conversations are one-on-one, with the occasional group;
+- dates cluster in the recent past and thin out over ten years;
+- about two thirds of people have a birthday, some with a birth year.
+
+Bulk inserts skip the signal handlers, so derived data is rebuilt afterwards,
+as import_historical does.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .activity import reset_activity_store
+from .dashboard_cache import invalidate_dashboards
+from .graph import reset_relationship_graph
+from .models import Person, Conversation, ContactAttempt, Relationship
+from .person_stats import rebuild_person_stats
+from .rollups import rebuild_activity_rollups
+from .search import rebuild_search_index
+from .suggestions import reset_suggestion_indexes
+
+
+FIRST_NAMES = [
+    'Maya', 'Finn', 'Elena', 'Jasper', 'Priya', 'Omar', 'Hana', 'Lucas', 'Zoe', 'Mateo',
+    'Aisha', 'Noah', 'Ingrid', 'Kenji', 'Sofia', 'Dmitri', 'Amara', 'Leo', 'Chloe', 'Ravi',
+]
+LAST_NAMES = [
+    'Patel', "O'Connor", 'Rodriguez', 'Kim', 'Nguyen', 'Okafor', 'Schmidt', 'Rossi', 'Cohen', 'Silva',
+    'Haddad', 'Larsen', 'Tanaka', 'Moreau', 'Kowalski', 'Mensah', 'Garcia', 'Brown', 'Ivanova', 'Singh',
+]
+CITIES = ['Denver', 'Boulder', 'Chicago', 'Austin', 'Portland', 'Brooklyn', 'Oakland', 'Seattle', 'Boston', '']
+COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', '', '', '']
+PLACES = ['Coffee shop', 'Their place', 'Office', 'Park', 'Brewery', 'Gym', 'Bookstore', '']
+TOPICS = [
+    'work', 'the kids', 'a ski trip', 'moving house', 'a new job', 'the book club pick', 'marathon training',
+    'a surprise party', 'travel plans', 'their garden', 'a concert', 'family news',
+]
+
+# (value, relative frequency)
+CONVERSATION_TYPES = [('in_person', 35), ('phone', 20), ('text', 25), ('email', 8), ('video', 10), ('other', 2)]
+ATTEMPT_TYPES = [('text', 45), ('email', 15), ('call', 20), ('social', 15), ('other', 5)]
+RELATIONSHIP_TYPES = [
+    ('partner', 3), ('family', 15), ('friend', 40), ('colleague', 25), ('acquaintance', 12), ('other', 5),
+]
+
+# Mean age in days of generated activity, and the oldest it can be
+MEAN_AGE_DAYS = 240
+MAX_AGE_DAYS = 3650
+
+PRIVATE_RATE = 0.2
+BIRTHDAY_RATE = 0.65
+BIRTH_YEAR_RATE = 0.6
+
+BATCH_SIZE = 2000
+
+
+class DatasetGenerator:
+    def __init__(self, seed=0, today=None, user=None):
+        self.random = random.Random(seed)
+        self.today = today or date.today()
+        self.user = user
+
+    def uuid(self):
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def pick(self, weighted):
+        values, weights = zip(*weighted)
+        return self.random.choices(values, weights)[0]
+
+    def past_date(self):
+        age = min(int(self.random.expovariate(1 / MEAN_AGE_DAYS)), MAX_AGE_DAYS)
+        return self.today - timedelta(days=age)
+
+    def birthday(self):
+        if self.random.random() >= BIRTHDAY_RATE:
+            return None, None, None
+        # Any day of a leap year, so Feb 29 birthdays turn up too
+        day = date(2000, 1, 1) + timedelta(days=self.random.randrange(366))
+        year = self.random.randint(1950, 2005) if self.random.random() < BIRTH_YEAR_RATE else None
+        if year is not None and (day.month, day.day) == (2, 29) and year % 4:
+            year -= year % 4
+        return day.month, day.day, year
+
+    def people(self, count):
+        for i in range(count):
+            month, day, year = self.birthday()
+            first, last = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+            yield Person(
+                id=self.uuid(), name=f'{first} {last}',
+                location=self.random.choice(CITIES), company=self.random.choice(COMPANIES),
+                email=f'{first}.{i}@example.com'.lower(), birthday_month=month, birthday_day=day, birth_year=year,
+                how_we_met=f'Met through {self.random.choice(TOPICS)}', created_by=self.user,
+            )
+
+    def group_size(self):
+        """1 most of the time, occasionally a group of up to 8"""
+        size = 1
+        while size < 8 and self.random.random() < 0.25:
+            size += 1
+        return size
+
+    def conversations(self, count, people, popularity):
+        Participation = Conversation.participants.through
+        for _ in range(count):
+            conversation = Conversation(
+                id=self.uuid(), date=self.past_date(), type=self.pick(CONVERSATION_TYPES),
+                location=self.random.choice(PLACES), notes=f'Talked about {self.random.choice(TOPICS)}',
+                private=self.random.random() < PRIVATE_RATE, created_by=self.user,
+            )
+            members = {self.random.choices(people, cum_weights=popularity)[0] for _ in range(self.group_size())}
+            yield conversation, [
+                Participation(conversation_id=conversation.id, person_id=person.id) for person in members
+            ]
+
+    def pings(self, count, people, popularity):
+        for _ in range(count):
+            yield ContactAttempt(
+                id=self.uuid(), person=self.random.choices(people, cum_weights=popularity)[0],
+                date=self.past_date(), type=self.pick(ATTEMPT_TYPES), notes='',
+                led_to_conversation=self.random.random() < 0.3,
+                private=self.random.random() < PRIVATE_RATE, created_by=self.user,
+            )
+
+    def relationships(self, count, people, popularity):
+        """Up to `count` relationships, at most one per pair of people"""
+        seen = set()
+        attempts = 0
+        while len(seen) < count and attempts < count * 10:
+            attempts += 1
+            person1 = self.random.choices(people, cum_weights=popularity)[0]
+            person2 = self.random.choice(people)
+            pair = frozenset([person1.id, person2.id])
+            if len(pair) < 2 or pair in seen:
+                continue
+            seen.add(pair)
+            yield Relationship(
+                id=self.uuid(), person1=person1, person2=person2,
+                relationship_type=self.pick(RELATIONSHIP_TYPES), created_by=self.user,
+            )
+
+
+def _popularity(count):
+    """Cumulative Zipf-like weights: the nth person is picked 1/n**0.8 as often as the first"""
+    total, weights = 0.0, []
+    for rank in range(1, count + 1):
+        total += 1 / rank ** 0.8
+        weights.append(total)
+    return weights
+
+
+def _insert(model, objects, batch_size):
+    objects = list(objects)
+    for start in range(0, len(objects), batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(objects[start:start + batch_size])
+    return objects
+
+
+def generate_dataset(people, conversations=None, pings=None, relationships=None, seed=0, today=None, user=None,
+                     batch_size=BATCH_SIZE):
+    """Create a synthetic dataset and return the number of rows of each kind.
+
+    Conversations, pings and relationships default to 5, 3 and 2 per person.
+    """
+    conversations = people * 5 if conversations is None else conversations
+    pings = people * 3 if pings is None else pings
+    relationships = people * 2 if relationships is None else relationships
+    generator = DatasetGenerator(seed=seed, today=today, user=user)
+    counts = {}
+
+    created = _insert(Person, generator.people(people), batch_size)
+    counts['people'] = len(created)
+    if created:
+        popularity = _popularity(len(created))
+        rows = list(generator.conversations(conversations, created, popularity))
+        _insert(Conversation, (conversation for conversation, _ in rows), batch_size)
+        _insert(Conversation.participants.through, (link for _, links in rows for link in links), batch_size)
+        counts['conversations'] = len(rows)
+        counts['pings'] = len(_insert(ContactAttempt, generator.pings(pings, created, popularity), batch_size))
+        counts['relationships'] = len(
+            _insert(Relationship, generator.relationships(relationships, created, popularity), batch_size)
+        )
+
+    rebuild_activity_rollups()
+    rebuild_person_stats()
+    rebuild_search_index()
+    invalidate_dashboards()
+    reset_suggestion_indexes()
+    reset_relationship_graph()
+    reset_activity_store()
+    return counts
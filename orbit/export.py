@@ -0,0 +1,152 @@
+"""
+Streaming exports of people, conversations and pings.
+
+Rows are read with chunked .iterator() queries and encoded one chunk at a
+time, so memory use stays flat however many rows are exported. Conversation
+participants are resolved with one query per chunk. Private conversations and
+pings follow the API's rules: only the exporting user's own are included.
+"""
+import csv
+import io
+import json
+import zlib
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from rest_framework.renderers import BaseRenderer
+
+from .models import Person, Conversation, ContactAttempt
+
+
+CHUNK_SIZE = 2000
+
+COLUMNS = {
+    'people': [
+        'id', 'name', 'name_ext', 'email', 'phone', 'location', 'address', 'company',
+        'birthday_month', 'birthday_day', 'birth_year', 'how_we_met', 'notes', 'ai_summary',
+        'created_at', 'updated_at',
+    ],
+    'conversations': [
+        'id', 'date', 'type', 'location', 'notes', 'private', 'participant_ids', 'participant_names',
+        'created_by_username', 'created_at', 'updated_at',
+    ],
+    'pings': [
+        'id', 'person_id', 'person_name', 'date', 'type', 'notes', 'led_to_conversation', 'private',
+        'created_by_username', 'created_at', 'updated_at',
+    ],
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _chunks(queryset):
+    chunk = []
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _people(user):
+    yield from _chunks(Person.objects.order_by('name', 'id').values(*COLUMNS['people']))
+
+
+def _conversations(user):
+    rows = Conversation.objects.visible_to(user).order_by('-date', 'id').values(
+        'id', 'date', 'type', 'location', 'notes', 'private', 'created_at', 'updated_at',
+        created_by_username=F('created_by__username'),
+    )
+    Participation = Conversation.participants.through
+    for chunk in _chunks(rows):
+        participants = defaultdict(list)
+        links = Participation.objects.filter(
+            conversation_id__in=[row['id'] for row in chunk]
+        ).order_by('person__name', 'person_id').values_list('conversation_id', 'person_id', 'person__name')
+        for conversation_id, person_id, name in links:
+            participants[conversation_id].append((person_id, name))
+        for row in chunk:
+            row['participant_ids'] = [person_id for person_id, _ in participants[row['id']]]
+            row['participant_names'] = [name for _, name in participants[row['id']]]
+        yield chunk
+
+
+def _pings(user):
+    rows = ContactAttempt.objects.visible_to(user).order_by('-date', 'id').values(
+        'id', 'person_id', 'date', 'type', 'notes', 'led_to_conversation', 'private', 'created_at', 'updated_at',
+        person_name=F('person__name'), created_by_username=F('created_by__username'),
+    )
+    yield from _chunks(rows)
+
+
+EXPORTS = {
+    'people': _people,
+    'conversations': _conversations,
+    'pings': _pings,
+}
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return '; '.join(str(item) for item in value)
+    return value
+
+
+def _csv(columns, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        for row in chunk:
+            writer.writerow([_csv_value(row[column]) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an empty export
+        yield buffer.getvalue()
+
+
+def _ndjson(columns, chunks):
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps({column: row[column] for column in columns}, cls=DjangoJSONEncoder) + '\n'
+            for row in chunk
+        )
+
+
+ENCODERS = {
+    'csv': _csv,
+    'ndjson': _ndjson,
+}
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(kind, fmt, user, compress=False):
+    """Yield the export of `kind` visible to `user` as encoded bytes, optionally gzipped"""
+    chunks = EXPORTS[kind](user)
+    encoded = (text.encode() for text in ENCODERS[fmt](COLUMNS[kind], chunks))
+    return _gzip(encoded) if compress else encoded
+
+
+class PassthroughRenderer(BaseRenderer):
+    """Lets content negotiation accept any Accept header for views that stream their own bytes"""
+    media_type = '*/*'
+    format = ''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
@@ -0,0 +1,147 @@
+"""
+In-memory graph of the relationships between people.
+
+Relationships are undirected edges. The graph keeps an adjacency map from each
+person to their neighbors and the relationships connecting them. Direct
+connections, k-hop neighborhoods and shortest paths are then answered by
+walking dictionaries rather than by recursive joins.
+
+Like the suggestion indexes, the graph is built from one query on first use,
+patched by signal handlers once a write commits, and rebuilt after
+REBUILD_AFTER seconds to pick up writes from other processes.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+
+from .models import Relationship
+
+
+REBUILD_AFTER = 300
+
+MAX_DEPTH = 4
+
+
+class RelationshipGraph:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._relationships = {}               # relationship id -> (person1, person2, type)
+        self._adjacency = defaultdict(dict)    # person -> neighbor -> {relationship id: type}
+
+    def reset(self):
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_built(self):
+        if self._built_at is not None and time.monotonic() - self._built_at < REBUILD_AFTER:
+            return
+        rows = Relationship.objects.values_list('id', 'person1_id', 'person2_id', 'relationship_type')
+        with self._lock:
+            self._relationships = {}
+            self._adjacency = defaultdict(dict)
+            for relationship_id, person1, person2, relationship_type in rows:
+                self._link(relationship_id, person1, person2, relationship_type)
+            self._built_at = time.monotonic()
+
+    def _link(self, relationship_id, person1, person2, relationship_type):
+        self._relationships[relationship_id] = (person1, person2, relationship_type)
+        self._adjacency[person1].setdefault(person2, {})[relationship_id] = relationship_type
+        self._adjacency[person2].setdefault(person1, {})[relationship_id] = relationship_type
+
+    def _unlink(self, relationship_id):
+        if relationship_id not in self._relationships:
+            return
+        person1, person2, _ = self._relationships.pop(relationship_id)
+        for person, neighbor in ((person1, person2), (person2, person1)):
+            links = self._adjacency[person].get(neighbor, {})
+            links.pop(relationship_id, None)
+            if not links:
+                self._adjacency[person].pop(neighbor, None)
+            if not self._adjacency[person]:
+                del self._adjacency[person]
+
+    def put(self, relationship_id, person1, person2, relationship_type):
+        """Add a relationship, replacing its previous edge if it was edited"""
+        with self._lock:
+            if self._built_at is None:
+                # Not built yet; the first query will read the committed rows
+                return
+            self._unlink(relationship_id)
+            self._link(relationship_id, person1, person2, relationship_type)
+
+    def discard(self, relationship_id):
+        with self._lock:
+            if self._built_at is not None:
+                self._unlink(relationship_id)
+
+    def _neighbors(self, person, types):
+        for neighbor, links in self._adjacency.get(person, {}).items():
+            for relationship_id, relationship_type in links.items():
+                if types is None or relationship_type in types:
+                    yield neighbor, relationship_id, relationship_type
+
+    def connections(self, person, types=None):
+        """Return (neighbor, relationship id, type) for each relationship of `person`"""
+        self._ensure_built()
+        with self._lock:
+            return list(self._neighbors(person, types))
+
+    def neighborhood(self, person, depth, types=None):
+        """Return ({person: hops} for everyone within `depth` hops, [(id, person1, person2, type)] among them)"""
+        self._ensure_built()
+        with self._lock:
+            distances = {person: 0}
+            queue = deque([person])
+            while queue:
+                current = queue.popleft()
+                if distances[current] == depth:
+                    continue
+                for neighbor, _, _ in self._neighbors(current, types):
+                    if neighbor not in distances:
+                        distances[neighbor] = distances[current] + 1
+                        queue.append(neighbor)
+            # Every relationship between two people in the neighborhood, found from their adjacency
+            edges = {}
+            for member in distances:
+                for neighbor, relationship_id, relationship_type in self._neighbors(member, types):
+                    if neighbor in distances and relationship_id not in edges:
+                        person1, person2, _ = self._relationships[relationship_id]
+                        edges[relationship_id] = (relationship_id, person1, person2, relationship_type)
+        del distances[person]
+        return distances, list(edges.values())
+
+    def shortest_path(self, source, target, types=None):
+        """Return [(person, relationship id, type)] from `source` to `target`, or None if unconnected.
+
+        The first step is `source` itself with no relationship; each later
+        step names the relationship that leads to that person.
+        """
+        self._ensure_built()
+        with self._lock:
+            parents = {source: None}
+            queue = deque([source])
+            while queue and target not in parents:
+                current = queue.popleft()
+                for neighbor, relationship_id, relationship_type in self._neighbors(current, types):
+                    if neighbor not in parents:
+                        parents[neighbor] = (current, relationship_id, relationship_type)
+                        queue.append(neighbor)
+        if target not in parents:
+            return None
+        path = []
+        person = target
+        while parents[person] is not None:
+            previous, relationship_id, relationship_type = parents[person]
+            path.append((person, relationship_id, relationship_type))
+            person = previous
+        path.append((source, None, None))
+        return path[::-1]
+
+
+relationship_graph = RelationshipGraph()
+
+
+def reset_relationship_graph():
+    """Drop the graph so the next query rebuilds it; used by tests and after bulk imports"""
+    relationship_graph.reset()
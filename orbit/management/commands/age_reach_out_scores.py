@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orbit.reach_out import refresh_stale_reach_out_scores
+
+
+class Command(BaseCommand):
+    help = 'Re-age reach-out scores computed before today; run daily so the ranking follows the date'
+
+    def handle(self, *args, **options):
+        scores = refresh_stale_reach_out_scores()
+        self.stdout.write(self.style.SUCCESS(f"Re-aged {scores} reach-out scores"))
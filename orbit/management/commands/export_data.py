@@ -0,0 +1,40 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from orbit.export import CONTENT_TYPES, EXPORTS, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Stream people, conversations or pings to a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--as', dest='fmt', choices=sorted(CONTENT_TYPES), default='csv',
+                            help='Output format (default: csv)')
+        parser.add_argument('--user', help="Include this user's private conversations and pings")
+        parser.add_argument('--output', '-o', help='File to write (default: standard output)')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}")
+
+        chunks = stream_export(options['kind'], options['fmt'], user, compress=options['gzip'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported {options['kind']} to {options['output']}"))
+        else:
+            output = sys.stdout.buffer if options['gzip'] else None
+            for chunk in chunks:
+                if output:
+                    output.write(chunk)
+                else:
+                    self.stdout.write(chunk.decode(), ending='')
@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from orbit.datasets import BATCH_SIZE, generate_dataset
+from orbit.models import Person
+
+
+class Command(BaseCommand):
+    help = 'Fill an empty database with a deterministic synthetic dataset for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--people', type=int, default=1000)
+        parser.add_argument('--conversations', type=int, help='Default: 5 per person')
+        parser.add_argument('--pings', type=int, help='Default: 3 per person')
+        parser.add_argument('--relationships', type=int, help='Default: 2 per person')
+        parser.add_argument('--seed', type=int, default=0, help='The same seed always generates the same rows')
+        parser.add_argument('--user', help='Username recorded as the creator (default: the first user)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows written per transaction')
+
+    def handle(self, *args, **options):
+        if Person.objects.exists():
+            raise CommandError('The database already has people; generate_dataset needs an empty database')
+        user = self.get_user(options['user'])
+        counts = generate_dataset(
+            options['people'], conversations=options['conversations'], pings=options['pings'],
+            relationships=options['relationships'], seed=options['seed'], user=user,
+            batch_size=options['batch_size'],
+        )
+        summary = ', '.join(f"{count} {label}" for label, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created: {summary}"))
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {username!r}")
+        user = User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError('No users found; create a user first')
+        return user
@@ -0,0 +1,307 @@
+import os
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from orbit.activity import reset_activity_store
+from orbit.dashboard_cache import invalidate_dashboards
+from orbit.graph import reset_relationship_graph
+from orbit.models import Person, Conversation, ContactAttempt, Relationship, ImportedRecord
+from orbit.person_stats import rebuild_person_stats
+from orbit.rollups import rebuild_activity_rollups
+from orbit.search import rebuild_search_index
+from orbit.suggestions import reset_suggestion_indexes
+
+
+FILES = {
+    'people': 'seeds_person.csv',
+    'conversations': 'seeds_conversation.csv',
+    'participants': 'seeds_conversation_people.csv',
+    'companies': 'seeds_company.csv',
+}
+
+DATE_FORMATS = ['%m/%d/%y', '%m/%d/%Y', '%Y-%m-%d']
+
+# Old conversation modes mapped to conversation types
+CONVERSATION_TYPES = {
+    'one on one': 'in_person',
+    'in group': 'in_person',
+    'phone': 'phone',
+    'text': 'text',
+    'email': 'email',
+    'skype': 'video',
+}
+
+# Old conversation modes mapped to ping types, for seed rows
+ATTEMPT_TYPES = {
+    'phone': 'call',
+    'text': 'text',
+    'email': 'email',
+    'social': 'social',
+    'facebook': 'social',
+    'instagram': 'social',
+    'twitter': 'social',
+    'linkedin': 'social',
+}
+
+
+class Command(BaseCommand):
+    help = "Import people, conversations, pings and relationships from the previous version's CSV export"
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', nargs='?', default='.', help='Directory containing the seeds_*.csv files')
+        parser.add_argument('--user', help='Username recorded as the creator (default: the first user)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows written per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be imported without writing')
+
+    def handle(self, *args, **options):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise CommandError('import_historical requires pandas (pip install pandas)')
+        self.pd = pd
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+
+        paths = {key: os.path.join(options['directory'], name) for key, name in FILES.items()}
+        missing = [FILES[key] for key, path in paths.items() if not os.path.exists(path)]
+        if missing:
+            raise CommandError(f"Missing files in {options['directory']}: {', '.join(missing)}")
+        self.user = self.get_user(options['user'])
+
+        companies = pd.read_csv(paths['companies'])
+        people = self.active(pd.read_csv(paths['people']))
+        conversations = self.active(pd.read_csv(paths['conversations']))
+        participants = pd.read_csv(paths['participants'])
+
+        counts = {}
+        person_ids = dict(ImportedRecord.objects.filter(source='person').values_list('source_id', 'object_id'))
+        counts['people'] = self.import_people(people, companies, person_ids)
+        counts['partner relationships'], counts['friend relationships'] = self.import_relationships(people, person_ids)
+        counts['conversations'], counts['pings'] = self.import_conversations(conversations, participants, person_ids)
+
+        if not self.dry_run:
+            self.log('Rebuilding derived data...')
+            rebuild_activity_rollups()
+            rebuild_person_stats()
+            rebuild_search_index()
+            invalidate_dashboards()
+            reset_suggestion_indexes()
+            reset_relationship_graph()
+            reset_activity_store()
+
+        summary = ', '.join(f"{count} {label}" for label, count in counts.items())
+        prefix = 'Dry run, nothing written. Would create' if self.dry_run else 'Created'
+        self.stdout.write(self.style.SUCCESS(f"{prefix}: {summary}"))
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {username!r}")
+        user = User.objects.filter(id=1).first() or User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError('No users found; create a user first')
+        return user
+
+    def log(self, message):
+        if self.verbosity >= 1:
+            self.stdout.write(message)
+
+    def progress(self, label, done, total):
+        self.log(f"  {label}: {done}/{total}")
+
+    # Vectorized preprocessing
+
+    def active(self, frame):
+        if 'active' in frame:
+            frame = frame[frame['active'].fillna(1) != 0]
+        return frame
+
+    def text(self, frame, column):
+        if column not in frame:
+            return self.pd.Series('', index=frame.index, dtype=object)
+        return frame[column].fillna('').astype(str).str.strip()
+
+    def parse_dates(self, frame, column):
+        """Parse a date column trying each of DATE_FORMATS; unparseable values become NaT"""
+        values = self.text(frame, column)
+        parsed = self.pd.Series(self.pd.NaT, index=frame.index, dtype='datetime64[ns]')
+        for fmt in DATE_FORMATS:
+            parsed = parsed.fillna(self.pd.to_datetime(values, format=fmt, errors='coerce'))
+        # Two-digit years that land in the future belong to the previous century
+        future = parsed.dt.year > date.today().year
+        parsed[future] = parsed[future] - self.pd.DateOffset(years=100)
+        return parsed
+
+    def nullable(self, series):
+        return [None if self.pd.isna(value) else int(value) for value in series]
+
+    def batches(self, frame):
+        for start in range(0, len(frame), self.batch_size):
+            yield start + self.batch_size, frame.iloc[start:start + self.batch_size]
+
+    def write(self, *model_objects):
+        """bulk_create each (model, objects) pair in one transaction, unless this is a dry run"""
+        if self.dry_run:
+            return
+        with transaction.atomic():
+            for model, objects in model_objects:
+                model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    # Import steps
+
+    def import_people(self, people, companies, person_ids):
+        company_names = dict(zip(companies['id'], self.text(companies, 'name')))
+        names = (self.text(people, 'first_name') + ' ' + self.text(people, 'last_name')).str.strip()
+        birthdays = self.parse_dates(people, 'birthday')
+        rows = people.assign(
+            name=names,
+            company_name=people['company_id'].map(company_names).fillna('') if 'company_id' in people else '',
+            city=self.text(people, 'city'),
+            address=self.text(people, 'address'),
+            notes=self.text(people, 'notes'),
+            birthday_month=birthdays.dt.month,
+            birthday_day=birthdays.dt.day,
+            birth_year=birthdays.dt.year,
+        )
+        unnamed = rows['name'] == ''
+        if unnamed.any():
+            self.log(f"Skipping {unnamed.sum()} people with no name")
+        rows = rows[~unnamed & ~rows['id'].isin(set(person_ids))]
+
+        self.log(f"Importing {len(rows)} people...")
+        for done, batch in self.batches(rows):
+            created = [
+                Person(
+                    name=name, location=city, address=address, company=company, notes=notes,
+                    birthday_month=month, birthday_day=day, birth_year=year, created_by=self.user,
+                )
+                for name, city, address, company, notes, month, day, year in zip(
+                    batch['name'], batch['city'], batch['address'], batch['company_name'], batch['notes'],
+                    self.nullable(batch['birthday_month']), self.nullable(batch['birthday_day']),
+                    self.nullable(batch['birth_year']),
+                )
+            ]
+            records = [
+                ImportedRecord(source='person', source_id=source_id, object_id=person.pk)
+                for source_id, person in zip(batch['id'].tolist(), created)
+            ]
+            self.write((Person, created), (ImportedRecord, records))
+            person_ids.update((record.source_id, record.object_id) for record in records)
+            self.progress('people', min(done, len(rows)), len(rows))
+        return len(rows)
+
+    def import_relationships(self, people, person_ids):
+        """Create partner and known-via relationships between imported people, once per pair"""
+        seen = {frozenset(pair) for pair in Relationship.objects.values_list('person1_id', 'person2_id')}
+        counts = []
+        for column, relationship_type, description in [
+            ('partner_id', 'partner', 'Imported from historical data'),
+            ('known_via_id', 'friend', 'Known via (imported from historical data)'),
+        ]:
+            if column not in people:
+                counts.append(0)
+                continue
+            pairs = self.pd.DataFrame({
+                'person1': people['id'].map(person_ids),
+                'person2': people[column].map(person_ids),
+            }).dropna()
+            created = []
+            for person1, person2 in zip(pairs['person1'], pairs['person2']):
+                pair = frozenset((person1, person2))
+                if person1 == person2 or pair in seen:
+                    continue
+                seen.add(pair)
+                created.append(Relationship(
+                    person1_id=person1, person2_id=person2, relationship_type=relationship_type,
+                    description=description, created_by=self.user,
+                ))
+            self.write((Relationship, created))
+            self.log(f"  {relationship_type} relationships: {len(created)}")
+            counts.append(len(created))
+        return counts
+
+    def import_conversations(self, conversations, participants, person_ids):
+        """Create conversations, and one ping per participant for seed rows"""
+        done_ids = ImportedRecord.objects.filter(source='conversation').values_list('source_id', flat=True)
+        conversations = conversations[~conversations['id'].isin(set(done_ids))]
+
+        dates = self.parse_dates(conversations, 'date')
+        undated = dates.isna()
+        if undated.any():
+            self.log(f"Skipping {undated.sum()} conversations without a parseable date")
+        summary = self.text(conversations, 'summary')
+        notes = self.text(conversations, 'notes')
+        both = (summary != '') & (notes != '')
+        modes = self.text(conversations, 'mode').str.lower()
+        seeds = conversations['seed'].fillna(0) == 1 if 'seed' in conversations else False
+        rows = conversations.assign(
+            day=dates.dt.date,
+            combined_notes=(summary + '\n\n' + notes).where(both, summary + notes),
+            conversation_type=modes.map(CONVERSATION_TYPES).fillna('other'),
+            attempt_type=modes.map(ATTEMPT_TYPES).fillna('other'),
+            place=self.text(conversations, 'location'),
+            is_seed=seeds,
+        )[~undated]
+
+        # conversation id -> new person ids, built once with a groupby
+        links = participants.assign(person=participants['person_id'].map(person_ids)).dropna(subset=['person'])
+        links = links.drop_duplicates(subset=['conversation_id', 'person'])
+        participant_map = links.groupby('conversation_id')['person'].agg(list).to_dict()
+
+        seed_rows = rows[rows['is_seed']]
+        conversation_rows = rows[~rows['is_seed']]
+        has_participants = conversation_rows['id'].isin(set(participant_map))
+        if (~has_participants).any():
+            self.log(f"Skipping {(~has_participants).sum()} conversations with no known participants")
+        conversation_rows = conversation_rows[has_participants]
+
+        self.log(f"Importing {len(conversation_rows)} conversations...")
+        Participation = Conversation.participants.through
+        for done, batch in self.batches(conversation_rows):
+            created = [
+                Conversation(
+                    date=day, type=conversation_type, location=place,
+                    notes=combined or 'Imported conversation', created_by=self.user,
+                )
+                for day, conversation_type, place, combined in zip(
+                    batch['day'], batch['conversation_type'], batch['place'], batch['combined_notes']
+                )
+            ]
+            source_ids = batch['id'].tolist()
+            through = [
+                Participation(conversation_id=conversation.pk, person_id=person_id)
+                for source_id, conversation in zip(source_ids, created)
+                for person_id in participant_map[source_id]
+            ]
+            records = [
+                ImportedRecord(source='conversation', source_id=source_id, object_id=conversation.pk)
+                for source_id, conversation in zip(source_ids, created)
+            ]
+            self.write((Conversation, created), (Participation, through), (ImportedRecord, records))
+            self.progress('conversations', min(done, len(conversation_rows)), len(conversation_rows))
+
+        self.log(f"Importing {len(seed_rows)} seed rows as pings...")
+        pings = 0
+        for done, batch in self.batches(seed_rows):
+            created = [
+                ContactAttempt(
+                    person_id=person_id, date=day, type=attempt_type,
+                    notes=combined or 'Imported contact attempt', created_by=self.user,
+                )
+                for source_id, day, attempt_type, combined in zip(
+                    batch['id'], batch['day'], batch['attempt_type'], batch['combined_notes']
+                )
+                for person_id in participant_map.get(source_id, [])
+            ]
+            records = [ImportedRecord(source='conversation', source_id=source_id) for source_id in batch['id'].tolist()]
+            self.write((ContactAttempt, created), (ImportedRecord, records))
+            pings += len(created)
+            self.progress('seed rows', min(done, len(seed_rows)), len(seed_rows))
+
+        return len(conversation_rows), pings
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from orbit.rollups import rebuild_activity_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard activity rollups from conversations and pings'
+
+    def handle(self, *args, **options):
+        created, updated, deleted = rebuild_activity_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Activity rollups rebuilt: {created} created, {updated} updated, {deleted} deleted"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orbit.person_stats import rebuild_person_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-person contact statistics and reach-out scores from conversations and pings'
+
+    def handle(self, *args, **options):
+        people = rebuild_person_stats()
+        self.stdout.write(self.style.SUCCESS(f"Contact statistics rebuilt for {people} people"))
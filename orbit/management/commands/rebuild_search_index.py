@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orbit.search import has_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search index from people and conversations'
+
+    def handle(self, *args, **options):
+        if not has_index():
+            self.stdout.write("This database is searched directly; there is no index to rebuild")
+            return
+        rows = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt with {rows} rows"))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orbit.summaries import BATCH_SIZE, DEFAULT_WORKERS, get_summarizer, summarize_people
+
+
+class Command(BaseCommand):
+    help = 'Generate ai_summary for people whose notes or public conversations changed since their last summary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Summarize everyone, changed or not')
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Summaries generated at once')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='People read and saved together')
+        parser.add_argument('--summarizer', help='Dotted path of the summarizer class (default: AI_SUMMARIZER)')
+
+    def handle(self, *args, **options):
+        try:
+            summarizer = get_summarizer(options['summarizer'])
+        except ImportError as error:
+            raise CommandError(f"Can't load summarizer: {error}")
+        self.verbosity = options['verbosity']
+        stats = summarize_people(
+            summarizer, workers=options['workers'], batch_size=options['batch_size'], force=options['force'],
+            progress=self.progress,
+        )
+        for person_id, message in stats.errors:
+            self.stderr.write(f"  {person_id}: {message}")
+        summary = (
+            f"Checked {stats.checked} people in {stats.elapsed:.1f}s ({stats.rate:.0f}/s): "
+            f"{stats.summarized} summarized, {stats.updated} updated, {stats.unchanged} unchanged"
+        )
+        if stats.failed:
+            raise CommandError(f"{summary}, {stats.failed} failed")
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def progress(self, stats):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f"  {stats.checked}/{stats.total} checked, {stats.summarized} summarized ({stats.rate:.0f} people/s)"
+            )
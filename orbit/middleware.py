@@ -0,0 +1,64 @@
+"""
+Request-level transaction handling for writes on SQLite.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS', 'TRACE'}
+
+# Seconds to wait before the first retry; doubled for each one after
+RETRY_BACKOFF = 0.05
+
+
+def is_locked_error(error):
+    # "database is locked", or "database table is locked" for shared-cache databases
+    return 'is locked' in str(error)
+
+
+class WriteTransactionMiddleware:
+    """Run each write request in one transaction, started with BEGIN IMMEDIATE.
+
+    Taking the write lock when the transaction starts means a busy database
+    makes the request wait at BEGIN, governed by busy_timeout, before the view
+    has done anything. If the lock is still held after that, BEGIN is retried
+    up to SQLITE_WRITE_RETRIES times with jittered backoff. Responses with an
+    error status roll the transaction back, so a failed request leaves no
+    partial writes. Reads stay in autocommit and never queue behind writers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if request.method in SAFE_METHODS or connection.vendor != 'sqlite':
+            return self.get_response(request)
+
+        atomic = self.begin()
+        try:
+            response = self.get_response(request)
+            if response.status_code >= 400:
+                transaction.set_rollback(True)
+        except BaseException as error:
+            if not atomic.__exit__(type(error), error, error.__traceback__):
+                raise
+        else:
+            atomic.__exit__(None, None, None)
+        return response
+
+    def begin(self):
+        """Enter an atomic block, retrying while the database is locked"""
+        retries = getattr(settings, 'SQLITE_WRITE_RETRIES', 0)
+        for attempt in range(retries + 1):
+            atomic = transaction.atomic()
+            try:
+                atomic.__enter__()
+                return atomic
+            except OperationalError as error:
+                if not is_locked_error(error) or attempt == retries:
+                    raise
+            time.sleep(RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
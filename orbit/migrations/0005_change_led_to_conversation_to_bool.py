@@ -1,6 +1,49 @@
 # Generated by Django 5.2.5 on 2025-09-02 00:47
 
 from django.db import migrations, models
+from django.db.migrations.exceptions import IrreversibleError
+
+
+def flag_fields(apps):
+    ContactAttempt = apps.get_model('orbit', 'ContactAttempt')
+    old_field = ContactAttempt._meta.get_field('led_to_conversation')
+    new_field = models.BooleanField(default=False)
+    new_field.set_attributes_from_name('led_to_conversation')
+    return ContactAttempt, old_field, new_field
+
+
+def change_column(apps, schema_editor):
+    """Replace the led_to_conversation foreign key with a flag.
+
+    SQLite rebuilds the table and casts the old values, as AlterField always
+    did. PostgreSQL can't cast uuid to boolean, so there the flag is set for
+    attempts that had a conversation and the old column is dropped.
+    """
+    ContactAttempt, old_field, new_field = flag_fields(apps)
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.alter_field(ContactAttempt, old_field, new_field)
+        return
+    table = schema_editor.quote_name(ContactAttempt._meta.db_table)
+    old_column = schema_editor.quote_name(old_field.column)
+    new_column = schema_editor.quote_name(new_field.column)
+    schema_editor.execute(f'ALTER TABLE {table} ADD COLUMN {new_column} boolean NOT NULL DEFAULT false')
+    schema_editor.execute(f'UPDATE {table} SET {new_column} = {old_column} IS NOT NULL')
+    schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN {new_column} DROP DEFAULT')
+    schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN {old_column}')
+
+
+def restore_column(apps, schema_editor):
+    """Turn the flag back into an empty foreign key, on SQLite only.
+
+    The flag doesn't say which conversation an attempt led to, so every
+    attempt comes back without one. The PostgreSQL column was dropped, and
+    that branch stays irreversible.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        raise IrreversibleError('Changing led_to_conversation back to a foreign key is only supported on SQLite')
+    ContactAttempt, old_field, new_field = flag_fields(apps)
+    schema_editor.alter_field(ContactAttempt, new_field, old_field)
+    ContactAttempt.objects.using(schema_editor.connection.alias).update(led_to_conversation=None)
 
 
 class Migration(migrations.Migration):
@@ -10,9 +53,14 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.AlterField(
-            model_name='contactattempt',
-            name='led_to_conversation',
-            field=models.BooleanField(default=False),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(change_column, restore_column)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='contactattempt',
+                    name='led_to_conversation',
+                    field=models.BooleanField(default=False),
+                ),
+            ],
         ),
     ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_activity_rollups(apps, schema_editor):
+    """Count existing conversations and pings into daily rollups"""
+    from django.db.models import Case, Count, F, IntegerField, When
+    ActivityRollup = apps.get_model('orbit', 'ActivityRollup')
+
+    rollups = []
+    for model_name, kind in [('Conversation', 'conversation'), ('ContactAttempt', 'contact_attempt')]:
+        model = apps.get_model('orbit', model_name)
+        rows = model.objects.exclude(
+            private=True, created_by__isnull=True
+        ).annotate(
+            scope_owner=Case(When(private=True, then=F('created_by')), default=None, output_field=IntegerField())
+        ).values('date', 'scope_owner').annotate(total=Count('id')).order_by()
+        for row in rows:
+            rollups.append(ActivityRollup(day=row['date'], kind=kind, owner_id=row['scope_owner'], count=row['total']))
+    ActivityRollup.objects.bulk_create(rollups)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0008_remove_old_birthday_field'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('kind', models.CharField(choices=[('conversation', 'Conversation'), ('contact_attempt', 'Ping')])),
+                ('count', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'kind'], name='activity_rollup_day_kind')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('owner__isnull', True)), fields=('day', 'kind'), name='unique_public_activity_rollup'), models.UniqueConstraint(condition=models.Q(('owner__isnull', False)), fields=('day', 'kind', 'owner'), name='unique_private_activity_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_activity_rollups, migrations.RunPython.noop),
+    ]
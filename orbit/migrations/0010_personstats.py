@@ -0,0 +1,81 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_person_stats(apps, schema_editor):
+    """Compute contact statistics for existing conversations and pings"""
+    from datetime import timedelta
+    from django.db.models import Case, Count, F, IntegerField, Max, Q, When
+    from django.utils import timezone
+    Conversation = apps.get_model('orbit', 'Conversation')
+    ContactAttempt = apps.get_model('orbit', 'ContactAttempt')
+    PersonStats = apps.get_model('orbit', 'PersonStats')
+
+    today = timezone.localdate()
+    stats = {}
+
+    def stats_for(person_id, owner_id):
+        if (person_id, owner_id) not in stats:
+            stats[(person_id, owner_id)] = PersonStats(person_id=person_id, owner_id=owner_id, computed_on=today)
+        return stats[(person_id, owner_id)]
+
+    rows = Conversation.participants.through.objects.exclude(
+        conversation__private=True, conversation__created_by__isnull=True
+    ).annotate(
+        scope_owner=Case(When(conversation__private=True, then=F('conversation__created_by')), default=None, output_field=IntegerField())
+    ).values('person_id', 'scope_owner').annotate(
+        last_contacted=Max('conversation__date'),
+        total=Count('conversation_id'),
+        six_months=Count('conversation_id', filter=Q(conversation__date__gte=today - timedelta(days=180))),
+        two_years=Count('conversation_id', filter=Q(conversation__date__gte=today - timedelta(days=730))),
+    ).order_by()
+    for row in rows:
+        row_stats = stats_for(row['person_id'], row['scope_owner'])
+        row_stats.last_contacted = row['last_contacted']
+        row_stats.total_conversations = row['total']
+        row_stats.conversations_6_months = row['six_months']
+        row_stats.conversations_2_years = row['two_years']
+
+    rows = ContactAttempt.objects.exclude(
+        private=True, created_by__isnull=True
+    ).annotate(
+        scope_owner=Case(When(private=True, then=F('created_by')), default=None, output_field=IntegerField())
+    ).values('person_id', 'scope_owner').annotate(last_pinged=Max('date')).order_by()
+    for row in rows:
+        stats_for(row['person_id'], row['scope_owner']).last_pinged = row['last_pinged']
+
+    PersonStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0009_activityrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_contacted', models.DateField(blank=True, null=True)),
+                ('last_pinged', models.DateField(blank=True, null=True)),
+                ('total_conversations', models.IntegerField(default=0)),
+                ('conversations_6_months', models.IntegerField(default=0)),
+                ('conversations_2_years', models.IntegerField(default=0)),
+                ('computed_on', models.DateField()),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contact_stats', to='orbit.person')),
+            ],
+            options={
+                'verbose_name_plural': 'person stats',
+                'indexes': [models.Index(fields=['owner', 'last_contacted'], name='person_stats_last_contacted'), models.Index(fields=['owner', 'conversations_2_years'], name='person_stats_2_years'), models.Index(fields=['computed_on'], name='person_stats_computed_on')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('owner__isnull', True)), fields=('person',), name='unique_public_person_stats'), models.UniqueConstraint(condition=models.Q(('owner__isnull', False)), fields=('person', 'owner'), name='unique_private_person_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_person_stats, migrations.RunPython.noop),
+    ]
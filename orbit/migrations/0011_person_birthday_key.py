@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:19
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0010_personstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='birthday_key',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('birthday_month'), '*', models.Value(100)), '+', models.F('birthday_day')), output_field=models.IntegerField()),
+        ),
+    ]
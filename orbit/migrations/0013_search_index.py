@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:48
+
+from django.db import migrations
+
+
+CREATE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS orbit_search USING fts5(
+        kind UNINDEXED, object_id UNINDEXED, owner_id UNINDEXED, label UNINDEXED,
+        name, location, notes, how_we_met, ai_summary,
+        tokenize = 'porter unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+
+INSERT_SQL = """
+    INSERT INTO orbit_search(rowid, kind, object_id, owner_id, label, name, location, notes, how_we_met, ai_summary)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def create_search_index(apps, schema_editor):
+    """Create the FTS5 table and index existing people and conversations"""
+    import hashlib
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Person = apps.get_model('orbit', 'Person')
+    Conversation = apps.get_model('orbit', 'Conversation')
+
+    def rowid(kind, pk):
+        digest = hashlib.blake2b(f'{kind}:{pk.hex}'.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') >> 1
+
+    rows = []
+    for person in Person.objects.iterator():
+        label = f'{person.name} ({person.name_ext})' if person.name_ext else person.name
+        rows.append([
+            rowid('person', person.pk), 'person', person.pk.hex, None, label,
+            ' '.join(filter(None, [person.name, person.name_ext])), person.location,
+            person.notes, person.how_we_met, person.ai_summary,
+        ])
+    for conversation in Conversation.objects.exclude(private=True, created_by__isnull=True).iterator():
+        rows.append([
+            rowid('conversation', conversation.pk), 'conversation', conversation.pk.hex,
+            conversation.created_by_id if conversation.private else None,
+            f'{conversation.get_type_display()} on {conversation.date}',
+            '', conversation.location, conversation.notes, '', '',
+        ])
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.executemany(INSERT_SQL, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS orbit_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0012_sync_tracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0013_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('person', 'Person'), ('conversation', 'Conversation')])),
+                ('source_id', models.BigIntegerField()),
+                ('object_id', models.UUIDField(blank=True, null=True)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'source_id'), name='unique_imported_record')],
+            },
+        ),
+    ]
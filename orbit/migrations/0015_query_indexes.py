@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0014_importedrecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactattempt',
+            index=models.Index(fields=['person', '-date'], name='contactattempt_person_date'),
+        ),
+        migrations.AddIndex(
+            model_name='contactattempt',
+            index=models.Index(fields=['-date', 'id'], name='contactattempt_date'),
+        ),
+        migrations.AddIndex(
+            model_name='contactattempt',
+            index=models.Index(fields=['private', 'created_by', '-date'], name='contactattempt_visibility_date'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['-date', 'id'], name='conversation_date'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['private', 'created_by', '-date'], name='conversation_visibility_date'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['birthday_month', 'birthday_day'], name='person_birthday'),
+        ),
+        # The auto-created participants table can't declare indexes. Its unique
+        # constraint covers (conversation_id, person_id); this covers the reverse
+        # lookup of a person's conversations without touching the table itself.
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS conversation_participants_person '
+            'ON orbit_conversation_participants (person_id, conversation_id)',
+            'DROP INDEX IF EXISTS conversation_participants_person',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0015_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='ai_summary_hash',
+            field=models.CharField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0016_person_ai_summary_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReachOutScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('cadence_days', models.FloatField()),
+                ('last_contact', models.DateField()),
+                ('contact_days', models.IntegerField()),
+                ('computed_on', models.DateField()),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reach_out_scores', to='orbit.person')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', '-score'], name='reach_out_ranking'), models.Index(fields=['computed_on'], name='reach_out_computed_on')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('owner__isnull', True)), fields=('person',), name='unique_public_reach_out_score'), models.UniqueConstraint(condition=models.Q(('owner__isnull', False)), fields=('person', 'owner'), name='unique_private_reach_out_score')],
+            },
+        ),
+    ]
@@ -15,11 +15,21 @@ class Person(models.Model):
     birthday_month = models.IntegerField(blank=True, null=True, choices=[(i, i) for i in range(1, 13)])
     birthday_day = models.IntegerField(blank=True, null=True, choices=[(i, i) for i in range(1, 32)])
     birth_year = models.IntegerField(blank=True, null=True)
+    # Month * 100 + day (e.g. 1231), so birthdays sort and range-filter in calendar order
+    birthday_key = models.GeneratedField(
+        expression=models.F('birthday_month') * 100 + models.F('birthday_day'),
+        output_field=models.IntegerField(),
+        db_persist=True,
+        db_index=True,
+    )
     how_we_met = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     ai_summary = models.TextField(blank=True)
+    # Hash of the inputs ai_summary was generated from (see orbit.summaries)
+    ai_summary_hash = models.CharField(blank=True, editable=False)
     created_by = models.ForeignKey(User, null=True, on_delete=models.CASCADE, related_name='created_people')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         if self.name_ext:
@@ -73,6 +83,27 @@ class Person(models.Model):
             except ValueError:
                 return None
         return None
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['birthday_month', 'birthday_day'], name='person_birthday'),
+        ]
+
+
+class VisibilityQuerySet(models.QuerySet):
+    """Rows that are either public or private to their creator (conversations and pings)"""
+    
+    def visible_to(self, user):
+        """Public rows plus `user`'s private ones; only public rows without a user.
+        
+        Kept as a single OR rather than a union of the public and private
+        branches: SQLite answers date-ordered pages by walking the (-date, id)
+        index until the page is full, and filtered counts from whichever index
+        is most selective. benchmarks/visibility.py compares the two.
+        """
+        if user is None or not user.is_authenticated:
+            return self.filter(private=False)
+        return self.filter(models.Q(private=False) | models.Q(private=True, created_by=user))
 
 
 class Conversation(models.Model):
@@ -94,6 +125,9 @@ class Conversation(models.Model):
     private = models.BooleanField(default=False)
     created_by = models.ForeignKey(User, null=True, on_delete=models.CASCADE, related_name='created_conversations')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    objects = VisibilityQuerySet.as_manager()
     
     def __str__(self):
         participant_names = ", ".join([p.name for p in self.participants.all()])
@@ -101,6 +135,11 @@ class Conversation(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            # Lists page by (-date, id); visibility is public rows plus the user's private ones
+            models.Index(fields=['-date', 'id'], name='conversation_date'),
+            models.Index(fields=['private', 'created_by', '-date'], name='conversation_visibility_date'),
+        ]
 
 
 class ContactAttempt(models.Model):
@@ -121,12 +160,20 @@ class ContactAttempt(models.Model):
     private = models.BooleanField(default=False)
     created_by = models.ForeignKey(User, null=True, on_delete=models.CASCADE, related_name='created_contact_attempts')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    objects = VisibilityQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.date} - {self.type} to {self.person.name}"
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['person', '-date'], name='contactattempt_person_date'),
+            models.Index(fields=['-date', 'id'], name='contactattempt_date'),
+            models.Index(fields=['private', 'created_by', '-date'], name='contactattempt_visibility_date'),
+        ]
 
 
 class Relationship(models.Model):
@@ -146,9 +193,181 @@ class Relationship(models.Model):
     description = models.CharField(blank=True)
     created_by = models.ForeignKey(User, null=True, on_delete=models.CASCADE, related_name='created_relationships')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f"{self.person1.name} - {self.person2.name} ({self.relationship_type})"
     
     class Meta:
-        unique_together = ['person1', 'person2']
\ No newline at end of file
+        unique_together = ['person1', 'person2']
+
+
+class PersonStats(models.Model):
+    """Contact statistics for one person within one visibility scope.
+
+    Like ActivityRollup, public conversations and pings are counted in the row
+    without an owner and private ones under their creator. Recomputed by the
+    handlers in orbit/signals.py whenever conversations, participants or pings
+    change; the trailing-window counts are refreshed once a day.
+    """
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='contact_stats')
+    owner = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    last_contacted = models.DateField(null=True, blank=True)
+    last_pinged = models.DateField(null=True, blank=True)
+    total_conversations = models.IntegerField(default=0)
+    conversations_6_months = models.IntegerField(default=0)
+    conversations_2_years = models.IntegerField(default=0)
+    computed_on = models.DateField()
+
+    def __str__(self):
+        scope = self.owner.username if self.owner_id else 'public'
+        return f"{self.person.name} ({scope})"
+
+    class Meta:
+        verbose_name_plural = 'person stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['person'], condition=models.Q(owner__isnull=True),
+                name='unique_public_person_stats',
+            ),
+            models.UniqueConstraint(
+                fields=['person', 'owner'], condition=models.Q(owner__isnull=False),
+                name='unique_private_person_stats',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'last_contacted'], name='person_stats_last_contacted'),
+            models.Index(fields=['owner', 'conversations_2_years'], name='person_stats_2_years'),
+            models.Index(fields=['computed_on'], name='person_stats_computed_on'),
+        ]
+
+
+class ReachOutScore(models.Model):
+    """How overdue a person is for contact, relative to their usual cadence.
+
+    Scoped like PersonStats, except that a private row covers its owner's whole
+    view: public contacts plus their private ones. Users without private
+    contacts with a person see the public row. Recomputed with the person's
+    stats (see orbit/reach_out.py); `score` is re-aged once a day.
+    """
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='reach_out_scores')
+    owner = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    # Days since the last contact divided by cadence_days; 1.0 means contact is due today
+    score = models.FloatField()
+    # Median days between consecutive contact dates
+    cadence_days = models.FloatField()
+    last_contact = models.DateField()
+    contact_days = models.IntegerField()
+    computed_on = models.DateField()
+
+    def __str__(self):
+        scope = self.owner.username if self.owner_id else 'public'
+        return f"{self.person.name} ({scope}): {self.score:.2f}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['person'], condition=models.Q(owner__isnull=True),
+                name='unique_public_reach_out_score',
+            ),
+            models.UniqueConstraint(
+                fields=['person', 'owner'], condition=models.Q(owner__isnull=False),
+                name='unique_private_reach_out_score',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-score'], name='reach_out_ranking'),
+            models.Index(fields=['computed_on'], name='reach_out_computed_on'),
+        ]
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row, so clients syncing with ?updated_since= can drop it.
+
+    `owner` follows the ActivityRollup convention: empty for rows everyone could
+    see, the creator for private rows.
+    """
+    MODELS = [
+        ('person', 'Person'),
+        ('conversation', 'Conversation'),
+        ('contactattempt', 'Contact Attempt'),
+        ('relationship', 'Relationship'),
+    ]
+
+    model = models.CharField(choices=MODELS)
+    object_id = models.UUIDField()
+    owner = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at}"
+
+    class Meta:
+        ordering = ['-deleted_at']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_at'),
+        ]
+
+
+class ActivityRollup(models.Model):
+    """Daily count of conversations or pings for one visibility scope.
+
+    Public rows have no owner; private rows are counted under the user who
+    created them. Kept up to date by the handlers in orbit/signals.py and
+    reconciled by `python manage.py rebuild_activity_rollups`.
+    """
+    KINDS = [
+        ('conversation', 'Conversation'),
+        ('contact_attempt', 'Ping'),
+    ]
+
+    day = models.DateField()
+    kind = models.CharField(choices=KINDS)
+    owner = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        scope = self.owner.username if self.owner_id else 'public'
+        return f"{self.day} - {self.kind} ({scope}): {self.count}"
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'kind'], condition=models.Q(owner__isnull=True),
+                name='unique_public_activity_rollup',
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'kind', 'owner'], condition=models.Q(owner__isnull=False),
+                name='unique_private_activity_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'kind'], name='activity_rollup_day_kind'),
+        ]
+
+
+class ImportedRecord(models.Model):
+    """Maps a row of the historical CSV export to what `import_historical` created from it.
+
+    Lets an interrupted import resume: rows with a record are skipped and
+    their people are reused for participants and relationships. Seed rows
+    imported as pings have no single object, so `object_id` is empty.
+    """
+    SOURCES = [
+        ('person', 'Person'),
+        ('conversation', 'Conversation'),
+    ]
+
+    source = models.CharField(choices=SOURCES)
+    source_id = models.BigIntegerField()
+    object_id = models.UUIDField(null=True, blank=True)
+    imported_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.source} {self.source_id} -> {self.object_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_id'], name='unique_imported_record'),
+        ]
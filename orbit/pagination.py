@@ -0,0 +1,101 @@
+"""
+Pagination for date-ordered lists (conversations and pings).
+
+Page-number pagination stays the default for existing clients. Passing
+?pagination=cursor (or following a `next` link that carries ?cursor=)
+switches to keyset pagination ordered by (-date, id): each page is a single
+indexed range query with no COUNT(*) or OFFSET, and cursors point at a row
+rather than a position, so rows inserted while a client is paging never
+shift or repeat results.
+"""
+import base64
+import json
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class DateKeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by('-date', 'id')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            cursor_date, cursor_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(date__lt=cursor_date) | Q(date=cursor_date, id__gt=cursor_id))
+
+        # Fetch one extra row to learn whether another page exists
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.last = results[-1] if results else None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, instance):
+        payload = json.dumps([instance.date.isoformat(), str(instance.id)])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            cursor_date, cursor_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return date.fromisoformat(cursor_date), uuid.UUID(cursor_id)
+        except (AttributeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class DatePagination(PageNumberPagination):
+    """Page-number pagination, or keyset pagination when the client asks for cursors"""
+    keyset_class = DateKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (request.query_params.get('pagination') == 'cursor'
+                or self.keyset_class.cursor_query_param in request.query_params):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class SizedPagination(PageNumberPagination):
+    """Page-number pagination with a client-chosen ?page_size="""
+    page_size_query_param = 'page_size'
+    max_page_size = DateKeysetPagination.max_page_size
@@ -0,0 +1,78 @@
+"""
+Run independent read-only tasks concurrently on a shared, bounded thread pool.
+
+Each pool thread has its own database connection, which it treats like a
+request thread does: around every task, close_old_connections() drops it
+only once it's past CONN_MAX_AGE or unusable, so threads reuse their
+connection rather than reconnecting for each section. With
+DATABASE_POOL_MAX_SIZE set, CONN_MAX_AGE is 0 and every close returns the
+connection to the pool. Rows written in an open transaction are invisible
+to other connections, so inside an atomic block (which includes every
+TestCase test) the tasks run one after another on the calling thread.
+close_pool_connections() closes the threads' connections outright, e.g.
+before a test database is dropped.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def close_pool_connections():
+    """Close every pool thread's database connections"""
+    with _executor_lock:
+        executor, workers = _executor, _executor_workers
+    if executor is None:
+        return
+    # Each thread blocks until all of them hold a close, so every thread runs one
+    barrier = threading.Barrier(workers, timeout=10)
+
+    def close():
+        barrier.wait()
+        connections.close_all()
+
+    for future in [executor.submit(close) for _ in range(workers)]:
+        future.result()
+
+
+def _get_executor():
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None:
+            _executor_workers = settings.DASHBOARD_WORKERS
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix='orbit')
+        return _executor
+
+
+def _timed(task):
+    start = time.perf_counter()
+    result = task()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _run_on_pool_thread(task):
+    close_old_connections()
+    try:
+        return _timed(task)
+    finally:
+        close_old_connections()
+
+
+def run_concurrently(tasks):
+    """Call each task in `tasks` ({name: callable}) and return ({name: result}, {name: milliseconds})"""
+    if len(tasks) < 2 or settings.DASHBOARD_WORKERS < 2 or connection.in_atomic_block:
+        outcomes = {name: _timed(task) for name, task in tasks.items()}
+    else:
+        executor = _get_executor()
+        futures = {name: executor.submit(_run_on_pool_thread, task) for name, task in tasks.items()}
+        outcomes = {name: future.result() for name, future in futures.items()}
+    results = {name: result for name, (result, _) in outcomes.items()}
+    timings = {name: elapsed for name, (_, elapsed) in outcomes.items()}
+    return results, timings
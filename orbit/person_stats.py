@@ -0,0 +1,141 @@
+"""
+Denormalized per-person contact statistics.
+
+PersonStats rows are recomputed for the affected people whenever a
+conversation, its participants or a ping changes, so list and dashboard
+queries can read stored columns instead of aggregating over the
+participants join on every request. Reach-out scores (orbit/reach_out.py)
+are recomputed along with them.
+"""
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Person, PersonStats, Conversation, ContactAttempt
+from .reach_out import refresh_reach_out_scores
+from .rollups import visibility_scope
+
+
+# Trailing windows used by the dashboard's top contacts and reach-out lists
+SIX_MONTHS = timedelta(days=30 * 6)
+TWO_YEARS = timedelta(days=730)
+
+BATCH_SIZE = 500
+
+# Primary keys of people and users whose deletion is in progress on this thread.
+# Cascaded deletes fire our handlers before the parent row is removed, and
+# recreating stats for a row about to disappear would violate its foreign key.
+_pending_deletes = threading.local()
+
+
+def _pending_keys():
+    if not hasattr(_pending_deletes, 'keys'):
+        _pending_deletes.keys = set()
+    return _pending_deletes.keys
+
+
+def pending_deletes(model):
+    return {pk for key_model, pk in _pending_keys() if key_model is model}
+
+
+def mark_pending_delete(model, pk):
+    _pending_keys().add((model, pk))
+
+
+def clear_pending_delete(model, pk):
+    _pending_keys().discard((model, pk))
+
+
+def visible_stats(user, prefix='contact_stats__'):
+    """Filter selecting the stats rows `user` can see: public plus their own private scope"""
+    return Q(**{f'{prefix}owner__isnull': True}) | Q(**{f'{prefix}owner': user})
+
+
+def refresh_person_stats(person_ids, today=None, touch=True):
+    """Recompute every stats row for the given people
+
+    With `touch`, the people's updated_at is bumped as well, since their API
+    payload includes last_contacted and last_pinged.
+    """
+    today = today or timezone.localdate()
+    skipped_people = pending_deletes(Person)
+    skipped_owners = pending_deletes(User)
+    person_ids = {pk for pk in person_ids if pk is not None and pk not in skipped_people}
+    if not person_ids:
+        return
+
+    six_months_ago = today - SIX_MONTHS
+    two_years_ago = today - TWO_YEARS
+    stats = {}
+
+    def stats_for(person_id, owner_id):
+        key = (person_id, owner_id)
+        if key not in stats:
+            stats[key] = PersonStats(person_id=person_id, owner_id=owner_id, computed_on=today)
+        return stats[key]
+
+    Participation = Conversation.participants.through
+    conversation_rows = Participation.objects.filter(
+        person_id__in=person_ids
+    ).exclude(
+        conversation__private=True, conversation__created_by__isnull=True
+    ).annotate(
+        scope_owner=visibility_scope('conversation__')
+    ).values('person_id', 'scope_owner').annotate(
+        last_contacted=Max('conversation__date'),
+        total=Count('conversation_id'),
+        six_months=Count('conversation_id', filter=Q(conversation__date__gte=six_months_ago)),
+        two_years=Count('conversation_id', filter=Q(conversation__date__gte=two_years_ago)),
+    ).order_by()
+    for row in conversation_rows:
+        row_stats = stats_for(row['person_id'], row['scope_owner'])
+        row_stats.last_contacted = row['last_contacted']
+        row_stats.total_conversations = row['total']
+        row_stats.conversations_6_months = row['six_months']
+        row_stats.conversations_2_years = row['two_years']
+
+    ping_rows = ContactAttempt.objects.filter(
+        person_id__in=person_ids
+    ).exclude(
+        private=True, created_by__isnull=True
+    ).annotate(
+        scope_owner=visibility_scope()
+    ).values('person_id', 'scope_owner').annotate(
+        last_pinged=Max('date'),
+    ).order_by()
+    for row in ping_rows:
+        stats_for(row['person_id'], row['scope_owner']).last_pinged = row['last_pinged']
+
+    with transaction.atomic():
+        PersonStats.objects.filter(person_id__in=person_ids).delete()
+        PersonStats.objects.bulk_create([
+            row_stats for (person_id, owner_id), row_stats in stats.items()
+            if owner_id not in skipped_owners
+        ])
+        if touch:
+            Person.objects.filter(id__in=person_ids).update(updated_at=timezone.now())
+        # Cadences come from the same conversations and pings
+        refresh_reach_out_scores(person_ids, today=today, skipped_owners=skipped_owners)
+
+
+def refresh_stale_person_stats(today=None):
+    """Recompute stats computed before today so the trailing windows stay accurate"""
+    today = today or timezone.localdate()
+    stale_ids = list(
+        PersonStats.objects.filter(computed_on__lt=today).values_list('person_id', flat=True).distinct()
+    )
+    for start in range(0, len(stale_ids), BATCH_SIZE):
+        # Only the window counts change, and those are not part of the person payload
+        refresh_person_stats(stale_ids[start:start + BATCH_SIZE], today=today, touch=False)
+
+
+def rebuild_person_stats():
+    """Recompute stats for every person. Returns the number of people processed"""
+    person_ids = list(Person.objects.values_list('id', flat=True))
+    for start in range(0, len(person_ids), BATCH_SIZE):
+        refresh_person_stats(person_ids[start:start + BATCH_SIZE])
+    return len(person_ids)
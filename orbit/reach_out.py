@@ -0,0 +1,179 @@
+"""
+Reach-out recommendations from each person's contact cadence.
+
+A person's contact days are the dates of their conversations and pings. The
+median gap between consecutive contact days is their cadence, and the score
+is the days since the last contact divided by that cadence: 1.0 means a
+contact is due today, 2.0 that a whole cycle has been missed. People with
+fewer than MIN_CONTACT_DAYS contact days have no score.
+
+Scores are stored in ReachOutScore, one row per visibility scope. The row
+without an owner is computed from public contacts only. A user with private
+contacts with a person gets a row computed from the public contacts plus
+their own private ones. refresh_person_stats() calls
+refresh_reach_out_scores() for the people whose contacts changed, so scores
+follow every conversation and ping as it is logged. The cadence computation
+is vectorized over every affected person at once. Scores also rise with
+time; refresh_stale_reach_out_scores() re-ages rows computed before today
+from their stored cadence without reading any contacts. It runs from the
+age_reach_out_scores command once a day, not from requests, so until it runs
+the ranking keeps the previous day's order.
+
+reach_out_ranking() reads two index ranges on (owner, -score, id), each
+limited to the page: the user's own rows, and the public rows of people
+they have no row for. It never reads or sorts the rest of the table.
+"""
+import heapq
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Conversation, ContactAttempt, ReachOutScore
+from .rollups import visibility_scope
+
+
+MIN_CONTACT_DAYS = 3
+# Daily contact shouldn't make a day's silence look like a crisis
+MIN_CADENCE_DAYS = 7
+
+MAX_LIMIT = 100
+BATCH_SIZE = 500
+
+
+def cadences(groups, days, group_count):
+    """Contact statistics per group from parallel arrays of group numbers and day ordinals.
+
+    Returns three arrays indexed by group: the number of distinct contact
+    days, the last contact day, and the median gap in days between
+    consecutive contact days (NaN with fewer than two days).
+    """
+    order = np.lexsort((days, groups))
+    groups, days = groups[order], days[order]
+    # Several contacts on the same day count once
+    distinct = np.ones(len(days), dtype=bool)
+    distinct[1:] = (groups[1:] != groups[:-1]) | (days[1:] != days[:-1])
+    groups, days = groups[distinct], days[distinct]
+
+    counts = np.bincount(groups, minlength=group_count)
+    last = np.zeros(group_count, dtype=np.int64)
+    np.maximum.at(last, groups, days)
+
+    # Gaps between neighbours in the same group, then sorted within each group
+    same_group = groups[1:] == groups[:-1]
+    gap_groups = groups[1:][same_group]
+    gaps = np.diff(days)[same_group]
+    gaps = gaps[np.lexsort((gaps, gap_groups))]
+    gap_counts = np.bincount(gap_groups, minlength=group_count)
+    starts = np.cumsum(gap_counts) - gap_counts
+    medians = np.full(group_count, np.nan)
+    has_gaps = gap_counts > 0
+    low = starts[has_gaps] + (gap_counts[has_gaps] - 1) // 2
+    high = starts[has_gaps] + gap_counts[has_gaps] // 2
+    medians[has_gaps] = (gaps[low] + gaps[high]) / 2
+    return counts, last, medians
+
+
+def overdue_scores(last_days, cadence_days, today):
+    """Days since the last contact over the cadence, for arrays of day ordinals and cadences"""
+    return (today.toordinal() - last_days) / np.maximum(cadence_days, MIN_CADENCE_DAYS)
+
+
+def contact_days(person_ids):
+    """({person: public day ordinals}, {(person, owner): private day ordinals}) for `person_ids`"""
+    public, private = {}, {}
+    Participation = Conversation.participants.through
+    conversation_rows = Participation.objects.filter(person_id__in=person_ids).exclude(
+        conversation__private=True, conversation__created_by__isnull=True
+    ).annotate(
+        scope_owner=visibility_scope('conversation__')
+    ).values_list('person_id', 'scope_owner', 'conversation__date')
+    ping_rows = ContactAttempt.objects.filter(person_id__in=person_ids).exclude(
+        private=True, created_by__isnull=True
+    ).annotate(
+        scope_owner=visibility_scope()
+    ).values_list('person_id', 'scope_owner', 'date')
+    for rows in (conversation_rows, ping_rows):
+        for person_id, owner_id, day in rows.order_by():
+            if owner_id is None:
+                public.setdefault(person_id, []).append(day.toordinal())
+            else:
+                private.setdefault((person_id, owner_id), []).append(day.toordinal())
+    return public, private
+
+
+def refresh_reach_out_scores(person_ids, today=None, skipped_owners=()):
+    """Recompute every reach-out score for the given people"""
+    today = today or timezone.localdate()
+    person_ids = {pk for pk in person_ids if pk is not None}
+    if not person_ids:
+        return
+    public, private = contact_days(person_ids)
+
+    # One group per scope row; a private row sees the public days as well
+    keys, groups, days = [], [], []
+    scopes = [((person_id, None), person_days) for person_id, person_days in public.items()] + [
+        ((person_id, owner_id), public.get(person_id, []) + owner_days)
+        for (person_id, owner_id), owner_days in private.items() if owner_id not in skipped_owners
+    ]
+    for key, scope_days in scopes:
+        groups.append(np.full(len(scope_days), len(keys), dtype=np.int64))
+        days.append(np.asarray(scope_days, dtype=np.int64))
+        keys.append(key)
+
+    rows = []
+    if keys:
+        counts, last, medians = cadences(np.concatenate(groups), np.concatenate(days), len(keys))
+        scored = np.flatnonzero(counts >= MIN_CONTACT_DAYS)
+        scores = overdue_scores(last[scored], medians[scored], today)
+        for index, score in zip(scored.tolist(), scores.tolist()):
+            person_id, owner_id = keys[index]
+            rows.append(ReachOutScore(
+                person_id=person_id, owner_id=owner_id, score=score, cadence_days=float(medians[index]),
+                last_contact=date.fromordinal(int(last[index])),
+                contact_days=int(counts[index]), computed_on=today,
+            ))
+
+    with transaction.atomic():
+        ReachOutScore.objects.filter(person_id__in=person_ids).delete()
+        ReachOutScore.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def refresh_stale_reach_out_scores(today=None):
+    """Re-age scores computed before today and return how many there were.
+
+    Contacts haven't changed, only the days since the last one.
+    """
+    today = today or timezone.localdate()
+    stale = list(
+        ReachOutScore.objects.filter(computed_on__lt=today).values_list('pk', 'last_contact', 'cadence_days')
+    )
+    if not stale:
+        return 0
+    pks, last_contacts, cadence_days = zip(*stale)
+    scores = overdue_scores(
+        np.array([day.toordinal() for day in last_contacts], dtype=np.int64), np.array(cadence_days), today
+    )
+    ReachOutScore.objects.bulk_update(
+        [ReachOutScore(pk=pk, score=score, computed_on=today) for pk, score in zip(pks, scores.tolist())],
+        ['score', 'computed_on'], batch_size=BATCH_SIZE,
+    )
+    return len(stale)
+
+
+def reach_out_ranking(user, limit):
+    """The `limit` most overdue scores `user` can see, most overdue first, with their people"""
+    ranked = ReachOutScore.objects.select_related('person').order_by('-score', 'pk')
+    own = ranked.filter(owner=user)
+    # The public row is shadowed wherever the user has their own
+    public = ranked.filter(owner__isnull=True).exclude(
+        person__in=ReachOutScore.objects.filter(owner=user).values('person')
+    )
+    rows = heapq.merge(own[:limit], public[:limit], key=lambda row: (-row.score, row.pk))
+    return list(rows)[:limit]
+
+
+def current_score(row, today):
+    """`row`'s score as of `today`, whether or not it has been re-aged yet"""
+    return float(overdue_scores(row.last_contact.toordinal(), row.cadence_days, today))
@@ -0,0 +1,113 @@
+"""
+Daily activity rollups backing the dashboard chart and activity counts.
+
+Each ActivityRollup row counts the conversations or pings on one day for one
+visibility scope: public rows (owner is empty) or one user's private rows.
+A user sees the public rows plus their own private rows, which matches the
+privacy filter used by the API views.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+
+from .models import ActivityRollup, Conversation, ContactAttempt
+
+
+ROLLUP_KINDS = {
+    Conversation: 'conversation',
+    ContactAttempt: 'contact_attempt',
+}
+
+
+def visibility_scope(prefix=''):
+    """Expression giving the owner whose scope a row counts under (NULL for public rows)"""
+    return Case(
+        When(**{f'{prefix}private': True}, then=F(f'{prefix}created_by')),
+        default=None,
+        output_field=IntegerField(),
+    )
+
+
+def rollup_key(model, day, private, created_by_id):
+    """Return the (day, kind, owner_id) bucket for a row, or None if nobody can see it"""
+    if private:
+        if created_by_id is None:
+            # Private rows without a creator are invisible to everyone
+            return None
+        owner_id = created_by_id
+    else:
+        owner_id = None
+    day = model._meta.get_field('date').to_python(day)
+    return (day, ROLLUP_KINDS[model], owner_id)
+
+
+def instance_rollup_key(instance):
+    """Return the rollup bucket for a Conversation or ContactAttempt instance"""
+    return rollup_key(type(instance), instance.date, instance.private, instance.created_by_id)
+
+
+def apply_rollup_delta(key, delta):
+    """Add `delta` to the count of a rollup bucket, creating the row if needed"""
+    if key is None or not delta:
+        return
+    day, kind, owner_id = key
+    rows = ActivityRollup.objects.filter(day=day, kind=kind, owner_id=owner_id)
+    with transaction.atomic():
+        if rows.update(count=F('count') + delta) or delta < 0:
+            # A missing row on a decrement is drift; the rebuild command fixes it
+            return
+        try:
+            with transaction.atomic():
+                ActivityRollup.objects.create(day=day, kind=kind, owner_id=owner_id, count=delta)
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(count=F('count') + delta)
+
+
+def _expected_rollups():
+    """Count every visible conversation and ping by (day, kind, owner_id)"""
+    expected = {}
+    for model, kind in ROLLUP_KINDS.items():
+        rows = model.objects.exclude(
+            private=True, created_by__isnull=True
+        ).annotate(
+            scope_owner=visibility_scope()
+        ).values('date', 'scope_owner').annotate(total=Count('id')).order_by()
+        for row in rows:
+            expected[(row['date'], kind, row['scope_owner'])] = row['total']
+    return expected
+
+
+def rebuild_activity_rollups():
+    """Recompute all rollups from the source tables.
+
+    Returns a (created, updated, deleted) tuple of row counts.
+    """
+    with transaction.atomic():
+        expected = _expected_rollups()
+        to_update = []
+        to_delete = []
+        for rollup in ActivityRollup.objects.all():
+            key = (rollup.day, rollup.kind, rollup.owner_id)
+            count = expected.pop(key, 0)
+            if count == 0:
+                to_delete.append(rollup.pk)
+            elif count != rollup.count:
+                rollup.count = count
+                to_update.append(rollup)
+
+        ActivityRollup.objects.filter(pk__in=to_delete).delete()
+        ActivityRollup.objects.bulk_update(to_update, ['count'])
+        ActivityRollup.objects.bulk_create([
+            ActivityRollup(day=day, kind=kind, owner_id=owner_id, count=count)
+            for (day, kind, owner_id), count in expected.items()
+        ])
+    return len(expected), len(to_update), len(to_delete)
+
+
+def activity_by_day(user, since):
+    """Return {(day, kind): count} of activity visible to `user` on or after `since`"""
+    rows = ActivityRollup.objects.filter(
+        Q(owner__isnull=True) | Q(owner=user),
+        day__gte=since,
+    ).values('day', 'kind').annotate(total=Sum('count')).order_by()
+    return {(row['day'], row['kind']): row['total'] for row in rows}
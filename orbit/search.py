@@ -0,0 +1,265 @@
+"""
+Full-text search over people and conversations.
+
+The index is an SQLite FTS5 table, `orbit_search`, with one row per person
+or conversation. Signal handlers keep it in sync with the models.
+`python manage.py rebuild_search_index` recreates every row after bulk edits.
+
+Each row stores its visibility scope the same way ActivityRollup does: no
+owner for public rows, the creator for private conversations. A query only
+matches rows the caller can see, and results are ranked with BM25.
+
+FTS5 is SQLite-only. On PostgreSQL there is no index table: search() runs
+the same query against the people and conversations tables with Postgres
+full-text functions, and the indexing functions do nothing.
+"""
+import hashlib
+import html
+import re
+import uuid
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import TextField, Value
+from django.db.models.functions import Concat
+
+from .models import Person, Conversation
+
+
+# Created by migration 0013_search_index
+TABLE = 'orbit_search'
+
+# Indexed columns after kind, object_id, owner_id and label, in table order
+COLUMNS = ['name', 'location', 'notes', 'how_we_met', 'ai_summary']
+
+# BM25 weight per column, in table order; the unindexed columns come first
+WEIGHTS = [0, 0, 0, 0, 10.0, 4.0, 2.0, 2.0, 1.0]
+
+# Postgres weight classes for the same columns, and the text search configuration
+# (English stemming, like FTS5's porter tokenizer)
+VECTOR_WEIGHTS = {'name': 'A', 'location': 'B', 'notes': 'C', 'how_we_met': 'C', 'ai_summary': 'D'}
+VECTOR_CONFIG = 'english'
+
+MAX_LIMIT = 100
+BATCH_SIZE = 500
+
+# Placeholders the snippet marks matches with, swapped for <mark> after escaping
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+
+def person_row(person):
+    return [
+        'person', person.pk.hex, None, str(person),
+        ' '.join(filter(None, [person.name, person.name_ext])), person.location,
+        person.notes, person.how_we_met, person.ai_summary,
+    ]
+
+
+def conversation_label(conversation):
+    return f'{conversation.get_type_display()} on {conversation.date}'
+
+
+def conversation_row(conversation):
+    if conversation.private and conversation.created_by_id is None:
+        # Private rows without a creator are visible to nobody
+        return None
+    return [
+        'conversation', conversation.pk.hex,
+        conversation.created_by_id if conversation.private else None,
+        conversation_label(conversation),
+        '', conversation.location, conversation.notes, '', '',
+    ]
+
+
+ROW_BUILDERS = {
+    Person: ('person', person_row),
+    Conversation: ('conversation', conversation_row),
+}
+
+_INSERT_SQL = f"INSERT INTO {TABLE}(rowid, kind, object_id, owner_id, label, {', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * (5 + len(COLUMNS)))})"
+_DELETE_SQL = f'DELETE FROM {TABLE} WHERE rowid = %s'
+
+
+def has_index():
+    """Whether this database has the FTS5 table (SQLite only)"""
+    return connection.vendor == 'sqlite'
+
+
+def search_rowid(kind, pk):
+    """Stable 63-bit rowid for an object.
+
+    UNINDEXED columns can't be looked up without a full scan, so rows are
+    addressed by a rowid hashed from the kind and primary key instead.
+    """
+    digest = hashlib.blake2b(f'{kind}:{pk.hex}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+
+def index_instance(instance):
+    index_instances([instance])
+
+
+def index_instances(instances):
+    """Replace the index rows of several people or conversations at once"""
+    if not has_index():
+        return
+    deletes, inserts = [], []
+    for instance in instances:
+        kind, build = ROW_BUILDERS[type(instance)]
+        rowid = search_rowid(kind, instance.pk)
+        row = build(instance)
+        deletes.append([rowid])
+        if row is not None:
+            inserts.append([rowid, *row])
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(_DELETE_SQL, deletes)
+        if inserts:
+            cursor.executemany(_INSERT_SQL, inserts)
+
+
+def unindex_instance(instance):
+    if not has_index():
+        return
+    kind, _ = ROW_BUILDERS[type(instance)]
+    with connection.cursor() as cursor:
+        cursor.execute(_DELETE_SQL, [search_rowid(kind, instance.pk)])
+
+
+def rebuild_search_index():
+    """Recreate every index row; returns the number of rows indexed"""
+    if not has_index():
+        return 0
+    indexed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for model, (kind, build) in ROW_BUILDERS.items():
+            rows = []
+            for instance in model.objects.order_by('pk').iterator(chunk_size=BATCH_SIZE):
+                row = build(instance)
+                if row is not None:
+                    rows.append([search_rowid(kind, instance.pk), *row])
+                if len(rows) >= BATCH_SIZE:
+                    cursor.executemany(_INSERT_SQL, rows)
+                    indexed += len(rows)
+                    rows = []
+            cursor.executemany(_INSERT_SQL, rows)
+            indexed += len(rows)
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+    return indexed
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix.
+
+    Words are quoted so user input can never be parsed as FTS5 syntax.
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _highlight(snippet):
+    return html.escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search(user, query, kind=None, limit=20):
+    """Return ranked matches visible to `user`, best first"""
+    if not has_index():
+        return search_tables(user, query, kind=kind, limit=limit)
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    sql = f"""
+        SELECT kind, object_id, label,
+               snippet({TABLE}, -1, %s, %s, '…', 12),
+               bm25({TABLE}, {', '.join(str(weight) for weight in WEIGHTS)}) AS rank
+        FROM {TABLE}
+        WHERE {TABLE} MATCH %s AND (owner_id IS NULL OR owner_id = %s)
+    """
+    params = [_MARK_START, _MARK_END, expression, user.pk]
+    if kind:
+        sql += ' AND kind = %s'
+        params.append(kind)
+    sql += ' ORDER BY rank LIMIT %s'
+    params.append(min(limit, MAX_LIMIT))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'kind': row_kind,
+            'id': str(uuid.UUID(object_id)),
+            'label': label,
+            'snippet': _highlight(snippet),
+            'rank': round(-rank, 3),
+        }
+        for row_kind, object_id, label, snippet, rank in rows
+    ]
+
+
+def tsquery_expression(query):
+    """match_expression() for PostgreSQL: every word must match, the last as a prefix.
+
+    Only word characters survive, so the result is always a valid raw tsquery.
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    return ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+
+
+def _vector(fields):
+    vector = None
+    for field in fields:
+        part = SearchVector(field, weight=VECTOR_WEIGHTS[field], config=VECTOR_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def _snippet(fields, tsquery):
+    text = Concat(*[part for field in fields for part in (field, Value('\n'))][:-1], output_field=TextField())
+    return SearchHeadline(
+        text, tsquery, config=VECTOR_CONFIG, start_sel=_MARK_START, stop_sel=_MARK_END,
+        max_words=12, min_words=4, max_fragments=2, fragment_delimiter=' … ',
+    )
+
+
+def search_tables(user, query, kind=None, limit=20):
+    """search() without the FTS5 table, for PostgreSQL"""
+    expression = tsquery_expression(query)
+    if expression is None:
+        return []
+    limit = min(limit, MAX_LIMIT)
+    tsquery = SearchQuery(expression, search_type='raw', config=VECTOR_CONFIG)
+    person_vector = SearchVector('name', 'name_ext', weight='A', config=VECTOR_CONFIG) + _vector(
+        ['location', 'notes', 'how_we_met', 'ai_summary']
+    )
+    sources = [
+        ('person', Person.objects.all(), person_vector, str,
+         ['name', 'name_ext', 'location', 'notes', 'how_we_met', 'ai_summary']),
+        ('conversation', Conversation.objects.visible_to(user), _vector(['location', 'notes']), conversation_label,
+         ['location', 'notes']),
+    ]
+    results = []
+    for source_kind, rows, vector, label, fields in sources:
+        if kind and kind != source_kind:
+            continue
+        rows = rows.annotate(
+            document=vector, rank=SearchRank(vector, tsquery), snippet=_snippet(fields, tsquery),
+        ).filter(document=tsquery).order_by('-rank', 'pk')[:limit]
+        results.extend(
+            {
+                'kind': source_kind,
+                'id': str(row.pk),
+                'label': label(row),
+                'snippet': _highlight(row.snippet),
+                'rank': round(row.rank, 3),
+            }
+            for row in rows
+        )
+    results.sort(key=lambda result: -result['rank'])
+    return results[:limit]
@@ -1,10 +1,62 @@
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from .models import Person, Conversation, ContactAttempt, Relationship
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.db.models import Count, Q
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """A primary key field that looks rows up in context['preloaded'] before querying.
+
+    context['preloaded'] maps a model to {pk: instance or None}, where None marks
+    a pk known not to exist. Bulk requests fill it for every item in one query,
+    and with many=True a list of ids is loaded with one query instead of one per id.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return PreloadedManyRelatedField(**list_kwargs)
+
+    def key(self, data):
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            return None
+
+    def preload(self, values):
+        model = self.get_queryset().model
+        preloaded = self.context.setdefault('preloaded', {}).setdefault(model, {})
+        missing = {self.key(value) for value in values} - set(preloaded) - {None}
+        if missing:
+            preloaded.update(dict.fromkeys(missing))
+            preloaded.update(self.get_queryset().in_bulk(missing))
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.get_queryset().model, {})
+        key = self.key(data)
+        if key not in preloaded:
+            return super().to_internal_value(data)
+        if preloaded[key] is None:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[key]
+
+
+class PreloadedManyRelatedField(serializers.ManyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        self.child_relation.preload(data)
+        return [self.child_relation.to_internal_value(item) for item in data]
+
+
 class PersonThinSerializer(serializers.ModelSerializer):
     class Meta:
         model = Person
@@ -14,6 +66,7 @@ class PersonThinSerializer(serializers.ModelSerializer):
 
 class PersonSerializer(serializers.ModelSerializer):
     last_contacted = serializers.DateField(read_only=True)
+    last_pinged = serializers.DateField(read_only=True)
     created_by_username = serializers.ReadOnlyField(source='created_by.username')
     days_since_last_contact = serializers.SerializerMethodField()
 
@@ -23,23 +76,37 @@ class PersonSerializer(serializers.ModelSerializer):
             'id', 'name', 'name_ext', 'email', 'phone', 'location', 'address', 'company', 
             'birthday_month', 'birthday_day', 'birth_year', 'birthday', 'birthday_display', 'age',
             'how_we_met', 'notes', 'ai_summary', 'created_by_username', 
-            'created_at', 'last_contacted', 
+            'created_at', 'updated_at', 'last_contacted', 'last_pinged',
             'days_since_last_contact'
         ]
         read_only_fields = [
-            'created_at', 'last_contacted', 'created_by_username', 
+            'created_at', 'updated_at', 'last_contacted', 'last_pinged', 'created_by_username', 
             'days_since_last_contact',
             'birthday', 'birthday_display', 'age'
         ]
 
     def get_days_since_last_contact(self, obj):
         """Days since last conversation"""
-        obj.last_contacted = getattr(obj, 'last_contacted', None) or obj.last_contacted_date
+        if not hasattr(obj, 'last_contacted'):
+            # Querysets annotate last_contacted from the stats table; only fall back when they didn't
+            obj.last_contacted = obj.last_contacted_date
         if obj.last_contacted:
             return (timezone.now().date() - obj.last_contacted).days
         return None
 
 
+class PersonBirthdaySerializer(serializers.ModelSerializer):
+    """Just the fields the birthday views need, so no per-row queries are made"""
+
+    class Meta:
+        model = Person
+        fields = [
+            'id', 'name', 'name_ext', 'birthday_month', 'birthday_day', 'birth_year',
+            'birthday_display', 'age'
+        ]
+        read_only_fields = fields
+
+
 class PersonDetailedSerializer(PersonSerializer):
     recent_conversation_count = serializers.SerializerMethodField()
 
@@ -59,7 +126,7 @@ class PersonDetailedSerializer(PersonSerializer):
 
 class ConversationSerializer(serializers.ModelSerializer):
     participants = PersonThinSerializer(many=True, read_only=True)
-    participant_ids = serializers.PrimaryKeyRelatedField(
+    participant_ids = PreloadedPrimaryKeyRelatedField(
         many=True,
         queryset=Person.objects.all(),
         source='participants',
@@ -75,12 +142,13 @@ class ConversationSerializer(serializers.ModelSerializer):
         model = Conversation
         fields = [
             'id', 'participants', 'participant_ids', 'participant_names', 'date', 'type', 
-            'location', 'notes', 'private', 'created_by_username', 'created_at'
+            'location', 'notes', 'private', 'created_by_username', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'participants', 'participant_names', 'created_by_username']
+        read_only_fields = ['created_at', 'updated_at', 'participants', 'participant_names', 'created_by_username']
 
 
 class ContactAttemptSerializer(serializers.ModelSerializer):
+    person = PreloadedPrimaryKeyRelatedField(queryset=Person.objects.all())
     person_name = serializers.ReadOnlyField(source='person.name')
     created_by_username = serializers.ReadOnlyField(source='created_by.username')
 
@@ -88,9 +156,9 @@ class ContactAttemptSerializer(serializers.ModelSerializer):
         model = ContactAttempt
         fields = [
             'id', 'person', 'person_name', 'date', 'type', 'notes', 
-            'led_to_conversation', 'private', 'created_by_username', 'created_at'
+            'led_to_conversation', 'private', 'created_by_username', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'person_name', 'created_by_username']
+        read_only_fields = ['created_at', 'updated_at', 'person_name', 'created_by_username']
 
 
 class RelationshipSerializer(serializers.ModelSerializer):
@@ -102,6 +170,6 @@ class RelationshipSerializer(serializers.ModelSerializer):
         model = Relationship
         fields = [
             'id', 'person1', 'person1_name', 'person2', 'person2_name',
-            'relationship_type', 'description', 'created_by_username', 'created_at'
+            'relationship_type', 'description', 'created_by_username', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'person1_name', 'person2_name', 'created_by_username']
\ No newline at end of file
+        read_only_fields = ['created_at', 'updated_at', 'person1_name', 'person2_name', 'created_by_username']
\ No newline at end of file
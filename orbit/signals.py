@@ -0,0 +1,362 @@
+"""
+Signal handlers that keep derived tables in sync with writes.
+
+Bulk operations (queryset.update(), bulk_create()) bypass these handlers;
+the rebuild management commands reconcile any drift.
+"""
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Person, Conversation, ContactAttempt, Relationship, Tombstone
+from .activity import activity_store
+from .graph import relationship_graph
+from .dashboard_cache import invalidate_dashboards, invalidate_dashboards_for_row
+from .person_stats import refresh_person_stats, mark_pending_delete, clear_pending_delete, pending_deletes
+from .rollups import apply_rollup_delta, instance_rollup_key, rollup_key
+from .search import index_instance, unindex_instance
+from .suggestions import INDEXES as SUGGESTION_INDEXES
+from .sync import tombstone_owner
+
+
+TRACKED_FIELDS = {
+    Person: ['name', 'name_ext'],
+    Conversation: ['date', 'private', 'created_by_id'],
+    ContactAttempt: ['date', 'private', 'created_by_id', 'person_id'],
+}
+
+
+@receiver(pre_save, sender=Person)
+@receiver(pre_save, sender=Conversation)
+@receiver(pre_save, sender=ContactAttempt)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    """Capture the stored values so post_save can tell what an edit changed"""
+    instance._previous_values = None
+    if raw or instance._state.adding:
+        return
+    fields = set(TRACKED_FIELDS[sender])
+    for index in SUGGESTION_INDEXES.get(sender, []):
+        fields.update(index.fields)
+    instance._previous_values = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def _changed(instance):
+    """Return True if a new or edited instance differs from its stored values in a tracked field"""
+    previous = getattr(instance, '_previous_values', None)
+    if previous is None:
+        return True
+    return any(previous[field] != getattr(instance, field) for field in TRACKED_FIELDS[type(instance)])
+
+
+# Activity rollups
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_save, sender=ContactAttempt)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_values', None)
+    before = previous and rollup_key(sender, previous['date'], previous['private'], previous['created_by_id'])
+    after = instance_rollup_key(instance)
+    if before != after:
+        apply_rollup_delta(before, -1)
+        apply_rollup_delta(after, 1)
+
+
+@receiver(post_delete, sender=Conversation)
+@receiver(post_delete, sender=ContactAttempt)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    apply_rollup_delta(instance_rollup_key(instance), -1)
+
+
+# Person stats
+
+@receiver(pre_delete, sender=Person)
+@receiver(pre_delete, sender=User)
+def mark_deleting(sender, instance, **kwargs):
+    mark_pending_delete(sender, instance.pk)
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=User)
+def clear_deleting(sender, instance, **kwargs):
+    clear_pending_delete(sender, instance.pk)
+
+
+@receiver(post_save, sender=Conversation)
+def update_stats_on_conversation_save(sender, instance, created, raw=False, **kwargs):
+    # New conversations have no participants until they are added
+    if raw or created or not _changed(instance):
+        return
+    refresh_person_stats(instance.participants.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Conversation)
+def remember_participants(sender, instance, **kwargs):
+    instance._participant_ids = list(instance.participants.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Conversation)
+def update_stats_on_conversation_delete(sender, instance, **kwargs):
+    refresh_person_stats(getattr(instance, '_participant_ids', []))
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def update_stats_on_participants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # Remember who is being removed before the rows are gone
+        if reverse:
+            instance._cleared_person_ids = [instance.pk]
+        else:
+            instance._cleared_person_ids = list(instance.participants.values_list('id', flat=True))
+    elif action == 'post_clear':
+        refresh_person_stats(getattr(instance, '_cleared_person_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_person_stats([instance.pk] if reverse else pk_set)
+
+
+@receiver(post_save, sender=ContactAttempt)
+def update_stats_on_ping_save(sender, instance, raw=False, **kwargs):
+    if raw or not _changed(instance):
+        return
+    previous = getattr(instance, '_previous_values', None)
+    refresh_person_stats({instance.person_id, previous and previous['person_id']})
+
+
+@receiver(post_delete, sender=ContactAttempt)
+def update_stats_on_ping_delete(sender, instance, **kwargs):
+    refresh_person_stats([instance.person_id])
+
+
+# Dashboard cache
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_save, sender=ContactAttempt)
+def invalidate_dashboards_on_save(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_values', None)
+    if previous and (previous['private'], previous['created_by_id']) != (instance.private, instance.created_by_id):
+        invalidate_dashboards_for_row(previous['private'], previous['created_by_id'])
+    invalidate_dashboards_for_row(instance.private, instance.created_by_id)
+
+
+@receiver(post_delete, sender=Conversation)
+@receiver(post_delete, sender=ContactAttempt)
+def invalidate_dashboards_on_delete(sender, instance, **kwargs):
+    invalidate_dashboards_for_row(instance.private, instance.created_by_id)
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def invalidate_dashboards_on_participants_change(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # A person's conversations changed; they may span several scopes
+        invalidate_dashboards()
+    else:
+        invalidate_dashboards_for_row(instance.private, instance.created_by_id)
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+def invalidate_dashboards_on_person_change(sender, instance, **kwargs):
+    invalidate_dashboards()
+
+
+# Delta sync
+
+TOMBSTONE_MODELS = {
+    Person: 'person',
+    Conversation: 'conversation',
+    ContactAttempt: 'contactattempt',
+    Relationship: 'relationship',
+}
+
+
+def _record_tombstone(sender, pk, private=False, created_by_id=None):
+    recorded, owner_id = tombstone_owner(private, created_by_id)
+    if not recorded:
+        return
+    # Private rows of a user being deleted were never visible to anyone else.
+    # created_by is nullable, so a cascade may remove the user before or after
+    # its rows; check both the marker and the table.
+    if owner_id is not None and (
+        owner_id in pending_deletes(User) or not User.objects.filter(pk=owner_id).exists()
+    ):
+        return
+    Tombstone.objects.create(model=TOMBSTONE_MODELS[sender], object_id=pk, owner_id=owner_id)
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Conversation)
+@receiver(post_delete, sender=ContactAttempt)
+@receiver(post_delete, sender=Relationship)
+def record_tombstone_on_delete(sender, instance, **kwargs):
+    private = getattr(instance, 'private', False)
+    _record_tombstone(sender, instance.pk, private, getattr(instance, 'created_by_id', None))
+
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_save, sender=ContactAttempt)
+def record_tombstone_when_made_private(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_values', None)
+    if raw or not previous:
+        return
+    if not previous['private'] and instance.private:
+        # Other users can no longer see the row, so to them it is deleted
+        _record_tombstone(sender, instance.pk)
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def touch_conversations_on_participants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_conversation_ids = list(instance.conversations.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            conversation_ids = [instance.pk]
+        elif action == 'post_clear':
+            conversation_ids = getattr(instance, '_cleared_conversation_ids', [])
+        else:
+            conversation_ids = pk_set
+        Conversation.objects.filter(pk__in=conversation_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Person)
+def touch_related_rows_on_rename(sender, instance, created, raw=False, **kwargs):
+    """Conversations, pings and relationships include person names, so they change too"""
+    if raw or created or not _changed(instance):
+        return
+    now = timezone.now()
+    Conversation.objects.filter(participants=instance).update(updated_at=now)
+    ContactAttempt.objects.filter(person=instance).update(updated_at=now)
+    Relationship.objects.filter(Q(person1=instance) | Q(person2=instance)).update(updated_at=now)
+
+
+@receiver(pre_delete, sender=Person)
+def touch_conversations_on_person_delete(sender, instance, **kwargs):
+    Conversation.objects.filter(participants=instance).update(updated_at=timezone.now())
+
+
+# Search index
+
+@receiver(post_save, sender=Person)
+@receiver(post_save, sender=Conversation)
+def update_search_index_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_instance(instance)
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Conversation)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    unindex_instance(instance)
+
+
+# Suggestion indexes
+
+@receiver(post_save, sender=Person)
+@receiver(post_save, sender=Conversation)
+def update_suggestions_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_values', None)
+    for index in SUGGESTION_INDEXES[sender]:
+        before = previous and index.entry(previous)
+        after = index.instance_entry(instance)
+        if before != after:
+            # The indexes are shared by every request, so only apply committed changes
+            transaction.on_commit(partial(index.move, before, after))
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Conversation)
+def update_suggestions_on_delete(sender, instance, **kwargs):
+    for index in SUGGESTION_INDEXES[sender]:
+        entry = index.instance_entry(instance)
+        if entry is not None:
+            transaction.on_commit(partial(index.move, entry, None))
+
+
+# Relationship graph
+
+@receiver(post_save, sender=Relationship)
+def update_relationship_graph_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(partial(
+        relationship_graph.put, instance.pk, instance.person1_id, instance.person2_id, instance.relationship_type
+    ))
+
+
+@receiver(post_delete, sender=Relationship)
+def update_relationship_graph_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(relationship_graph.discard, instance.pk))
+
+
+# Activity store
+
+@receiver(post_save, sender=Conversation)
+def update_activity_on_conversation_save(sender, instance, created, raw=False, **kwargs):
+    # New conversations have no participants until they are added
+    if raw or created or not _changed(instance):
+        return
+    transaction.on_commit(partial(
+        activity_store.put_conversations,
+        [(instance.pk, instance.date, instance.private, instance.created_by_id)],
+    ))
+
+
+@receiver(post_delete, sender=Conversation)
+def update_activity_on_conversation_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(activity_store.discard_conversation, instance.pk))
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def update_activity_on_participants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        if reverse:
+            conversations = Conversation.objects.filter(pk__in=pk_set).values_list(
+                'id', 'date', 'private', 'created_by_id'
+            )
+            for conversation in conversations:
+                transaction.on_commit(partial(activity_store.add_participants, *conversation, [instance.pk]))
+        else:
+            transaction.on_commit(partial(
+                activity_store.add_participants,
+                instance.pk, instance.date, instance.private, instance.created_by_id, pk_set,
+            ))
+    elif action == 'post_remove':
+        if reverse:
+            transaction.on_commit(partial(activity_store.remove_participants, [instance.pk], pk_set))
+        else:
+            transaction.on_commit(partial(activity_store.remove_participants, pk_set, [instance.pk]))
+    elif action == 'post_clear':
+        if reverse:
+            transaction.on_commit(partial(activity_store.remove_participants, [instance.pk]))
+        else:
+            transaction.on_commit(partial(activity_store.discard_conversation, instance.pk))
+
+
+@receiver(post_save, sender=ContactAttempt)
+def update_activity_on_ping_save(sender, instance, raw=False, **kwargs):
+    if raw or not _changed(instance):
+        return
+    transaction.on_commit(partial(
+        activity_store.put_pings,
+        [(instance.pk, instance.person_id, instance.date, instance.private, instance.created_by_id)],
+    ))
+
+
+@receiver(post_delete, sender=ContactAttempt)
+def update_activity_on_ping_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(activity_store.discard_ping, instance.pk, instance.person_id))
+
+
+@receiver(post_delete, sender=Person)
+def update_activity_on_person_delete(sender, instance, **kwargs):
+    # Their participation rows go with them without m2m_changed
+    transaction.on_commit(partial(activity_store.discard_person, instance.pk))
@@ -0,0 +1,157 @@
+"""
+Ranked prefix autocomplete for the suggestion endpoints.
+
+A SuggestionIndex keeps, for each visibility scope, how many rows use each
+value of one model field. It also keeps a single sorted list of the distinct
+values, casefolded, which a prefix lookup bisects into. A lookup touches only
+the values sharing the prefix and never queries the database.
+
+Each index is built from one grouped query on first use. After that, signal
+handlers patch it once the writing transaction commits. Writes from other
+processes and bulk updates that bypass signals are picked up by a full
+rebuild once the index is REBUILD_AFTER seconds old.
+"""
+import bisect
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+
+from .models import Person, Conversation
+
+
+REBUILD_AFTER = 300
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class SuggestionIndex:
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.scoped = any(f.name == 'private' for f in model._meta.fields)
+        # Values an entry is computed from, as captured by the pre_save handler
+        self.fields = [field] + (['private', 'created_by_id'] if self.scoped else [])
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._counts = defaultdict(Counter)   # scope -> value -> rows using it
+        self._totals = Counter()              # value -> rows using it in any scope
+        self._keys = []                       # sorted (casefolded value, value)
+
+    def entry(self, values):
+        """Return the (value, scope) a row counts towards, or None if it counts nowhere"""
+        value = values[self.field]
+        if not value:
+            return None
+        if not self.scoped or not values['private']:
+            return value, None
+        if values['created_by_id'] is None:
+            # Private rows without a creator are visible to nobody
+            return None
+        return value, values['created_by_id']
+
+    def instance_entry(self, instance):
+        return self.entry({field: getattr(instance, field) for field in self.fields})
+
+    def reset(self):
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_built(self):
+        if self._built_at is not None and time.monotonic() - self._built_at < REBUILD_AFTER:
+            return
+        rows = self.model.objects.exclude(**{self.field: ''}).values_list(
+            *self.fields
+        ).annotate(uses=Count('pk')).order_by()
+        counts = defaultdict(Counter)
+        for *values, uses in rows:
+            entry = self.entry(dict(zip(self.fields, values)))
+            if entry is not None:
+                value, scope = entry
+                counts[scope][value] += uses
+        totals = Counter()
+        for scope_counts in counts.values():
+            totals.update(scope_counts)
+        with self._lock:
+            self._counts = counts
+            self._totals = totals
+            self._keys = sorted((value.casefold(), value) for value in totals)
+            self._built_at = time.monotonic()
+
+    def move(self, before, after):
+        """Move one row's use from entry `before` to entry `after`; either may be None"""
+        with self._lock:
+            if self._built_at is None:
+                # Not built yet; the first lookup will read the committed rows
+                return
+            if before is not None:
+                value, scope = before
+                self._counts[scope][value] -= 1
+                if self._counts[scope][value] <= 0:
+                    del self._counts[scope][value]
+                self._totals[value] -= 1
+                if self._totals[value] <= 0:
+                    del self._totals[value]
+                    key = (value.casefold(), value)
+                    position = bisect.bisect_left(self._keys, key)
+                    if position < len(self._keys) and self._keys[position] == key:
+                        del self._keys[position]
+            if after is not None:
+                value, scope = after
+                self._counts[scope][value] += 1
+                if value not in self._totals:
+                    bisect.insort(self._keys, (value.casefold(), value))
+                self._totals[value] += 1
+
+    def _visible_counts(self, user):
+        scopes = [self._counts.get(None, Counter())]
+        if self.scoped:
+            scopes.append(self._counts.get(user.pk, Counter()))
+        return scopes
+
+    def suggest(self, user, prefix, limit=DEFAULT_LIMIT):
+        """Return up to `limit` visible values starting with `prefix`, most used first"""
+        self._ensure_built()
+        folded = prefix.casefold()
+        with self._lock:
+            scopes = self._visible_counts(user)
+            candidates = []
+            position = bisect.bisect_left(self._keys, (folded,))
+            while position < len(self._keys) and self._keys[position][0].startswith(folded):
+                value = self._keys[position][1]
+                uses = sum(counts[value] for counts in scopes)
+                if uses:
+                    candidates.append((-uses, value))
+                position += 1
+        return [value for _, value in heapq.nsmallest(limit, candidates)]
+
+    def all_values(self, user):
+        """Every value visible to `user`, sorted.
+
+        Read from the database rather than the index, so the full list always
+        matches the ETag it is served with.
+        """
+        rows = self.model.objects.exclude(**{self.field: ''})
+        if self.scoped:
+            rows = rows.visible_to(user)
+        return sorted(set(rows.values_list(self.field, flat=True).distinct()))
+
+
+person_locations = SuggestionIndex(Person, 'location')
+person_companies = SuggestionIndex(Person, 'company')
+conversation_locations = SuggestionIndex(Conversation, 'location')
+
+INDEXES = {
+    Person: [person_locations, person_companies],
+    Conversation: [conversation_locations],
+}
+
+
+def reset_suggestion_indexes():
+    """Drop every index so the next lookup rebuilds it; used by tests between databases"""
+    for indexes in INDEXES.values():
+        for index in indexes:
+            index.reset()
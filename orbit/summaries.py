@@ -0,0 +1,255 @@
+"""
+Generated `Person.ai_summary` text.
+
+A summarizer turns a person's inputs (how we met, their notes and the notes of
+their most recent public conversations) into a short summary. The class named
+by settings.AI_SUMMARIZER is used; the default, ExtractiveSummarizer, picks
+the most representative sentences locally, so summaries work offline. Others
+subclass Summarizer.
+
+Only public conversations are used because the summary is shown to everyone
+who can see the person.
+
+Each person stores a hash of the inputs (and the summarizer) their summary was
+made from in ai_summary_hash. summarize_people() hashes everyone's current
+inputs in batches and only summarizes people whose hash changed, on a thread
+pool since summarizers backed by a remote model spend their time waiting.
+Saving uses bulk_update, so derived data is updated the same way as for the
+bulk API. Run it with `python manage.py summarize_people`.
+"""
+import hashlib
+import json
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .bulk import BulkChange, stored_values, update_derived_data
+from .models import Person, Conversation
+
+
+Participation = Conversation.participants.through
+
+# Conversations per person passed to the summarizer, most recent first
+MAX_CONVERSATIONS = 20
+
+BATCH_SIZE = 500
+DEFAULT_WORKERS = 4
+
+# Errors kept for reporting; the rest are only counted
+MAX_ERRORS = 10
+
+
+class SummaryInput:
+    """What a person's summary is generated from"""
+
+    def __init__(self, how_we_met='', notes='', conversations=()):
+        self.how_we_met = how_we_met
+        self.notes = notes
+        # (date, notes) pairs, most recent first
+        self.conversations = list(conversations)
+
+    def is_empty(self):
+        return not (self.how_we_met.strip() or self.notes.strip() or
+                    any(notes.strip() for _, notes in self.conversations))
+
+    def digest(self, summarizer):
+        """Hash of these inputs and the summarizer, as stored in Person.ai_summary_hash"""
+        payload = json.dumps([
+            summarizer.fingerprint(), self.how_we_met, self.notes,
+            [[day.isoformat(), notes] for day, notes in self.conversations],
+        ])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Summarizer:
+    """Base class for summarizers: implement summarize()"""
+
+    # Bump when the output for the same inputs changes, so everyone is re-summarized
+    version = '1'
+
+    def fingerprint(self):
+        return f'{type(self).__module__}.{type(self).__qualname__}:{self.version}'
+
+    def summarize(self, inputs):
+        """Return the summary text for a SummaryInput"""
+        raise NotImplementedError
+
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+WORD = re.compile(r"[a-z][a-z']+")
+STOPWORDS = frozenset("""
+    a about after again all also am an and any are as at be because been before being but by can could did do
+    does doing down for from had has have having he her here hers him his how i if in into is it its just me
+    more most my no not now of off on once only or other our out over own said she so some such than that the
+    their them then there these they this those through to too under until up very was we were what when where
+    which while who why will with would you your
+""".split())
+
+
+class ExtractiveSummarizer(Summarizer):
+    """Picks the sentences whose words recur most across everything known about the person"""
+
+    max_sentences = 3
+    max_length = 500
+
+    def summarize(self, inputs):
+        texts = [inputs.how_we_met, inputs.notes] + [notes for _, notes in inputs.conversations]
+        sentences = []
+        seen = set()
+        for text in texts:
+            for sentence in SENTENCE_BREAK.split(text):
+                sentence = ' '.join(sentence.split())
+                if sentence and sentence.lower() not in seen:
+                    seen.add(sentence.lower())
+                    sentences.append(sentence)
+        words = [[word for word in WORD.findall(sentence.lower()) if word not in STOPWORDS] for sentence in sentences]
+        frequencies = Counter(word for sentence_words in words for word in set(sentence_words))
+
+        def score(index):
+            if not words[index]:
+                return 0
+            return sum(frequencies[word] for word in words[index]) / len(words[index])
+
+        # Highest scoring first, earlier sentences winning ties; then back in source order
+        ranked = sorted(range(len(sentences)), key=lambda index: (-score(index), index))
+        chosen, length = [], 0
+        for index in ranked:
+            if len(chosen) == self.max_sentences:
+                break
+            if chosen and length + len(sentences[index]) > self.max_length:
+                continue
+            chosen.append(index)
+            length += len(sentences[index]) + 1
+        summary = ' '.join(sentences[index] for index in sorted(chosen))
+        return summary[:self.max_length]
+
+
+def get_summarizer(path=None):
+    """An instance of the summarizer class at dotted `path`, by default settings.AI_SUMMARIZER"""
+    return import_string(path or settings.AI_SUMMARIZER)()
+
+
+def summary_inputs(people):
+    """{person pk: SummaryInput} for `people`, reading their conversations in one query"""
+    conversations = {}
+    rows = Participation.objects.filter(
+        person_id__in=[person.pk for person in people], conversation__private=False,
+    ).order_by('-conversation__date', '-conversation_id').values_list(
+        'person_id', 'conversation__date', 'conversation__notes',
+    )
+    for person_id, day, notes in rows:
+        recent = conversations.setdefault(person_id, [])
+        if len(recent) < MAX_CONVERSATIONS:
+            recent.append((day, notes))
+    return {
+        person.pk: SummaryInput(person.how_we_met, person.notes, conversations.get(person.pk, ()))
+        for person in people
+    }
+
+
+class SummaryStats:
+    """Progress of a summarize_people() run"""
+
+    def __init__(self, total=0):
+        self.total = total
+        self.checked = 0      # people whose inputs were hashed
+        self.unchanged = 0    # hash matched, so skipped
+        self.summarized = 0   # summaries generated
+        self.updated = 0      # ai_summary text changed
+        self.failed = 0       # summarizer raised; retried on the next run
+        self.errors = []      # (person pk, message) for the first failures
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """People checked per second"""
+        return self.checked / self.elapsed if self.elapsed else 0.0
+
+
+def _summarize(summarizer, inputs):
+    """(summary, None), or (None, error) if the summarizer failed"""
+    if inputs.is_empty():
+        return '', None
+    try:
+        return summarizer.summarize(inputs), None
+    except Exception as error:
+        return None, error
+
+
+def _save(results, stats):
+    """Store (person, digest, summary) results; derived data only changes where the text did"""
+    now = timezone.now()
+    changes = []
+    for person, digest, summary in results:
+        if summary != person.ai_summary:
+            changes.append(BulkChange(person, stored_values(person)))
+            person.ai_summary = summary
+            person.updated_at = now
+        person.ai_summary_hash = digest
+    with transaction.atomic():
+        # People deleted since the batch was read must not get search index rows back
+        existing = set(
+            Person.objects.filter(pk__in=[person.pk for person, _, _ in results]).values_list('pk', flat=True)
+        )
+        changes = [change for change in changes if change.instance.pk in existing]
+        changed = {change.instance.pk for change in changes}
+        Person.objects.bulk_update(
+            [change.instance for change in changes], ['ai_summary', 'ai_summary_hash', 'updated_at'],
+        )
+        Person.objects.bulk_update(
+            [person for person, _, _ in results if person.pk in existing and person.pk not in changed],
+            ['ai_summary_hash'],
+        )
+        if changes:
+            update_derived_data(Person, changes)
+    stats.updated += len(changes)
+
+
+def summarize_people(summarizer=None, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE, force=False,
+                     progress=None):
+    """Summarize everyone whose inputs changed since their last summary, or everyone with `force`.
+
+    Calls `progress(stats)` after each batch and returns the final SummaryStats.
+    """
+    summarizer = summarizer or get_summarizer()
+    person_ids = list(Person.objects.order_by('pk').values_list('pk', flat=True))
+    stats = SummaryStats(total=len(person_ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='summarize') as executor:
+        for start in range(0, len(person_ids), batch_size):
+            # Only what the hash covers; full rows are loaded for the people being summarized
+            people = list(Person.objects.filter(pk__in=person_ids[start:start + batch_size]).only(
+                'how_we_met', 'notes', 'ai_summary_hash',
+            ))
+            inputs = summary_inputs(people)
+            digests = {person.pk: inputs[person.pk].digest(summarizer) for person in people}
+            stale_ids = [person.pk for person in people if force or digests[person.pk] != person.ai_summary_hash]
+            stats.checked += len(people)
+            stats.unchanged += len(people) - len(stale_ids)
+            # No query when nothing changed
+            stale = [(person, digests[pk]) for pk, person in Person.objects.in_bulk(stale_ids).items()]
+
+            results = []
+            outcomes = executor.map(lambda item: _summarize(summarizer, inputs[item[0].pk]), stale)
+            for (person, digest), (summary, error) in zip(stale, outcomes):
+                if error is not None:
+                    stats.failed += 1
+                    if len(stats.errors) < MAX_ERRORS:
+                        stats.errors.append((person.pk, f'{type(error).__name__}: {error}'))
+                    continue
+                stats.summarized += 1
+                results.append((person, digest, summary))
+            if results:
+                _save(results, stats)
+            if progress:
+                progress(stats)
+    return stats
@@ -0,0 +1,77 @@
+"""
+Query budgets for the API.
+
+`query_budget` is a context manager and decorator that fails when a block runs
+more SQL queries than allowed. QUERY_BUDGETS declares the maximum query count
+for every GET endpoint; test_query_budgets checks each one against both a small
+and a large dataset, so a budget only holds if the query count stays flat as
+data grows.
+"""
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+# Maximum queries per GET request, keyed by URL name. Authentication is forced in
+# tests, so these counts exclude session and user lookups.
+QUERY_BUDGETS = {
+    'api-root': 0,
+    'person-list': 4,               # version stamps + count + page
+    'person-detail': 3,             # version stamps + row
+    'person-snapshot': 2,           # version + rows
+    'person-overview': 5,           # person with counts + conversations + participants + pings + relationships
+    'person-connections': 2,        # graph build on first use + names
+    'person-neighborhood': 2,
+    'person-path': 2,
+    'person-activity': 3,           # store build on first use (participation + pings) + name
+    'conversation-list': 5,         # version stamps + count + page + participants prefetch
+    'conversation-detail': 4,       # version stamps + row + participants prefetch
+    'contactattempt-list': 4,
+    'contactattempt-detail': 3,
+    'relationship-list': 4,
+    'relationship-detail': 3,
+    'dashboard-analytics': 7,       # measured on a cache miss
+    'dashboard-cache-status': 0,
+    'birthday-timeline': 3,
+    'search': 1,
+    'reach-out': 2,                 # own rows + public rows
+    'export': 2,                    # rows + participants, per 2,000-row chunk
+    'location-suggestions': 3,
+    'company-suggestions': 3,
+    'conversation-location-suggestions': 3,
+    'current-user': 0,
+    'csrf-token': 0,
+}
+
+# Endpoints that only accept writes
+UNBUDGETED = {'login', 'logout', 'person-bulk', 'conversation-bulk', 'contactattempt-bulk'}
+
+
+class query_budget(ContextDecorator):
+    """Fail if the wrapped block runs more than `max_queries` queries"""
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS, label=None):
+        self.max_queries = max_queries
+        self.using = using
+        self.label = label or 'Block'
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.context.captured_queries)
+        if executed > self.max_queries:
+            queries = '\n'.join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(self.context.captured_queries, start=1)
+            )
+            raise AssertionError(
+                f"{self.label} ran {executed} queries, budget is {self.max_queries}:\n{queries}"
+            )
+        return False
@@ -0,0 +1,189 @@
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from orbit.activity import GENERATION_KEY, activity_store, person_activity, reset_activity_store, rolling_sums
+from orbit.models import Person, Conversation, ContactAttempt
+
+
+class RollingSumsTest(TestCase):
+    def test_windows_end_inclusive(self):
+        counts = np.array([[0, 1, 0, 2, 0, 1], [1, 1, 1, 1, 1, 1]])
+        self.assertEqual(rolling_sums(counts, np.array([0, 3, 5]), 3).tolist(), [[0, 3, 3], [1, 3, 3]])
+
+
+class ActivityTestCase(APITestCase):
+    def setUp(self):
+        reset_activity_store()
+        self.user = User.objects.create_user(username='user1', password='testpass123')
+        self.other = User.objects.create_user(username='user2', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.ann = Person.objects.create(name="Ann")
+        self.ben = Person.objects.create(name="Ben")
+
+    def converse(self, day, *people, **fields):
+        conversation = Conversation.objects.create(date=day, type='phone', notes='Call', created_by=self.user, **fields)
+        conversation.participants.add(*people)
+        return conversation
+
+    def ping(self, day, person, **fields):
+        return ContactAttempt.objects.create(person=person, date=day, type='text', created_by=self.user, **fields)
+
+    def activity(self, person, user=None, **params):
+        if user is not None:
+            self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('person-activity', kwargs={'pk': person.pk}), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+
+class PersonActivityTest(ActivityTestCase):
+    def test_heatmap_and_trend(self):
+        wednesday = date(2025, 6, 11)
+        self.converse(date(2025, 6, 2), self.ann, self.ben)
+        self.converse(date(2025, 6, 8), self.ann)
+        self.converse(date(2025, 5, 20), self.ann)
+        self.ping(wednesday, self.ann)
+        self.ping(wednesday, self.ben)
+
+        activity = person_activity(self.ann.pk, self.user, wednesday, weeks=2, window=14)
+        self.assertEqual(activity['weeks'], [date(2025, 6, 2), date(2025, 6, 9)])
+        self.assertEqual(activity['heatmap']['conversations'], [[1, 0, 0, 0, 0, 0, 1], [0] * 7])
+        self.assertEqual(activity['heatmap']['contact_attempts'], [[0] * 7, [0, 0, 1, 0, 0, 0, 0]])
+        # Windows end on Sunday the 8th and on today
+        self.assertEqual(activity['trend'], {'conversations': [2, 2], 'contact_attempts': [0, 1]})
+        self.assertEqual(activity['totals'], {'conversations': 2, 'contact_attempts': 1})
+
+    def test_endpoint(self):
+        today = timezone.localdate()
+        self.converse(today, self.ann)
+        activity = self.activity(self.ann)
+        self.assertEqual(activity['person']['name'], 'Ann')
+        self.assertEqual(len(activity['heatmap']['conversations']), 52)
+        self.assertEqual(activity['heatmap']['conversations'][-1][today.weekday()], 1)
+        self.assertEqual((activity['end'], activity['window_days']), (today, 30))
+
+        activity = self.activity(self.ann, weeks=1000, window=7)
+        self.assertEqual((len(activity['weeks']), activity['window_days']), (520, 7))
+        self.assertEqual(activity['trend']['conversations'][-1], 1)
+
+    def test_private_rows_only_count_for_their_creator(self):
+        today = timezone.localdate()
+        self.converse(today, self.ann, private=True)
+        self.ping(today, self.ann, private=True)
+        self.assertEqual(self.activity(self.ann)['totals'], {'conversations': 1, 'contact_attempts': 1})
+        self.assertEqual(self.activity(self.ann, self.other)['totals'], {'conversations': 0, 'contact_attempts': 0})
+
+    def test_errors(self):
+        url = reverse('person-activity', kwargs={'pk': uuid.uuid4()})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse('person-activity', kwargs={'pk': self.ann.pk})
+        self.assertEqual(self.client.get(url, {'weeks': 'many'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ActivityStoreTest(ActivityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.call = self.converse(self.today - timedelta(days=3), self.ann, self.ben)
+        self.text = self.ping(self.today - timedelta(days=1), self.ann)
+
+    def totals(self, person):
+        return tuple(self.activity(person)['totals'].values())
+
+    def assertMatchesRebuild(self, *people):
+        incremental = [self.activity(person) for person in people]
+        reset_activity_store()
+        self.assertEqual(incremental, [self.activity(person) for person in people])
+
+    def test_served_from_memory(self):
+        self.activity(self.ann)
+        # Only the person's name is read from the database
+        with self.assertNumQueries(1):
+            self.activity(self.ann)
+
+    def test_follows_committed_writes(self):
+        self.activity(self.ann)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.converse(self.today, self.ann)
+            self.call.date = self.today - timedelta(days=300)
+            self.call.save()
+            self.text.person = self.ben
+            self.text.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.totals(self.ann), (2, 0))
+        self.assertEqual(self.activity(self.ann)['heatmap']['conversations'][-1][self.today.weekday()], 1)
+        self.assertEqual(self.totals(self.ben), (1, 1))
+        self.assertMatchesRebuild(self.ann, self.ben)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.call.participants.remove(self.ann)
+            self.text.delete()
+        self.assertEqual(self.totals(self.ann), (1, 0))
+        self.assertEqual(self.totals(self.ben), (1, 0))
+        self.assertMatchesRebuild(self.ann, self.ben)
+
+    def test_follows_participant_changes_from_either_side(self):
+        self.activity(self.ann)
+        lunch = self.converse(self.today, self.ben)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ann.conversations.add(lunch)
+        self.assertEqual(self.totals(self.ann), (2, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ann.conversations.clear()
+            lunch.participants.clear()
+        self.assertEqual((self.totals(self.ann), self.totals(self.ben)), ((0, 1), (1, 0)))
+        self.assertMatchesRebuild(self.ann, self.ben)
+
+    def test_deleted_person(self):
+        self.activity(self.ann)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ann.delete()
+        self.assertEqual(activity_store.person_rows(self.ann.pk, self.user.pk, 0)[0].tolist(), [])
+        self.assertEqual(self.totals(self.ben), (1, 0))
+
+    def test_bulk_writes(self):
+        self.activity(self.ann)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('contactattempt-bulk'), [
+                {'person': str(self.ann.pk), 'date': str(self.today), 'type': 'text'},
+            ], format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = self.client.patch(reverse('conversation-bulk'), [
+                {'id': str(self.call.pk), 'participant_ids': [str(self.ben.pk)]},
+            ], format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.totals(self.ann), (0, 2))
+        self.assertMatchesRebuild(self.ann, self.ben)
+
+    def test_rebuilds_after_another_process_writes(self):
+        self.activity(self.ann)
+        ContactAttempt.objects.bulk_create([ContactAttempt(person=self.ann, date=self.today, type='email')])
+        self.assertEqual(self.totals(self.ann), (1, 1))
+        # What another process's committed write leaves behind
+        cache.incr(GENERATION_KEY)
+        self.assertEqual(self.totals(self.ann), (1, 2))
+
+    def test_buffered_rows_are_merged(self):
+        ContactAttempt.objects.bulk_create([
+            ContactAttempt(person=self.ben, date=self.today - timedelta(days=day % 300), type='text')
+            for day in range(1500)
+        ])
+        self.activity(self.ann)
+        pings = [str(pk) for pk in ContactAttempt.objects.filter(person=self.ben).values_list('pk', flat=True)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for start in range(0, len(pings), 500):
+                response = self.client.patch(reverse('contactattempt-bulk'), [
+                    {'id': pk, 'type': 'email'} for pk in pings[start:start + 500]
+                ], format='json')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(activity_store._pending['day']), 0)
+        self.assertEqual(self.totals(self.ben), (1, 1500))
+        self.assertMatchesRebuild(self.ann, self.ben)
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from orbit.models import Person
+from orbit.views import get_upcoming_birthdays, next_birthday
+
+
+class BirthdayKeyTest(TestCase):
+    def test_birthday_key_is_stored(self):
+        person = Person.objects.create(name="Alice", birthday_month=12, birthday_day=31)
+        person.refresh_from_db()
+        self.assertEqual(person.birthday_key, 1231)
+
+    def test_birthday_key_empty_without_birthday(self):
+        person = Person.objects.create(name="Bob", birthday_month=5)
+        person.refresh_from_db()
+        self.assertIsNone(person.birthday_key)
+
+    def test_leap_day_observed_on_feb_28(self):
+        self.assertEqual(next_birthday(2, 29, date(2025, 2, 1)), date(2025, 2, 28))
+        self.assertEqual(next_birthday(2, 29, date(2028, 2, 1)), date(2028, 2, 29))
+        self.assertEqual(next_birthday(2, 29, date(2025, 3, 1)), date(2026, 2, 28))
+
+    def test_impossible_date(self):
+        self.assertIsNone(next_birthday(4, 31, date(2025, 1, 1)))
+
+
+class UpcomingBirthdaysTest(TestCase):
+    def setUp(self):
+        self.new_years_eve = Person.objects.create(name="Eve", birthday_month=12, birthday_day=31)
+        self.new_year = Person.objects.create(name="Jan", birthday_month=1, birthday_day=2, birth_year=1990)
+        self.leap = Person.objects.create(name="Leap", birthday_month=2, birthday_day=29)
+        self.summer = Person.objects.create(name="Summer", birthday_month=7, birthday_day=4)
+        Person.objects.create(name="No Birthday")
+
+    def names(self, birthdays):
+        return [birthday['name'] for birthday in birthdays]
+
+    def test_range_wraps_around_year_end(self):
+        birthdays = get_upcoming_birthdays(days_ahead=5, today=date(2025, 12, 30))
+        self.assertEqual(self.names(birthdays), ['Eve', 'Jan'])
+        self.assertEqual(birthdays[1]['next_birthday'], '2026-01-02')
+        self.assertEqual(birthdays[1]['days_until'], 3)
+
+    def test_leap_day_included_on_feb_28(self):
+        birthdays = get_upcoming_birthdays(days_ahead=3, today=date(2025, 2, 25))
+        self.assertEqual(self.names(birthdays), ['Leap'])
+        self.assertEqual(birthdays[0]['next_birthday'], '2025-02-28')
+
+    def test_full_year_includes_everyone_once(self):
+        birthdays = get_upcoming_birthdays(days_ahead=365, today=date(2025, 7, 5))
+        self.assertEqual(self.names(birthdays), ['Eve', 'Jan', 'Leap', 'Summer'])
+        self.assertEqual(birthdays[-1]['days_until'], 364)
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(1):
+            get_upcoming_birthdays(days_ahead=365)
+
+
+class BirthdayTimelineAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        for i in range(20):
+            Person.objects.create(name=f"Person {i}", birthday_month=i % 12 + 1, birthday_day=i + 1)
+
+    def test_timeline_fields(self):
+        response = self.client.get(reverse('birthday-timeline'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['birthdays']), 20)
+        self.assertEqual(
+            set(response.data['birthdays'][0]),
+            {'id', 'name', 'name_ext', 'birthday_month', 'birthday_day', 'birth_year',
+             'birthday_display', 'age', 'next_birthday', 'days_until', 'is_today'}
+        )
+
+    def test_timeline_runs_one_query_regardless_of_days(self):
+        # The two ETag version stamps plus the birthday query
+        for days in (7, 30, 365):
+            with self.assertNumQueries(3):
+                self.client.get(reverse('birthday-timeline'), {'days': days})
+
+    def test_invalid_days(self):
+        response = self.client.get(reverse('birthday-timeline'), {'days': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
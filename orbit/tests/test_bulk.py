@@ -0,0 +1,198 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from orbit.models import Person, Conversation, ContactAttempt, ActivityRollup, PersonStats, Tombstone
+from orbit.person_stats import rebuild_person_stats
+from orbit.rollups import rebuild_activity_rollups
+from orbit.search import search
+from orbit.serializers import ConversationSerializer
+from orbit.suggestions import reset_suggestion_indexes
+
+
+def derived_state():
+    rollups = set(ActivityRollup.objects.filter(count__gt=0).values_list('day', 'kind', 'owner_id', 'count'))
+    stats = set(PersonStats.objects.filter(total_conversations__gt=0).values_list(
+        'person_id', 'owner_id', 'last_contacted', 'last_pinged', 'total_conversations'
+    ) | PersonStats.objects.filter(last_pinged__isnull=False).values_list(
+        'person_id', 'owner_id', 'last_contacted', 'last_pinged', 'total_conversations'
+    ))
+    return rollups, stats
+
+
+class BulkTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.people = [Person.objects.create(name=f"Guest {i}", created_by=self.user) for i in range(8)]
+        self.today = date.today()
+        reset_suggestion_indexes()
+
+    def assertDerivedDataCurrent(self):
+        """Derived tables match what the rebuild commands compute from scratch"""
+        before = derived_state()
+        rebuild_activity_rollups()
+        rebuild_person_stats()
+        self.assertEqual(before, derived_state())
+
+    def conversation_item(self, people, days_ago=0, **fields):
+        return dict({
+            'participant_ids': [str(person.pk) for person in people], 'date': str(self.today - timedelta(days=days_ago)),
+            'type': 'in_person', 'notes': 'Dinner', 'location': 'Trattoria',
+        }, **fields)
+
+
+class BulkCreateTest(BulkTestCase):
+    def test_dinner_with_everyone(self):
+        response = self.client.post(reverse('conversation-bulk'), [
+            self.conversation_item(self.people),
+            self.conversation_item(self.people[:2], days_ago=3, private=True, notes='Planning the surprise'),
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = response.data['results']
+        self.assertEqual([result['notes'] for result in results], ['Dinner', 'Planning the surprise'])
+        self.assertEqual(len(results[0]['participants']), 8)
+        self.assertEqual(results[1]['created_by_username'], 'testuser')
+        self.assertEqual(Conversation.participants.through.objects.count(), 10)
+        self.assertEqual([result['id'] for result in search(self.user, 'surprise')], [results[1]['id']])
+        self.assertDerivedDataCurrent()
+
+    def test_pings_to_the_rest_of_the_group(self):
+        response = self.client.post(reverse('contactattempt-bulk'), [
+            {'person': str(person.pk), 'date': str(self.today), 'type': 'text'} for person in self.people
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['person_name'] for result in response.data['results']],
+                         [person.name for person in self.people])
+        self.assertEqual(ContactAttempt.objects.filter(created_by=self.user).count(), 8)
+        self.assertDerivedDataCurrent()
+
+    def test_people(self):
+        # Build the suggestion index first, so the new location has to be added to it
+        self.assertEqual(self.client.get(reverse('location-suggestions'), {'q': 'den'}).data['locations'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('person-bulk'), [
+                {'name': 'Maya Patel', 'location': 'Denver'}, {'name': 'Finn', 'how_we_met': 'Colorado ski trip'},
+            ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Person.objects.filter(created_by=self.user, name='Maya Patel').count(), 1)
+        self.assertEqual([result['label'] for result in search(self.user, 'colorado')], ['Finn'])
+        self.assertEqual(self.client.get(reverse('location-suggestions'), {'q': 'den'}).data['locations'], ['Denver'])
+
+    def test_query_count_does_not_grow_with_items(self):
+        def queries(count):
+            # Spread over the same three days, since rollups are updated once per day bucket
+            items = [self.conversation_item(self.people[i % 6:i % 6 + 3], days_ago=i % 3) for i in range(count)]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(reverse('conversation-bulk'), items, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(context.captured_queries)
+
+        # The first batch creates the rollup rows; later ones only update them
+        queries(3)
+        self.assertEqual(queries(3), queries(30))
+
+    def test_invalid_items_write_nothing(self):
+        response = self.client.post(reverse('conversation-bulk'), [
+            self.conversation_item(self.people),
+            self.conversation_item(self.people, type='carrier pigeon'),
+            self.conversation_item(self.people, date='someday'),
+            dict(self.conversation_item(self.people), participant_ids=[str(self.people[0].pk), str(self.user.pk)]),
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['index']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(set(errors), {1, 2, 3})
+        self.assertIn('type', errors[1])
+        self.assertIn('date', errors[2])
+        self.assertIn('participant_ids', errors[3])
+        self.assertFalse(Conversation.objects.exists())
+
+    def test_body_must_be_a_list(self):
+        for body in [{}, [], ['not an object']]:
+            with self.subTest(body=body):
+                response = self.client.post(reverse('conversation-bulk'), body, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkUpdateTest(BulkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dinner = Conversation.objects.create(date=self.today, type='in_person', notes='Dinner', created_by=self.user)
+        self.dinner.participants.set(self.people[:4])
+        self.call = Conversation.objects.create(date=self.today, type='phone', notes='Call', created_by=self.other)
+        self.call.participants.set(self.people[4:6])
+        self.ping = ContactAttempt.objects.create(person=self.people[0], date=self.today, type='text', created_by=self.user)
+
+    def test_update_conversations(self):
+        response = self.client.patch(reverse('conversation-bulk'), [
+            {'id': str(self.dinner.pk), 'participant_ids': [str(person.pk) for person in self.people[2:8]],
+             'date': str(self.today - timedelta(days=10))},
+            {'id': str(self.call.pk), 'private': True},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results'][0]['participants']), 6)
+        self.dinner.refresh_from_db()
+        self.assertEqual(self.dinner.date, self.today - timedelta(days=10))
+        self.assertEqual(set(self.dinner.participants.all()), set(self.people[2:8]))
+        # Now private to its creator, so everyone else sees it as deleted
+        self.assertTrue(Tombstone.objects.filter(object_id=self.call.pk, owner__isnull=True).exists())
+        self.assertDerivedDataCurrent()
+
+    def test_update_pings_moves_stats(self):
+        response = self.client.patch(reverse('contactattempt-bulk'), [
+            {'id': str(self.ping.pk), 'person': str(self.people[7].pk), 'notes': 'Wrong person'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['person_name'], 'Guest 7')
+        self.assertFalse(PersonStats.objects.filter(person=self.people[0], last_pinged__isnull=False).exists())
+        self.assertDerivedDataCurrent()
+
+    def test_rename_people(self):
+        before = Conversation.objects.get(pk=self.dinner.pk).updated_at
+        response = self.client.patch(reverse('person-bulk'), [
+            {'id': str(self.people[0].pk), 'name': 'Maya', 'how_we_met': 'Colorado'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Maya')
+        self.assertGreater(Conversation.objects.get(pk=self.dinner.pk).updated_at, before)
+        self.assertEqual([result['label'] for result in search(self.user, 'colorado')], ['Maya'])
+
+    def test_unknown_hidden_and_duplicate_ids(self):
+        hidden = Conversation.objects.create(date=self.today, type='phone', notes='Secret', private=True,
+                                             created_by=self.other)
+        response = self.client.patch(reverse('conversation-bulk'), [
+            {'id': str(self.dinner.pk), 'notes': 'Changed'},
+            {'id': str(self.dinner.pk), 'notes': 'Again'},
+            {'id': str(hidden.pk), 'notes': 'Mine now'},
+            {'id': 'not-an-id', 'notes': 'Nope'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.dinner.refresh_from_db()
+        self.assertEqual(self.dinner.notes, 'Dinner')
+
+
+class ParticipantIdsTest(TestCase):
+    def test_ids_resolved_in_one_query(self):
+        people = [Person.objects.create(name=f"Guest {i}") for i in range(8)]
+        serializer = ConversationSerializer(data={
+            'participant_ids': [str(person.pk) for person in people], 'date': '2025-01-01',
+            'type': 'phone', 'notes': 'Call',
+        })
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['participants'], people)
+
+    def test_unknown_id(self):
+        person = Person.objects.create(name="Alice")
+        serializer = ConversationSerializer(data={
+            'participant_ids': [str(person.pk), '00000000-0000-4000-8000-000000000000'], 'date': '2025-01-01',
+            'type': 'phone', 'notes': 'Call',
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('does not exist', str(serializer.errors['participant_ids']))
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from orbit.models import Person, Conversation
+from orbit.suggestions import reset_suggestion_indexes
+from orbit.tests.query_budget import query_budget
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_suggestion_indexes()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.alice = Person.objects.create(name="Alice", location="Austin", created_by=self.user)
+        self.conversation = Conversation.objects.create(
+            date=date.today(), type='phone', location='Cafe', created_by=self.user
+        )
+        self.conversation.participants.add(self.alice)
+
+    def revalidate(self, url, params=None):
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    def test_unchanged_endpoints_return_304(self):
+        urls = [
+            reverse('person-list'),
+            reverse('person-detail', kwargs={'pk': self.alice.pk}),
+            reverse('conversation-list'),
+            reverse('contactattempt-list'),
+            reverse('relationship-list'),
+            reverse('dashboard-analytics'),
+            reverse('birthday-timeline'),
+            reverse('location-suggestions'),
+            reverse('company-suggestions'),
+            reverse('conversation-location-suggestions'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.revalidate(url).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_304_skips_the_list_query(self):
+        etag = self.client.get(reverse('conversation-list'))['ETag']
+        with query_budget(2):
+            response = self.client.get(reverse('conversation-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_query_string_is_part_of_the_etag(self):
+        first = self.client.get(reverse('person-list'))
+        response = self.client.get(reverse('person-list'), {'ordering': '-last_contacted'},
+                                   HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_write_changes_etag(self):
+        url = reverse('person-list')
+        etag = self.client.get(url)['ETag']
+        self.alice.company = 'Acme'
+        self.alice.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_delete_changes_etag(self):
+        url = reverse('conversation-list')
+        etag = self.client.get(url)['ETag']
+        self.conversation.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_users_private_rows_do_not_change_etag(self):
+        url = reverse('conversation-list')
+        etag = self.client.get(url)['ETag']
+        private = Conversation.objects.create(date=date.today(), type='text', private=True, created_by=self.other)
+        private.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_own_private_rows_change_etag(self):
+        url = reverse('conversation-list')
+        etag = self.client.get(url)['ETag']
+        Conversation.objects.create(date=date.today(), type='text', private=True, created_by=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dashboard_changes_after_write(self):
+        url = reverse('dashboard-analytics')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Conversation.objects.create(date=date.today(), type='text', created_by=self.other)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conversation_locations_hide_other_users_private_rows(self):
+        Conversation.objects.create(
+            date=date.today(), type='text', location='Secret', private=True, created_by=self.other
+        )
+        response = self.client.get(reverse('conversation-location-suggestions'))
+        self.assertEqual(response.data['locations'], ['Cafe'])
@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from orbit.models import Person, Conversation, ContactAttempt
+
+
+class DashboardCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.client.force_authenticate(user=self.user1)
+        self.person = Person.objects.create(name="Alice", created_by=self.user1)
+        self.url = reverse('dashboard-analytics')
+
+    def get_dashboard(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_second_request_is_a_hit(self):
+        self.assertEqual(self.get_dashboard()['X-Dashboard-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.get_dashboard()
+        self.assertEqual(response['X-Dashboard-Cache'], 'hit')
+
+    def test_public_conversation_invalidates(self):
+        self.get_dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            conversation = Conversation.objects.create(
+                date=timezone.localdate(), type='phone', notes='Call', created_by=self.user2
+            )
+        response = self.get_dashboard()
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+        self.assertEqual(response.data['activity_overview']['conversations']['week'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            conversation.participants.add(self.person)
+        response = self.get_dashboard()
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+        self.assertEqual(response.data['recent_conversations'][0]['participant_names'], ['Alice'])
+
+    def test_other_users_private_rows_do_not_invalidate(self):
+        self.get_dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactAttempt.objects.create(
+                person=self.person, date=timezone.localdate(), type='text', private=True, created_by=self.user2
+            )
+        self.assertEqual(self.get_dashboard()['X-Dashboard-Cache'], 'hit')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactAttempt.objects.create(
+                person=self.person, date=timezone.localdate(), type='text', private=True, created_by=self.user1
+            )
+        self.assertEqual(self.get_dashboard()['X-Dashboard-Cache'], 'miss')
+
+    def test_person_change_invalidates(self):
+        self.get_dashboard()
+        self.person.name = "Alice Smith"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.save()
+        self.assertEqual(self.get_dashboard()['X-Dashboard-Cache'], 'miss')
+
+    def test_write_invalidates_when_it_commits(self):
+        self.get_dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            Conversation.objects.create(date=timezone.localdate(), type='phone', notes='Call', created_by=self.user2)
+            # Until the write commits, other readers can't see it, so it mustn't be cached as fresh
+            self.assertEqual(self.get_dashboard()['X-Dashboard-Cache'], 'hit')
+        self.assertEqual(self.get_dashboard()['X-Dashboard-Cache'], 'miss')
+
+    def test_cache_stats_counters(self):
+        self.get_dashboard()
+        self.get_dashboard()
+        self.get_dashboard()
+
+        stats_url = reverse('dashboard-cache-status')
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'hits': 2, 'misses': 1, 'hit_rate': 0.667})
@@ -0,0 +1,111 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import timedelta
+from orbit.models import Person, Conversation, ContactAttempt
+from orbit.parallel import close_pool_connections, run_concurrently
+from orbit.views import DASHBOARD_SECTIONS, build_dashboard
+
+
+class DashboardSectionsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user1', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.person = Person.objects.create(
+            name="Alice", birthday_month=timezone.localdate().month, birthday_day=timezone.localdate().day,
+            created_by=self.user,
+        )
+        self.url = reverse('dashboard-analytics')
+
+    def test_all_sections_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.data), DASHBOARD_SECTIONS)
+        timings = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        self.assertEqual(sorted(timings), sorted(DASHBOARD_SECTIONS + ['total']))
+
+    def test_only_requested_sections(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'sections': 'upcoming_birthdays'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ['upcoming_birthdays'])
+        self.assertEqual(response.data['upcoming_birthdays'][0]['name'], 'Alice')
+        self.assertRegex(response['Server-Timing'], r'^upcoming_birthdays;dur=[\d.]+, total;dur=[\d.]+$')
+
+        # Response order is fixed regardless of the order asked for
+        response = self.client.get(self.url, {'sections': 'monthly_activity, activity_overview'})
+        self.assertEqual(list(response.data), ['activity_overview', 'monthly_activity'])
+
+    def test_unknown_section(self):
+        response = self.client.get(self.url, {'sections': 'top_contacts,horoscope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('horoscope', response.data['sections'])
+
+    def test_sections_cached_separately(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'sections': 'activity_overview'})
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'sections': 'activity_overview'})
+        self.assertEqual(response['X-Dashboard-Cache'], 'hit')
+        self.assertNotIn('Server-Timing', response)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactAttempt.objects.create(
+                person=self.person, date=timezone.localdate(), type='text', created_by=self.user
+            )
+        response = self.client.get(self.url, {'sections': 'activity_overview'})
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+        self.assertEqual(response.data['activity_overview']['contact_attempts']['week'], 1)
+
+
+class RunConcurrentlyTest(SimpleTestCase):
+    def test_tasks_overlap(self):
+        # Each task waits for all the others, so this only finishes if they run at the same time
+        barrier = threading.Barrier(3, timeout=10)
+        tasks = {name: lambda name=name: (barrier.wait(), name)[1] for name in ['a', 'b', 'c']}
+        results, timings = run_concurrently(tasks)
+        self.assertEqual(results, {'a': 'a', 'b': 'b', 'c': 'c'})
+        self.assertEqual(list(timings), ['a', 'b', 'c'])
+
+    @override_settings(DASHBOARD_WORKERS=1)
+    def test_serial_with_one_worker(self):
+        results, _ = run_concurrently({'a': threading.get_ident, 'b': threading.get_ident})
+        self.assertEqual(set(results.values()), {threading.get_ident()})
+
+    def test_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            run_concurrently({'ok': lambda: 1, 'broken': lambda: 1 / 0})
+
+
+class ConcurrentDashboardTest(TransactionTestCase):
+    """Outside a transaction the sections run on pool threads with their own connections"""
+
+    def tearDown(self):
+        # The threads keep their connections between tasks, which would stop the test database being dropped
+        close_pool_connections()
+
+    def test_same_payload_as_serial(self):
+        user = User.objects.create_user(username='user1', password='testpass123')
+        people = [Person.objects.create(name=f"Guest {i}", created_by=user) for i in range(4)]
+        today = timezone.localdate()
+        for days_ago in [1, 40, 200, 250, 300]:
+            conversation = Conversation.objects.create(
+                date=today - timedelta(days=days_ago), type='phone', notes='Call', created_by=user,
+            )
+            conversation.participants.set(people[:2] if days_ago > 100 else people[2:])
+        ContactAttempt.objects.create(person=people[3], date=today, type='text', private=True, created_by=user)
+
+        concurrent, timings = build_dashboard(user)
+        with override_settings(DASHBOARD_WORKERS=1):
+            serial, _ = build_dashboard(user)
+        self.assertEqual(concurrent, serial)
+        self.assertEqual(set(timings), set(DASHBOARD_SECTIONS))
+        self.assertEqual(len(concurrent['recent_conversations']), 5)
+        self.assertEqual({person['name'] for person in concurrent['people_to_reach_out']}, {'Guest 0', 'Guest 1'})
@@ -0,0 +1,47 @@
+import importlib.util
+import os
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase
+
+
+def load_settings(**environ):
+    """A fresh copy of orbit.settings read with `environ` added to the environment"""
+    spec = importlib.util.spec_from_file_location('orbit.settings_copy', settings.BASE_DIR / 'orbit' / 'settings.py')
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(os.environ, environ):
+        spec.loader.exec_module(module)
+    return module
+
+
+def pool_available():
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PostgresSettingsTest(SimpleTestCase):
+    url = 'postgres://orbit@127.0.0.1:5432/orbit'
+
+    def test_persistent_connections_are_checked(self):
+        database = load_settings(DATABASE_URL=self.url).DATABASES['default']
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+    @unittest.skipUnless(pool_available(), 'needs psycopg[pool]')
+    def test_pooled_connections_are_checked(self):
+        from django.db.backends.postgresql.base import DatabaseWrapper
+
+        database = load_settings(DATABASE_URL=self.url, DATABASE_POOL_MAX_SIZE='4').DATABASES['default']
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        database = connections.configure_settings({'default': database})['default']
+        wrapper = DatabaseWrapper(database, 'pooled')
+        # The pool is built without connecting, so no server is needed
+        self.addCleanup(wrapper.close_pool)
+        self.assertTrue(callable(wrapper.pool._check))
+        self.assertEqual(wrapper.pool.max_size, 4)
@@ -0,0 +1,67 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase
+from orbit.datasets import generate_dataset
+from orbit.models import Person, Conversation, ContactAttempt, Relationship, PersonStats
+
+
+def snapshot():
+    return {
+        'people': list(Person.objects.order_by('pk').values_list('pk', 'name', 'birthday_month', 'birthday_day')),
+        'conversations': list(Conversation.objects.order_by('pk').values_list('pk', 'date', 'type', 'private')),
+        'participants': sorted(Conversation.participants.through.objects.values_list('conversation_id', 'person_id')),
+        'pings': list(ContactAttempt.objects.order_by('pk').values_list('pk', 'person_id', 'date')),
+        'relationships': list(Relationship.objects.order_by('pk').values_list('person1_id', 'person2_id')),
+    }
+
+
+class GenerateDatasetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_counts_and_derived_data(self):
+        counts = generate_dataset(50, seed=1, user=self.user)
+        self.assertEqual(counts, {'people': 50, 'conversations': 250, 'pings': 150, 'relationships': 100})
+        self.assertEqual(Conversation.objects.filter(participants__isnull=True).count(), 0)
+        # Bulk inserts skip the signal handlers, so stats come from the rebuild
+        public_participations = Conversation.participants.through.objects.filter(conversation__private=False).count()
+        self.assertEqual(
+            PersonStats.objects.filter(owner__isnull=True).aggregate(total=Sum('total_conversations'))['total'],
+            public_participations,
+        )
+
+    def test_same_seed_same_rows(self):
+        today = date(2025, 3, 1)
+        generate_dataset(30, seed=7, today=today, user=self.user)
+        first = snapshot()
+        Person.objects.all().delete()
+        Conversation.objects.all().delete()
+        generate_dataset(30, seed=7, today=today, user=self.user)
+        self.assertEqual(snapshot(), first)
+
+    def test_rows_are_valid(self):
+        today = date(2025, 3, 1)
+        generate_dataset(200, seed=3, today=today, user=self.user)
+        for month, day, year in Person.objects.filter(birthday_month__isnull=False).values_list(
+            'birthday_month', 'birthday_day', 'birth_year'
+        ):
+            date(year or 2000, month, day)
+        pairs = [frozenset(pair) for pair in Relationship.objects.values_list('person1_id', 'person2_id')]
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertTrue(all(len(pair) == 2 for pair in pairs))
+        self.assertFalse(Conversation.objects.filter(date__gt=today).exists())
+
+
+class GenerateDatasetCommandTest(TestCase):
+    def test_command(self):
+        User.objects.create_user(username='testuser', password='testpass123')
+        out = StringIO()
+        call_command('generate_dataset', '--people', '20', '--conversations', '40', stdout=out)
+        self.assertIn('20 people, 40 conversations, 60 pings, 40 relationships', out.getvalue())
+        self.assertEqual(Person.objects.filter(created_by__username='testuser').count(), 20)
+        with self.assertRaisesMessage(CommandError, 'needs an empty database'):
+            call_command('generate_dataset', '--people', '20', stdout=out)
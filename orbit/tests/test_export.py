@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from orbit.models import Person, Conversation, ContactAttempt
+from orbit import export
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.alice = Person.objects.create(name="Alice", notes="Likes, commas", created_by=self.user)
+        self.bob = Person.objects.create(name="Bob", created_by=self.user)
+        self.shared = Conversation.objects.create(date=date(2024, 5, 1), type='phone', created_by=self.user)
+        self.shared.participants.add(self.alice, self.bob)
+        self.mine = Conversation.objects.create(
+            date=date(2024, 4, 1), type='text', private=True, created_by=self.user
+        )
+        self.hidden = Conversation.objects.create(
+            date=date(2024, 3, 1), type='text', private=True, created_by=self.other
+        )
+        ContactAttempt.objects.create(person=self.alice, date=date(2024, 5, 2), type='text', created_by=self.user)
+
+    def download(self, kind, fmt, params=None):
+        response = self.client.get(reverse('export', kwargs={'kind': kind, 'fmt': fmt}), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_conversations_csv(self):
+        response, body = self.download('conversations', 'csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('orbit-conversations.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual([row['id'] for row in rows], [str(self.shared.id), str(self.mine.id)])
+        self.assertEqual(rows[0]['participant_names'], 'Alice; Bob')
+        self.assertEqual(rows[0]['created_by_username'], 'testuser')
+
+    def test_people_ndjson(self):
+        _, body = self.download('people', 'ndjson')
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Alice', 'Bob'])
+        self.assertEqual(rows[0]['notes'], 'Likes, commas')
+
+    def test_pings_gzip(self):
+        response, body = self.download('pings', 'csv', {'gzip': '1'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode())))
+        self.assertEqual(rows[0]['person_name'], 'Alice')
+
+    def test_empty_export_has_header(self):
+        Person.objects.all().delete()
+        _, body = self.download('people', 'csv')
+        self.assertEqual(body.decode().strip(), ','.join(export.COLUMNS['people']))
+
+    def test_chunks_resolve_participants_in_batches(self):
+        original = export.CHUNK_SIZE
+        export.CHUNK_SIZE = 1
+        try:
+            # One streamed row query, plus one participants query per chunk
+            with self.assertNumQueries(3):
+                rows = [row for chunk in export.EXPORTS['conversations'](self.user) for row in chunk]
+        finally:
+            export.CHUNK_SIZE = original
+        self.assertEqual(rows[0]['participant_ids'], [self.alice.id, self.bob.id])
+        self.assertEqual(rows[1]['participant_ids'], [])
+
+    def test_unknown_export(self):
+        response = self.client.get(reverse('export', kwargs={'kind': 'users', 'fmt': 'csv'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'conversations.ndjson')
+            call_command('export_data', 'conversations', '--as', 'ndjson', '--output', path, stderr=io.StringIO())
+            with open(path) as output:
+                ids = [json.loads(line)['id'] for line in output]
+        # Without --user only public conversations are exported
+        self.assertEqual(ids, [str(self.shared.id)])
+
+    def test_command_for_user(self):
+        out = io.StringIO()
+        call_command('export_data', 'conversations', '--user', 'testuser', stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
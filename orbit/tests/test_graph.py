@@ -0,0 +1,117 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from orbit.graph import relationship_graph, reset_relationship_graph
+from orbit.models import Person, Relationship
+
+
+class RelationshipGraphTest(APITestCase):
+    def setUp(self):
+        reset_relationship_graph()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.ann, self.ben, self.cal, self.dee, self.eve = [
+            Person.objects.create(name=name, created_by=self.user) for name in ['Ann', 'Ben', 'Cal', 'Dee', 'Eve']
+        ]
+        # Ann - Ben - Cal - Dee, with a shortcut Ann - Dee through family; Eve is unconnected
+        self.relate(self.ann, self.ben, 'friend')
+        self.relate(self.cal, self.ben, 'colleague')
+        self.relate(self.cal, self.dee, 'friend')
+        self.shortcut = self.relate(self.ann, self.dee, 'family')
+
+    def relate(self, person1, person2, relationship_type):
+        return Relationship.objects.create(
+            person1=person1, person2=person2, relationship_type=relationship_type, created_by=self.user
+        )
+
+    def get(self, name, person, params=None, **kwargs):
+        return self.client.get(reverse(name, kwargs={'pk': person.pk, **kwargs}), params)
+
+    def test_connections(self):
+        response = self.get('person-connections', self.ann)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['person']['name'], 'Ann')
+        self.assertEqual(
+            [(item['person']['name'], item['relationship_type']) for item in response.data['connections']],
+            [('Ben', 'friend'), ('Dee', 'family')]
+        )
+        # Relationships are undirected
+        response = self.get('person-connections', self.ben)
+        self.assertEqual([item['person']['name'] for item in response.data['connections']], ['Ann', 'Cal'])
+
+    def test_filter_by_relationship_type(self):
+        response = self.get('person-connections', self.ann, {'relationship_type': 'family,partner'})
+        self.assertEqual([item['person']['name'] for item in response.data['connections']], ['Dee'])
+        response = self.get('person-connections', self.ann, {'relationship_type': 'enemy'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_neighborhood(self):
+        response = self.get('person-neighborhood', self.ben, {'depth': 1})
+        self.assertEqual([(item['name'], item['distance']) for item in response.data['people']], [('Ann', 1), ('Cal', 1)])
+        self.assertEqual(
+            sorted(item['relationship_type'] for item in response.data['relationships']), ['colleague', 'friend']
+        )
+
+        response = self.get('person-neighborhood', self.ben)
+        self.assertEqual(response.data['depth'], 2)
+        self.assertEqual(
+            [(item['name'], item['distance']) for item in response.data['people']],
+            [('Ann', 1), ('Cal', 1), ('Dee', 2)]
+        )
+        self.assertEqual(len(response.data['relationships']), 4)
+
+        response = self.get('person-neighborhood', self.ben, {'depth': 3, 'relationship_type': 'friend'})
+        self.assertEqual([item['name'] for item in response.data['people']], ['Ann'])
+
+    def test_shortest_path(self):
+        response = self.get('person-path', self.ben, target=self.dee.pk)
+        self.assertEqual(response.data['degrees'], 2)
+        self.assertEqual([step['person']['name'] for step in response.data['path']][::2], ['Ben', 'Dee'])
+        self.assertIsNone(response.data['path'][0]['relationship_type'])
+
+        # Without family, Ann only reaches Dee the long way round
+        response = self.get('person-path', self.ann, {'relationship_type': 'friend,colleague'}, target=self.dee.pk)
+        self.assertEqual([step['person']['name'] for step in response.data['path']], ['Ann', 'Ben', 'Cal', 'Dee'])
+        self.assertEqual([step['relationship_type'] for step in response.data['path']], [None, 'friend', 'colleague', 'friend'])
+
+        response = self.get('person-path', self.ann, target=self.eve.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['path'])
+        self.assertIsNone(response.data['degrees'])
+
+    def test_unknown_people(self):
+        self.assertEqual(self.client.get(
+            reverse('person-connections', kwargs={'pk': uuid.uuid4()})
+        ).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.get('person-path', self.ann, target=uuid.uuid4()).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.get('person-path', self.ann, target='not-a-uuid').status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_queries_answered_from_memory(self):
+        self.get('person-connections', self.ann)
+        # Only the names of the people in the answer are read from the database
+        with self.assertNumQueries(1):
+            self.get('person-path', self.ann, target=self.cal.pk)
+        with self.assertNumQueries(0):
+            relationship_graph.neighborhood(self.ann.pk, 4)
+
+    def test_graph_follows_committed_writes(self):
+        self.get('person-connections', self.ann)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.relate(self.eve, self.cal, 'partner')
+            self.shortcut.relationship_type = 'friend'
+            self.shortcut.save()
+        response = self.get('person-path', self.ann, {'relationship_type': 'friend,partner'}, target=self.eve.pk)
+        self.assertEqual([step['person']['name'] for step in response.data['path']], ['Ann', 'Dee', 'Cal', 'Eve'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shortcut.delete()
+            self.cal.delete()
+        self.assertIsNone(self.get('person-path', self.ann, target=self.eve.pk).data['path'])
+        self.assertEqual(relationship_graph.connections(self.dee.pk), [])
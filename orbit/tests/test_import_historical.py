@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from datetime import date
+from orbit.models import Person, Conversation, ContactAttempt, Relationship, PersonStats
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+FIXTURES = {
+    'seeds_company.csv': (
+        "id,name\n"
+        "1, Acme \n"
+    ),
+    'seeds_person.csv': (
+        "id,first_name,last_name,birthday,city,address,notes,company_id,partner_id,known_via_id,active\n"
+        "1,Alice,Smith,11/9/88,Austin,,Met at work,1,2,,1\n"
+        "2,Bob,Jones,1990-02-03,,,,,1,,1\n"
+        "3,Cal,,,Denver,,,,,1,1\n"
+        "4,Old,Record,,,,,,,,0\n"
+        "5,,,,,,,,,,1\n"
+    ),
+    'seeds_conversation.csv': (
+        "id,date,mode,location,summary,notes,seed,active\n"
+        "10,5/1/24,one on one,Cafe,Caught up,Talked about travel,0,1\n"
+        "11,2024-05-02,skype,,,,0,1\n"
+        "12,5/3/24,text,,Checking in,,1,1\n"
+        "13,not a date,phone,,,,0,1\n"
+        "14,5/4/24,phone,,,,0,1\n"
+    ),
+    'seeds_conversation_people.csv': (
+        "conversation_id,person_id\n"
+        "10,1\n"
+        "10,2\n"
+        "11,3\n"
+        "12,1\n"
+        "12,3\n"
+        "14,4\n"
+    ),
+}
+
+
+@unittest.skipIf(pandas is None, 'import_historical requires pandas')
+class ImportHistoricalTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.directory = tempfile.TemporaryDirectory()
+        for name, content in FIXTURES.items():
+            with open(os.path.join(self.directory.name, name), 'w') as csv_file:
+                csv_file.write(content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command('import_historical', self.directory.name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import(self):
+        output = self.run_import()
+        self.assertIn('Created: 3 people, 1 partner relationships, 1 friend relationships, 2 conversations, 2 pings', output)
+
+        alice = Person.objects.get(name='Alice Smith')
+        self.assertEqual((alice.birthday_month, alice.birthday_day, alice.birth_year), (11, 9, 1988))
+        self.assertEqual(alice.company, 'Acme')
+        self.assertEqual(alice.location, 'Austin')
+        self.assertEqual(alice.created_by, self.user)
+
+        conversation = Conversation.objects.get(date=date(2024, 5, 1))
+        self.assertEqual(conversation.type, 'in_person')
+        self.assertEqual(conversation.notes, 'Caught up\n\nTalked about travel')
+        self.assertEqual(sorted(conversation.participants.values_list('name', flat=True)), ['Alice Smith', 'Bob Jones'])
+        self.assertEqual(Conversation.objects.get(date=date(2024, 5, 2)).type, 'video')
+
+        self.assertEqual(
+            sorted(ContactAttempt.objects.values_list('person__name', 'type')),
+            [('Alice Smith', 'text'), ('Cal', 'text')]
+        )
+        self.assertEqual(Relationship.objects.get(relationship_type='partner').description, 'Imported from historical data')
+
+        # Derived data is rebuilt because bulk_create skips the signal handlers
+        self.assertTrue(PersonStats.objects.filter(person=alice, last_contacted=date(2024, 5, 1)).exists())
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_import('--dry-run')
+        self.assertIn('Would create: 3 people', output)
+        self.assertFalse(Person.objects.exists())
+        self.assertFalse(Conversation.objects.exists())
+
+    def test_rerun_resumes_without_duplicates(self):
+        self.run_import('--batch-size', '1')
+        output = self.run_import()
+        self.assertIn('Created: 0 people, 0 partner relationships, 0 friend relationships, 0 conversations, 0 pings', output)
+        self.assertEqual(Person.objects.count(), 3)
+        self.assertEqual(Conversation.objects.count(), 2)
+        self.assertEqual(ContactAttempt.objects.count(), 2)
+        self.assertEqual(Relationship.objects.count(), 2)
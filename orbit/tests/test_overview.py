@@ -0,0 +1,94 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from orbit.models import Person, Conversation, ContactAttempt, Relationship
+
+
+class PersonOverviewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.alice = Person.objects.create(name="Alice", created_by=self.user)
+        self.bob = Person.objects.create(name="Bob", created_by=self.user)
+        self.cal = Person.objects.create(name="Cal", created_by=self.user)
+        start = date(2024, 1, 1)
+        for i in range(3):
+            conversation = Conversation.objects.create(date=start + timedelta(days=i), type='phone', created_by=self.user)
+            conversation.participants.add(self.alice, self.bob)
+        hidden = Conversation.objects.create(date=start, type='text', private=True, created_by=self.other)
+        hidden.participants.add(self.alice)
+        ContactAttempt.objects.create(person=self.alice, date=start, type='text', private=True, created_by=self.user)
+        ContactAttempt.objects.create(person=self.alice, date=start, type='text', private=True, created_by=self.other)
+        ContactAttempt.objects.create(person=self.bob, date=start, type='text', created_by=self.user)
+        Relationship.objects.create(person1=self.alice, person2=self.bob, relationship_type='friend', created_by=self.user)
+        Relationship.objects.create(person1=self.cal, person2=self.alice, relationship_type='family', created_by=self.user)
+        Relationship.objects.create(person1=self.bob, person2=self.cal, relationship_type='colleague', created_by=self.user)
+
+    def overview(self, person, params=None):
+        response = self.client.get(reverse('person-overview', kwargs={'pk': person.pk}), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_overview_applies_privacy(self):
+        data = self.overview(self.alice)
+        self.assertEqual(data['person']['name'], 'Alice')
+        self.assertEqual(data['counts'], {'conversations': 3, 'pings': 1, 'relationships': 2})
+        self.assertEqual(
+            [item['date'] for item in data['conversations']['results']], ['2024-01-03', '2024-01-02', '2024-01-01']
+        )
+        self.assertEqual(len(data['pings']['results']), 1)
+        # Relationships in both directions
+        self.assertEqual(
+            sorted(item['relationship_type'] for item in data['relationships']['results']), ['family', 'friend']
+        )
+        self.assertIsNone(data['conversations']['next'])
+
+    def test_limit_and_next_links(self):
+        data = self.overview(self.alice, {'limit': 2})
+        self.assertEqual(len(data['conversations']['results']), 2)
+        self.assertEqual(len(data['relationships']['results']), 2)
+        self.assertIsNone(data['relationships']['next'])
+
+        # The link continues the conversation list after the overview's last row
+        response = self.client.get(data['conversations']['next'])
+        self.assertEqual([item['date'] for item in response.data['results']], ['2024-01-01'])
+
+        # Relationships continue on the page after the overview's rows
+        data = self.overview(self.alice, {'limit': 1})
+        response = self.client.get(data['relationships']['next'])
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(
+            [item['relationship_type'] for item in data['relationships']['results'] + response.data['results']],
+            ['friend', 'family'],
+        )
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(reverse('person-overview', kwargs={'pk': self.alice.pk}), {'limit': 'all'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fixed_query_count(self):
+        # Person with counts, conversations, their participants, pings and relationships
+        with self.assertNumQueries(5):
+            self.overview(self.alice)
+        # Never contacted, so nothing to prefetch and no fallback lookup of the last conversation
+        with self.assertNumQueries(4):
+            self.overview(self.cal)
+
+    def test_unknown_person(self):
+        response = self.client.get(reverse('person-overview', kwargs={'pk': uuid.uuid4()}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_person_filters(self):
+        response = self.client.get(reverse('contactattempt-list'), {'person': self.bob.pk})
+        self.assertEqual(response.data['count'], 1)
+        response = self.client.get(reverse('relationship-list'), {'person': self.cal.pk})
+        self.assertEqual(
+            sorted(item['relationship_type'] for item in response.data['results']), ['colleague', 'family']
+        )
+        response = self.client.get(reverse('relationship-list'), {'person': 'nobody'})
+        self.assertEqual(response.data['count'], 0)
@@ -0,0 +1,93 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from orbit.models import Person, Conversation, ContactAttempt
+
+
+class CursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.person = Person.objects.create(name="Alice", created_by=self.user)
+        self.today = date.today()
+        # Several conversations share a date so the id tiebreaker matters
+        for i in range(7):
+            conversation = Conversation.objects.create(
+                date=self.today - timedelta(days=i // 3), type='phone', notes=f'Chat {i}', created_by=self.user
+            )
+            conversation.participants.add(self.person)
+        self.url = reverse('conversation-list')
+
+    def walk(self, url, params=None):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_walks_every_row_once_in_order(self):
+        ids = self.walk(self.url, {'pagination': 'cursor', 'page_size': 3})
+        expected = [
+            str(pk) for pk in Conversation.objects.order_by('-date', 'id').values_list('id', flat=True)
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_stable_under_concurrent_inserts(self):
+        first = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 3})
+        seen = [item['id'] for item in first.data['results']]
+        # A newer conversation logged mid-walk must not shift later pages
+        Conversation.objects.create(
+            date=self.today + timedelta(days=1), type='text', notes='New', created_by=self.user
+        )
+        seen.extend(self.walk(first.data['next']))
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 10000})
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 0})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIn('page_size=1', response.data['next'])
+
+    def test_no_count_query(self):
+        # The two ETag version stamps, one page query and the participants prefetch
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'pagination': 'cursor'})
+
+    def test_filters_carry_into_next_link(self):
+        other = Person.objects.create(name="Bob", created_by=self.user)
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2, 'participant': self.person.pk})
+        self.assertIn(f'participant={self.person.pk}', response.data['next'])
+        ids = self.walk(self.url, {'pagination': 'cursor', 'page_size': 2, 'participant': other.pk})
+        self.assertEqual(ids, [])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for payload in (b'["2024-01-01", "abc"]', b'["2024-01-01", 5]', b'[5, "abc"]'):
+            response = self.client.get(self.url, {'cursor': base64.urlsafe_b64encode(payload).decode()})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 7)
+        self.assertIn('previous', response.data)
+
+    def test_pings_support_cursor_mode(self):
+        for i in range(3):
+            ContactAttempt.objects.create(
+                person=self.person, date=self.today - timedelta(days=i), type='text', created_by=self.user
+            )
+        ids = self.walk(reverse('contactattempt-list'), {'pagination': 'cursor', 'page_size': 1})
+        self.assertEqual(len(ids), 3)
@@ -0,0 +1,175 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import timedelta
+from io import StringIO
+from orbit.models import Person, Conversation, ContactAttempt, PersonStats
+from orbit.person_stats import refresh_stale_person_stats
+
+
+class PersonStatsMaintenanceTest(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.alice = Person.objects.create(name="Alice", created_by=self.user1)
+        self.bob = Person.objects.create(name="Bob", created_by=self.user1)
+        self.today = timezone.localdate()
+
+    def public_stats(self, person):
+        return PersonStats.objects.filter(person=person, owner__isnull=True).first()
+
+    def conversation(self, days_ago, *people, **kwargs):
+        conversation = Conversation.objects.create(
+            date=self.today - timedelta(days=days_ago), type='phone', notes='Chat',
+            created_by=kwargs.pop('created_by', self.user1), **kwargs
+        )
+        conversation.participants.add(*people)
+        return conversation
+
+    def test_adding_participants_updates_stats(self):
+        self.conversation(10, self.alice, self.bob)
+        self.conversation(400, self.alice)
+
+        stats = self.public_stats(self.alice)
+        self.assertEqual(stats.last_contacted, self.today - timedelta(days=10))
+        self.assertEqual(stats.total_conversations, 2)
+        self.assertEqual(stats.conversations_6_months, 1)
+        self.assertEqual(stats.conversations_2_years, 2)
+        self.assertEqual(self.public_stats(self.bob).total_conversations, 1)
+
+    def test_removing_participant_updates_stats(self):
+        conversation = self.conversation(10, self.alice, self.bob)
+        conversation.participants.remove(self.bob)
+        self.assertIsNone(self.public_stats(self.bob))
+        conversation.participants.clear()
+        self.assertIsNone(self.public_stats(self.alice))
+
+    def test_reverse_participant_add(self):
+        conversation = Conversation.objects.create(
+            date=self.today, type='phone', notes='Chat', created_by=self.user1
+        )
+        self.alice.conversations.add(conversation)
+        self.assertEqual(self.public_stats(self.alice).last_contacted, self.today)
+
+    def test_editing_conversation_moves_scope(self):
+        conversation = self.conversation(10, self.alice)
+        conversation.private = True
+        conversation.save()
+        self.assertIsNone(self.public_stats(self.alice))
+        private_stats = PersonStats.objects.get(person=self.alice, owner=self.user1)
+        self.assertEqual(private_stats.total_conversations, 1)
+
+    def test_deleting_conversation_updates_stats(self):
+        self.conversation(10, self.alice)
+        latest = self.conversation(2, self.alice)
+        latest.delete()
+        self.assertEqual(self.public_stats(self.alice).last_contacted, self.today - timedelta(days=10))
+
+    def test_pings_update_last_pinged(self):
+        ping = ContactAttempt.objects.create(
+            person=self.alice, date=self.today - timedelta(days=3), type='text', created_by=self.user1
+        )
+        self.assertEqual(self.public_stats(self.alice).last_pinged, self.today - timedelta(days=3))
+        ping.person = self.bob
+        ping.save()
+        self.assertIsNone(self.public_stats(self.alice))
+        self.assertEqual(self.public_stats(self.bob).last_pinged, self.today - timedelta(days=3))
+
+    def test_deleting_person_and_user_cascades_cleanly(self):
+        self.conversation(5, self.alice, private=True, created_by=self.user2)
+        ContactAttempt.objects.create(person=self.alice, date=self.today, type='text', created_by=self.user1)
+        ContactAttempt.objects.create(
+            person=self.bob, date=self.today, type='text', private=True, created_by=self.user2
+        )
+        self.alice.delete()
+        self.user2.delete()
+        self.assertFalse(PersonStats.objects.filter(person_id=self.alice.pk).exists())
+        self.assertFalse(PersonStats.objects.filter(owner_id=self.user2.pk).exists())
+
+    def test_stale_windows_are_refreshed(self):
+        self.conversation(170, self.alice)
+        self.assertEqual(self.public_stats(self.alice).conversations_6_months, 1)
+        refresh_stale_person_stats(today=self.today + timedelta(days=20))
+        self.assertEqual(self.public_stats(self.alice).conversations_6_months, 0)
+
+    def test_rebuild_command(self):
+        self.conversation(10, self.alice)
+        PersonStats.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_person_stats', stdout=out)
+        self.assertIn('2 people', out.getvalue())
+        self.assertEqual(self.public_stats(self.alice).total_conversations, 1)
+
+
+class PersonStatsAPITest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.client.force_authenticate(user=self.user1)
+        self.today = timezone.localdate()
+        self.alice = Person.objects.create(name="Alice", created_by=self.user1)
+        self.bob = Person.objects.create(name="Bob", created_by=self.user1)
+        self.carol = Person.objects.create(name="Carol", created_by=self.user1)
+
+    def conversation(self, days_ago, *people, **kwargs):
+        conversation = Conversation.objects.create(
+            date=self.today - timedelta(days=days_ago), type='phone', notes='Chat',
+            created_by=kwargs.pop('created_by', self.user1), **kwargs
+        )
+        conversation.participants.add(*people)
+        return conversation
+
+    def test_people_ordered_by_staleness(self):
+        self.conversation(5, self.alice)
+        self.conversation(50, self.bob)
+        response = self.client.get(reverse('person-list'), {'ordering': 'last_contacted'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [person['name'] for person in response.data['results']]
+        self.assertEqual(names, ['Carol', 'Bob', 'Alice'])
+
+        response = self.client.get(reverse('person-list'), {'ordering': '-last_contacted'})
+        names = [person['name'] for person in response.data['results']]
+        self.assertEqual(names, ['Alice', 'Bob', 'Carol'])
+
+    def test_dashboard_top_contacts_and_reach_out(self):
+        for days_ago in (200, 300, 400):
+            self.conversation(days_ago, self.alice)
+        self.conversation(10, self.bob)
+        # Another user's private conversations do not count
+        for days_ago in (200, 300, 400):
+            self.conversation(days_ago, self.carol, private=True, created_by=self.user2)
+
+        response = self.client.get(reverse('dashboard-analytics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        top = {person['name']: person['recent_conversation_count'] for person in response.data['top_contacts']}
+        self.assertEqual(top, {'Alice': 3, 'Bob': 1})
+        reach_out = [person['name'] for person in response.data['people_to_reach_out']]
+        self.assertEqual(reach_out, ['Alice'])
+
+    def test_private_contacts_only_show_to_their_owner(self):
+        self.conversation(30, self.alice)
+        self.conversation(2, self.alice, private=True, created_by=self.user2)
+        ContactAttempt.objects.create(
+            person=self.alice, date=self.today - timedelta(days=1), type='text', private=True, created_by=self.user2
+        )
+
+        def alice(user):
+            self.client.force_authenticate(user=user)
+            person = self.client.get(reverse('person-detail', kwargs={'pk': self.alice.pk})).data
+            snapshot = self.client.get(reverse('person-snapshot')).data['columns']
+            ordered = self.client.get(reverse('person-list'), {'ordering': '-last_contacted'}).data['results']
+            return (
+                person['last_contacted'], person['last_pinged'],
+                snapshot['last_contacted'][snapshot['name'].index('Alice')], ordered[0]['last_contacted'],
+            )
+
+        month_ago, two_days_ago = self.today - timedelta(days=30), self.today - timedelta(days=2)
+        self.assertEqual(alice(self.user1), (str(month_ago), None, month_ago, str(month_ago)))
+        self.assertEqual(alice(self.user2), (
+            str(two_days_ago), str(self.today - timedelta(days=1)), two_days_ago, str(two_days_ago)
+        ))
@@ -0,0 +1,138 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from orbit import api_urls
+from orbit.activity import reset_activity_store
+from orbit.graph import reset_relationship_graph
+from orbit.models import Person, Conversation, ContactAttempt, Relationship
+from orbit.person_stats import rebuild_person_stats
+from orbit.rollups import rebuild_activity_rollups
+from orbit.tests.query_budget import QUERY_BUDGETS, UNBUDGETED, query_budget
+
+
+# Arguments for endpoints with URL parameters other than a detail pk
+URL_KWARGS = {
+    'export': {'kind': 'conversations', 'fmt': 'csv'},
+}
+
+
+def seed_dataset(size, user):
+    """Create `size` people, conversations, pings and relationships with bulk inserts"""
+    today = date.today()
+    people = Person.objects.bulk_create([
+        Person(
+            name=f"Person {i}", location=f"City {i % 7}", company=f"Company {i % 5}",
+            birthday_month=i % 12 + 1, birthday_day=i % 28 + 1, created_by=user,
+        )
+        for i in range(size)
+    ])
+    conversations = Conversation.objects.bulk_create([
+        Conversation(
+            date=today - timedelta(days=i % 700), type='phone', location=f"Cafe {i % 3}",
+            notes=f"Conversation {i}", private=i % 4 == 0, created_by=user,
+        )
+        for i in range(size)
+    ])
+    Participation = Conversation.participants.through
+    Participation.objects.bulk_create([
+        Participation(conversation_id=conversation.id, person_id=people[(i + offset) % size].id)
+        for i, conversation in enumerate(conversations)
+        for offset in range(2)
+    ])
+    ContactAttempt.objects.bulk_create([
+        ContactAttempt(
+            person=people[i], date=today - timedelta(days=i % 400), type='text',
+            private=i % 3 == 0, created_by=user,
+        )
+        for i in range(size)
+    ])
+    Relationship.objects.bulk_create([
+        Relationship(person1=people[i], person2=people[i + 1], relationship_type='friend', created_by=user)
+        for i in range(size - 1)
+    ])
+    rebuild_activity_rollups()
+    rebuild_person_stats()
+
+
+class QueryBudgetCoverageTest(TestCase):
+    def test_every_get_endpoint_has_a_budget(self):
+        names = {pattern.name for pattern in api_urls.router.urls} | {
+            pattern.name for pattern in api_urls.urlpatterns if getattr(pattern, 'name', None)
+        }
+        missing = names - set(QUERY_BUDGETS) - UNBUDGETED
+        self.assertFalse(missing, f"Add query budgets for: {sorted(missing)}")
+
+
+class QueryBudgetMixin:
+    size = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123', is_staff=True)
+        seed_dataset(cls.size, cls.user)
+        cls.detail_objects = {
+            'person-detail': Person.objects.first(),
+            'conversation-detail': Conversation.objects.first(),
+            'contactattempt-detail': ContactAttempt.objects.first(),
+            'relationship-detail': Relationship.objects.first(),
+        }
+        first, last = Person.objects.get(name='Person 0'), Person.objects.get(name=f"Person {cls.size - 1}")
+        cls.url_kwargs = dict(URL_KWARGS, **{
+            'person-overview': {'pk': first.pk},
+            'person-connections': {'pk': first.pk},
+            'person-neighborhood': {'pk': first.pk},
+            'person-activity': {'pk': first.pk},
+            # Across the whole chain of friendships
+            'person-path': {'pk': first.pk, 'target': last.pk},
+        })
+
+    def setUp(self):
+        cache.clear()
+        reset_relationship_graph()
+        reset_activity_store()
+        self.client.force_authenticate(user=self.user)
+
+    def test_endpoints_within_budget(self):
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                if name in self.detail_objects:
+                    url = reverse(name, kwargs={'pk': self.detail_objects[name].pk})
+                else:
+                    url = reverse(name, kwargs=self.url_kwargs.get(name))
+                with query_budget(budget, label=f"GET {url} with {self.size} rows"):
+                    response = self.client.get(url)
+                    if response.streaming:
+                        # Streaming responses run their queries as they are consumed
+                        b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SmallDatasetQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    size = 10
+
+
+class LargeDatasetQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    size = 1000
+
+
+class AdminQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='testpass123')
+        seed_dataset(200, cls.admin)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelists_within_budget(self):
+        # Session, user, permissions, list filters and counts, plus the page and any prefetches
+        for model, budget in [('person', 8), ('conversation', 8), ('contactattempt', 7), ('relationship', 7)]:
+            with self.subTest(model=model):
+                url = reverse(f'admin:orbit_{model}_changelist')
+                with query_budget(budget, label=f"GET {url}"):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,100 @@
+import re
+import unittest
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from orbit.models import Person
+from orbit.tests.test_query_budgets import seed_dataset
+
+
+# A step that reads every row of a table rather than searching or walking an index
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def query_plan(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[3] for row in cursor.fetchall()]
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'query plans are checked against SQLite')
+class QueryPlanTest(APITestCase):
+    """Every query behind the hot endpoints must be answered from an index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123')
+        seed_dataset(50, cls.user)
+        cls.person = Person.objects.get(name='Person 0')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def plans(self, url, params=None):
+        """(sql, plan) for each SELECT run by GET `url`"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (query['sql'], query_plan(query['sql']))
+            for query in context.captured_queries if query['sql'].startswith('SELECT')
+        ]
+
+    def assertNoFullScans(self, url, params=None):
+        for sql, plan in self.plans(url, params):
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+            self.assertFalse(scans, f"GET {url} {params or ''} scans a whole table:\n{sql}\n{plan}")
+
+    def assertUsesIndex(self, index, url, params=None):
+        plans = self.plans(url, params)
+        self.assertTrue(
+            any(index in step for _, plan in plans for step in plan),
+            f"GET {url} {params or ''} no longer uses {index}:\n" + '\n'.join(str(plan) for _, plan in plans)
+        )
+
+    def test_hot_endpoints_use_indexes(self):
+        endpoints = [
+            (reverse('conversation-list'), None),
+            (reverse('conversation-list'), {'pagination': 'cursor'}),
+            (reverse('conversation-list'), {'participant': self.person.pk}),
+            (reverse('contactattempt-list'), {'pagination': 'cursor'}),
+            (reverse('contactattempt-list'), {'person': self.person.pk}),
+            (reverse('relationship-list'), {'person': self.person.pk}),
+            (reverse('person-detail', kwargs={'pk': self.person.pk}), None),
+            (reverse('person-overview', kwargs={'pk': self.person.pk}), None),
+            (reverse('reach-out'), None),
+            # Includes the next 30 days of birthdays; the birthday timeline reads the whole year by design
+            (reverse('dashboard-analytics'), None),
+        ]
+        for url, params in endpoints:
+            with self.subTest(url=url, params=params):
+                self.assertNoFullScans(url, params)
+
+    def test_date_ordered_lists(self):
+        self.assertUsesIndex('conversation_date', reverse('conversation-list'), {'pagination': 'cursor'})
+        self.assertUsesIndex('contactattempt_date', reverse('contactattempt-list'), {'pagination': 'cursor'})
+
+    def test_per_person_lookups(self):
+        self.assertUsesIndex(
+            'conversation_participants_person', reverse('conversation-list'), {'participant': self.person.pk}
+        )
+        self.assertUsesIndex('contactattempt_person_date', reverse('contactattempt-list'), {'person': self.person.pk})
+
+    def test_reach_out_ranking(self):
+        self.assertUsesIndex('reach_out_ranking', reverse('reach-out'))
+        # Each branch walks the index in ranking order and stops at the limit
+        for sql, plan in self.plans(reverse('reach-out')):
+            self.assertFalse(
+                [step for step in plan if 'TEMP B-TREE' in step or 'MULTI-INDEX OR' in step or 'CORRELATED' in step],
+                f"{sql}\n{plan}",
+            )
+
+    def test_birthday_lookup(self):
+        sql, params = Person.objects.filter(birthday_month=3, birthday_day=4).query.sql_with_params()
+        self.assertIn('USING INDEX person_birthday', ' '.join(query_plan(sql, params)))
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from orbit.models import Person, Conversation, ContactAttempt, ReachOutScore
+from orbit.person_stats import rebuild_person_stats
+from orbit.reach_out import cadences, refresh_stale_reach_out_scores
+
+
+def scores():
+    return set(ReachOutScore.objects.values_list('person_id', 'owner_id', 'score', 'cadence_days', 'contact_days'))
+
+
+class CadencesTest(TestCase):
+    def test_per_group_statistics(self):
+        groups = np.array([1, 0, 0, 1, 0, 0, 2, 1])
+        days = np.array([100, 10, 20, 130, 20, 50, 7, 110])
+        counts, last, medians = cadences(groups, days, 4)
+        # Group 0 has days 10, 20, 50 (20 twice): gaps 10 and 30
+        self.assertEqual(counts.tolist(), [3, 3, 1, 0])
+        self.assertEqual(last.tolist(), [50, 130, 7, 0])
+        self.assertEqual(medians[:2].tolist(), [20.0, 15.0])
+        self.assertTrue(np.isnan(medians[2:]).all())
+
+
+class ReachOutScoreTest(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.client.force_authenticate(user=self.user1)
+        self.today = timezone.localdate()
+        self.monthly = Person.objects.create(name="Monthly")
+        self.weekly = Person.objects.create(name="Weekly")
+        # Every 30 days, last seen 60 days ago: two cycles overdue
+        for days_ago in [60, 90, 120, 150]:
+            self.converse(self.monthly, days_ago)
+        # Every 7 days, last pinged 7 days ago: due today
+        for days_ago in [7, 14, 21]:
+            ContactAttempt.objects.create(
+                person=self.weekly, date=self.today - timedelta(days=days_ago), type='text', created_by=self.user1
+            )
+
+    def converse(self, person, days_ago, **fields):
+        conversation = Conversation.objects.create(
+            date=self.today - timedelta(days=days_ago), type='phone', notes='Call', created_by=self.user1, **fields
+        )
+        conversation.participants.add(person)
+        return conversation
+
+    def ranking(self, **params):
+        response = self.client.get(reverse('reach-out'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(result['person']['name'], result['score']) for result in response.data['results']]
+
+    def test_scores_follow_cadence(self):
+        self.assertEqual(self.ranking(), [('Monthly', 2.0), ('Weekly', 1.0)])
+        result = self.client.get(reverse('reach-out')).data['results'][0]
+        self.assertEqual((result['cadence_days'], result['days_since'], result['contact_days']), (30.0, 60, 4))
+
+    def test_updated_when_contact_is_logged(self):
+        self.converse(self.monthly, 0)
+        self.assertEqual(self.ranking(), [('Weekly', 1.0), ('Monthly', 0.0)])
+
+        conversation = Conversation.objects.get(date=self.today)
+        conversation.participants.remove(self.monthly)
+        self.assertEqual(self.ranking()[0], ('Monthly', 2.0))
+
+    def test_too_few_contacts(self):
+        quiet = Person.objects.create(name="Quiet")
+        self.converse(quiet, 10)
+        self.converse(quiet, 10)
+        self.converse(quiet, 40)
+        self.assertNotIn('Quiet', [name for name, _ in self.ranking()])
+
+    def test_private_contacts_only_count_for_their_owner(self):
+        self.converse(self.monthly, 1, private=True)
+        self.assertEqual(self.ranking()[0], ('Weekly', 1.0))
+        self.client.force_authenticate(user=self.user2)
+        self.assertEqual(self.ranking()[0], ('Monthly', 2.0))
+
+    def test_scores_age_daily(self):
+        ReachOutScore.objects.update(computed_on=self.today - timedelta(days=1))
+        refresh_stale_reach_out_scores(today=self.today + timedelta(days=30))
+        self.assertEqual(
+            dict(ReachOutScore.objects.values_list('person__name', 'score')), {'Monthly': 3.0, 'Weekly': 37 / 7}
+        )
+
+    def test_requests_dont_re_age_scores(self):
+        # As if Monthly's score was last aged 45 days ago
+        ReachOutScore.objects.filter(person=self.monthly).update(score=0.5, computed_on=self.today - timedelta(days=45))
+        with self.assertNumQueries(2):
+            # Ordered by the stored scores until they're re-aged, but reported as of today
+            self.assertEqual(self.ranking(), [('Weekly', 1.0), ('Monthly', 2.0)])
+        self.assertEqual(ReachOutScore.objects.filter(computed_on__lt=self.today).count(), 1)
+
+        out = StringIO()
+        call_command('age_reach_out_scores', stdout=out)
+        self.assertIn('Re-aged 1 reach-out scores', out.getvalue())
+        self.assertEqual(self.ranking(), [('Monthly', 2.0), ('Weekly', 1.0)])
+
+    def test_incremental_matches_rebuild(self):
+        self.converse(self.weekly, 3, private=True)
+        ContactAttempt.objects.filter(person=self.weekly).first().delete()
+        self.converse(self.monthly, 45).participants.add(self.weekly)
+        incremental = scores()
+        ReachOutScore.objects.all().delete()
+        rebuild_person_stats()
+        self.assertEqual(incremental, scores())
+
+    def test_limit(self):
+        self.assertEqual(len(self.ranking(limit=1)), 1)
+        response = self.client.get(reverse('reach-out'), {'limit': 'all'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,114 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from io import StringIO
+from orbit.models import Person, Conversation, ContactAttempt, ActivityRollup
+from orbit.rollups import activity_by_day
+
+
+class ActivityRollupSignalTest(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.person = Person.objects.create(name="Alice", created_by=self.user1)
+        self.today = date.today()
+
+    def rollup_count(self, day, kind, owner=None):
+        rollup = ActivityRollup.objects.filter(day=day, kind=kind, owner=owner).first()
+        return rollup.count if rollup else 0
+
+    def test_create_increments_public_rollup(self):
+        Conversation.objects.create(date=self.today, type='phone', notes='Call', created_by=self.user1)
+        Conversation.objects.create(date=self.today, type='text', notes='Text', created_by=self.user2)
+        self.assertEqual(self.rollup_count(self.today, 'conversation'), 2)
+
+    def test_private_rows_counted_under_owner(self):
+        ContactAttempt.objects.create(
+            person=self.person, date=self.today, type='text', private=True, created_by=self.user1
+        )
+        self.assertEqual(self.rollup_count(self.today, 'contact_attempt'), 0)
+        self.assertEqual(self.rollup_count(self.today, 'contact_attempt', owner=self.user1), 1)
+
+    def test_edit_moves_count_between_buckets(self):
+        conversation = Conversation.objects.create(
+            date=self.today, type='phone', notes='Call', created_by=self.user1
+        )
+        yesterday = self.today - timedelta(days=1)
+        conversation.date = yesterday
+        conversation.private = True
+        conversation.save()
+        self.assertEqual(self.rollup_count(self.today, 'conversation'), 0)
+        self.assertEqual(self.rollup_count(yesterday, 'conversation', owner=self.user1), 1)
+
+    def test_delete_decrements_rollup(self):
+        attempt = ContactAttempt.objects.create(
+            person=self.person, date=self.today, type='call', created_by=self.user1
+        )
+        attempt.delete()
+        self.assertEqual(self.rollup_count(self.today, 'contact_attempt'), 0)
+
+    def test_visibility_combines_public_and_own_private(self):
+        Conversation.objects.create(date=self.today, type='phone', notes='Public', created_by=self.user1)
+        Conversation.objects.create(
+            date=self.today, type='phone', notes='Mine', private=True, created_by=self.user1
+        )
+        Conversation.objects.create(
+            date=self.today, type='phone', notes='Theirs', private=True, created_by=self.user2
+        )
+        activity = activity_by_day(self.user1, since=self.today)
+        self.assertEqual(activity[(self.today, 'conversation')], 2)
+
+    def test_rebuild_command_fixes_drift(self):
+        Conversation.objects.create(date=self.today, type='phone', notes='Call', created_by=self.user1)
+        # Queryset updates bypass the signal handlers
+        Conversation.objects.update(date=self.today - timedelta(days=3))
+        ActivityRollup.objects.create(day=self.today, kind='contact_attempt', count=5)
+
+        out = StringIO()
+        call_command('rebuild_activity_rollups', stdout=out)
+
+        self.assertIn('rebuilt', out.getvalue())
+        self.assertEqual(self.rollup_count(self.today, 'conversation'), 0)
+        self.assertEqual(self.rollup_count(self.today, 'contact_attempt'), 0)
+        self.assertEqual(self.rollup_count(self.today - timedelta(days=3), 'conversation'), 1)
+
+
+class DashboardActivityTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.client.force_authenticate(user=self.user1)
+        self.person = Person.objects.create(name="Alice", created_by=self.user1)
+        self.today = timezone.localdate()
+
+        Conversation.objects.create(date=self.today, type='phone', notes='Today', created_by=self.user1)
+        Conversation.objects.create(
+            date=self.today - timedelta(days=20), type='phone', notes='Earlier', created_by=self.user2
+        )
+        Conversation.objects.create(
+            date=self.today, type='phone', notes='Hidden', private=True, created_by=self.user2
+        )
+        ContactAttempt.objects.create(
+            person=self.person, date=self.today - timedelta(days=100), type='text', created_by=self.user1
+        )
+
+    def test_activity_overview_counts(self):
+        response = self.client.get(reverse('dashboard-analytics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        overview = response.data['activity_overview']
+        self.assertEqual(overview['conversations'], {'week': 1, 'month': 2, 'year': 2})
+        self.assertEqual(overview['contact_attempts'], {'week': 0, 'month': 0, 'year': 1})
+
+    def test_monthly_activity_matches_totals(self):
+        response = self.client.get(reverse('dashboard-analytics'))
+        monthly = response.data['monthly_activity']
+        self.assertEqual(len(monthly), 12)
+        self.assertEqual(monthly[-1]['month_start'], self.today.replace(day=1))
+        self.assertEqual(sum(month['conversations'] for month in monthly), 2)
+        self.assertEqual(sum(month['contact_attempts'] for month in monthly), 1)
@@ -0,0 +1,114 @@
+import unittest
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from orbit.models import Person, Conversation
+from orbit.search import match_expression, search, tsquery_expression
+
+
+class MatchExpressionTest(TestCase):
+    def test_words_are_quoted_and_last_is_prefix(self):
+        self.assertEqual(match_expression('ski trip'), '"ski" "trip"*')
+
+    def test_syntax_is_neutralized(self):
+        self.assertEqual(match_expression('NEAR(" OR *'), '"NEAR" "OR"*')
+        self.assertIsNone(match_expression('  "*" '))
+
+    def test_tsquery_expression(self):
+        self.assertEqual(tsquery_expression('ski trip'), 'ski & trip:*')
+        self.assertEqual(tsquery_expression("a & !b | c:*"), 'a & b & c:*')
+        self.assertIsNone(tsquery_expression(' & | '))
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.alice = Person.objects.create(
+            name="Alice", how_we_met="Met on a ski trip in Colorado", created_by=self.user
+        )
+
+    def ids(self, user, query, **kwargs):
+        return [result['id'] for result in search(user, query, **kwargs)]
+
+    def test_person_fields_are_searchable(self):
+        self.assertEqual(self.ids(self.user, 'colorado'), [str(self.alice.id)])
+        self.assertEqual(self.ids(self.user, 'ali'), [str(self.alice.id)])
+
+    def test_stemming(self):
+        self.assertEqual(self.ids(self.user, 'skiing trips'), [str(self.alice.id)])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.alice.how_we_met = 'College roommates'
+        self.alice.save()
+        self.assertEqual(self.ids(self.user, 'colorado'), [])
+        self.assertEqual(self.ids(self.user, 'roommates'), [str(self.alice.id)])
+        self.alice.delete()
+        self.assertEqual(self.ids(self.user, 'roommates'), [])
+
+    def test_private_conversations_only_match_for_their_creator(self):
+        conversation = Conversation.objects.create(
+            date=date.today(), type='phone', notes='Talked about the surprise party',
+            private=True, created_by=self.other
+        )
+        self.assertEqual(self.ids(self.user, 'surprise'), [])
+        self.assertEqual(self.ids(self.other, 'surprise'), [str(conversation.id)])
+        conversation.private = False
+        conversation.save()
+        self.assertEqual(self.ids(self.user, 'surprise'), [str(conversation.id)])
+
+    def test_name_matches_rank_first(self):
+        colorado = Person.objects.create(name="Colorado Smith", created_by=self.user)
+        self.assertEqual(self.ids(self.user, 'colorado'), [str(colorado.id), str(self.alice.id)])
+
+    def test_kind_filter(self):
+        Conversation.objects.create(date=date.today(), type='phone', notes='Colorado plans', created_by=self.user)
+        self.assertEqual(self.ids(self.user, 'colorado', kind='person'), [str(self.alice.id)])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'the FTS5 index table is SQLite-only')
+    def test_rebuild_command(self):
+        Conversation.objects.create(date=date.today(), type='phone', notes='Colorado plans', created_by=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM orbit_search')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('2 rows', out.getvalue())
+        self.assertEqual(len(self.ids(self.user, 'colorado')), 2)
+
+
+class SearchAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.conversation = Conversation.objects.create(
+            date=date.today(), type='phone', notes='Planning the <b>reunion</b> in Denver', created_by=self.user
+        )
+
+    def test_results_have_escaped_highlighted_snippets(self):
+        response = self.client.get(reverse('search'), {'q': 'reunion'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['kind'], 'conversation')
+        self.assertEqual(result['id'], str(self.conversation.id))
+        self.assertIn('<mark>reunion</mark>', result['snippet'])
+        # Markup in the notes is escaped by FTS5 snippets and dropped by Postgres headlines
+        self.assertNotIn('<b>', result['snippet'])
+        if connection.vendor == 'sqlite':
+            self.assertIn('&lt;b&gt;<mark>reunion</mark>&lt;/b&gt;', result['snippet'])
+
+    def test_empty_query(self):
+        response = self.client.get(reverse('search'))
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_params(self):
+        response = self.client.get(reverse('search'), {'q': 'reunion', 'kind': 'ping'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('search'), {'q': 'reunion', 'limit': 'all'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from orbit.models import Person, Conversation
+
+
+class PeopleSnapshotTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.alice = Person.objects.create(
+            name="Alice", location="Austin", birthday_month=3, birthday_day=14, created_by=self.user
+        )
+        self.bob = Person.objects.create(name="Bob", company="Acme", created_by=self.user)
+        self.url = reverse('person-snapshot')
+
+    def test_columns(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        columns = response.data['columns']
+        self.assertEqual(list(columns), [
+            'id', 'name', 'name_ext', 'location', 'company',
+            'birthday_month', 'birthday_day', 'birth_year', 'last_contacted',
+        ])
+        self.assertEqual(columns['name'], ['Alice', 'Bob'])
+        self.assertEqual(columns['location'], ['Austin', ''])
+        self.assertEqual(columns['birthday_month'], [3, None])
+        self.assertNotIn('notes', columns)
+
+    def test_empty_directory(self):
+        Person.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['columns']['id'], [])
+
+    def test_not_modified_until_something_changes(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        conversation = Conversation.objects.create(date=date.today(), type='phone', created_by=self.user)
+        conversation.participants.add(self.bob)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['columns']['last_contacted'], [None, date.today()])
+
+    def test_delete_changes_version(self):
+        etag = self.client.get(self.url)['ETag']
+        self.bob.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
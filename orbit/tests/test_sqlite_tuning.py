@@ -0,0 +1,93 @@
+import threading
+import unittest
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from orbit.middleware import WriteTransactionMiddleware
+from orbit.models import Person
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite connection tuning')
+class SQLitePragmaTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connections(self):
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('temp_store'), 2)   # MEMORY
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_transactions_begin_immediate(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite write transactions')
+class WriteTransactionMiddlewareTest(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_request(self, method, view):
+        request = getattr(self.factory, method)('/api/people/')
+        return WriteTransactionMiddleware(view)(request)
+
+    def test_writes_run_in_one_transaction(self):
+        def view(request):
+            self.assertTrue(connection.in_atomic_block)
+            Person.objects.create(name='Alice')
+            return HttpResponse(status=201)
+        self.run_request('post', view)
+        self.assertTrue(Person.objects.filter(name='Alice').exists())
+
+    def test_reads_stay_in_autocommit(self):
+        def view(request):
+            self.assertFalse(connection.in_atomic_block)
+            return HttpResponse()
+        self.run_request('get', view)
+
+    def test_error_responses_roll_back(self):
+        def view(request):
+            Person.objects.create(name='Alice')
+            return HttpResponse(status=400)
+        self.run_request('post', view)
+        self.assertFalse(Person.objects.exists())
+
+    def hold_write_lock(self, seconds):
+        """Hold a write transaction from another connection for `seconds`"""
+        held = threading.Event()
+
+        def holder():
+            with transaction.atomic():
+                Person.objects.create(name='Holder')
+                held.set()
+                threading.Event().wait(seconds)
+            connections.close_all()
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        held.wait()
+        return thread
+
+    def test_locked_begin_is_retried(self):
+        def view(request):
+            Person.objects.create(name='Alice')
+            return HttpResponse(status=201)
+        thread = self.hold_write_lock(0.05)
+        try:
+            self.assertEqual(self.run_request('post', view).status_code, 201)
+        finally:
+            thread.join()
+        self.assertEqual(Person.objects.count(), 2)
+
+    @override_settings(SQLITE_WRITE_RETRIES=0)
+    def test_gives_up_after_retries(self):
+        thread = self.hold_write_lock(0.2)
+        try:
+            with self.assertRaises(OperationalError):
+                self.run_request('post', lambda request: HttpResponse())
+        finally:
+            thread.join()
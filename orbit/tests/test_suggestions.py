@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from orbit.models import Person, Conversation
+from orbit.suggestions import reset_suggestion_indexes
+
+
+class SuggestionAutocompleteTest(APITestCase):
+    def setUp(self):
+        reset_suggestion_indexes()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        for name, location in [('Ann', 'Denver'), ('Ben', 'Dallas'), ('Cal', 'Dallas'), ('Dee', 'Austin')]:
+            Person.objects.create(name=name, location=location, created_by=self.user)
+
+    def locations(self, params=None, url_name='location-suggestions'):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['locations']
+
+    def test_without_q_returns_full_sorted_list(self):
+        self.assertEqual(self.locations(), ['Austin', 'Dallas', 'Denver'])
+
+    def test_prefix_ranked_by_use(self):
+        self.assertEqual(self.locations({'q': 'd'}), ['Dallas', 'Denver'])
+        self.assertEqual(self.locations({'q': 'DE'}), ['Denver'])
+        self.assertEqual(self.locations({'q': 'd', 'limit': 1}), ['Dallas'])
+        self.assertEqual(self.locations({'q': 'x'}), [])
+
+    def test_lookups_run_no_queries(self):
+        self.locations({'q': 'd'})
+        with self.assertNumQueries(0):
+            self.locations({'q': 'da'})
+
+    def test_index_follows_committed_writes(self):
+        self.locations({'q': 'd'})
+        with self.captureOnCommitCallbacks(execute=True):
+            Person.objects.create(name='Eve', location='Denver', created_by=self.user)
+            Person.objects.create(name='Fay', location='Denver', created_by=self.user)
+        self.assertEqual(self.locations({'q': 'd'}), ['Denver', 'Dallas'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person = Person.objects.get(name='Dee')
+            person.location = 'Boulder'
+            person.save()
+        self.assertEqual(self.locations({'q': 'a'}), [])
+        self.assertEqual(self.locations({'q': 'b'}), ['Boulder'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person.delete()
+        self.assertEqual(self.locations({'q': 'b'}), [])
+
+    def test_companies(self):
+        Person.objects.create(name='Gus', company='Acme', created_by=self.user)
+        response = self.client.get(reverse('company-suggestions'), {'q': 'ac'})
+        self.assertEqual(response.data['companies'], ['Acme'])
+
+    def test_conversation_locations_respect_privacy(self):
+        Conversation.objects.create(date=date.today(), type='in_person', location='Cafe Luna', created_by=self.user)
+        Conversation.objects.create(
+            date=date.today(), type='in_person', location='Cafe Secret', private=True, created_by=self.other
+        )
+        self.assertEqual(self.locations({'q': 'cafe'}, 'conversation-location-suggestions'), ['Cafe Luna'])
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(
+            self.locations({'q': 'cafe'}, 'conversation-location-suggestions'), ['Cafe Luna', 'Cafe Secret']
+        )
+
+    def test_invalid_limit(self):
+        response = self.client.get(reverse('location-suggestions'), {'q': 'd', 'limit': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,135 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from orbit.models import Person, Conversation
+from orbit.search import search
+from orbit.summaries import ExtractiveSummarizer, Summarizer, SummaryInput, summarize_people
+
+
+class RecordingSummarizer(Summarizer):
+    """Summarizes to the notes, remembering whose inputs it saw"""
+
+    def __init__(self):
+        self.seen = []
+
+    def summarize(self, inputs):
+        self.seen.append(inputs.notes)
+        return f"Summary of {inputs.notes}"
+
+
+class FailingSummarizer(Summarizer):
+    def summarize(self, inputs):
+        raise RuntimeError('model unavailable')
+
+
+class ExtractiveSummarizerTest(TestCase):
+    def test_picks_recurring_sentences_in_order(self):
+        summary = ExtractiveSummarizer().summarize(SummaryInput(
+            how_we_met='Met at the climbing gym in Boulder.',
+            notes='Loves climbing. Has a dog named Pepper. Works as a nurse.',
+            conversations=[
+                (date(2025, 5, 1), 'Planning a climbing trip to Boulder. Asked about Pepper.'),
+                (date(2025, 4, 1), 'Talked about the weather.'),
+            ],
+        ))
+        self.assertEqual(
+            summary,
+            'Met at the climbing gym in Boulder. Loves climbing. Planning a climbing trip to Boulder.',
+        )
+
+    def test_length_limit(self):
+        summarizer = ExtractiveSummarizer()
+        summary = summarizer.summarize(SummaryInput(notes='word ' * 1000))
+        self.assertEqual(len(summary), summarizer.max_length)
+
+
+class SummarizePeopleTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.people = [Person.objects.create(name=f"Guest {i}", notes=f"Notes {i}") for i in range(5)]
+        self.empty = Person.objects.create(name="Nobody")
+
+    def run_summaries(self, **kwargs):
+        summarizer = kwargs.pop('summarizer', None) or RecordingSummarizer()
+        return summarizer, summarize_people(summarizer, batch_size=2, **kwargs)
+
+    def test_only_changed_people_are_summarized(self):
+        summarizer, stats = self.run_summaries()
+        self.assertEqual(sorted(summarizer.seen), [f"Notes {i}" for i in range(5)])
+        self.assertEqual((stats.checked, stats.summarized, stats.updated, stats.unchanged), (6, 6, 5, 0))
+        self.assertEqual(Person.objects.get(pk=self.people[0].pk).ai_summary, "Summary of Notes 0")
+        self.assertEqual([result['label'] for result in search(self.user, 'summary notes 3')], ['Guest 3'])
+
+        summarizer, stats = self.run_summaries()
+        self.assertEqual(summarizer.seen, [])
+        self.assertEqual((stats.summarized, stats.unchanged), (0, 6))
+
+        self.people[1].notes = "New notes"
+        self.people[1].save()
+        summarizer, stats = self.run_summaries()
+        self.assertEqual(summarizer.seen, ["New notes"])
+
+        summarizer, stats = self.run_summaries(force=True)
+        self.assertEqual(len(summarizer.seen), 5)
+
+    def test_only_public_conversations_count(self):
+        self.run_summaries()
+        private = Conversation.objects.create(
+            date=date(2025, 1, 1), type='phone', notes='Secret', private=True, created_by=self.user
+        )
+        private.participants.add(self.people[0])
+        summarizer, _ = self.run_summaries()
+        self.assertEqual(summarizer.seen, [])
+
+        public = Conversation.objects.create(date=date(2025, 1, 2), type='phone', notes='Hello', created_by=self.user)
+        public.participants.add(self.people[0], self.empty)
+        summarizer, stats = self.run_summaries()
+        self.assertEqual(sorted(summarizer.seen), ["", "Notes 0"])
+        self.assertEqual(stats.updated, 1)
+
+    def test_new_summarizer_version_resummarizes(self):
+        self.run_summaries()
+        summarizer = RecordingSummarizer()
+        summarizer.version = '2'
+        self.run_summaries(summarizer=summarizer)
+        self.assertEqual(len(summarizer.seen), 5)
+
+    def test_failures_are_retried(self):
+        _, stats = self.run_summaries(summarizer=FailingSummarizer())
+        self.assertEqual((stats.failed, stats.summarized), (5, 1))
+        self.assertEqual(stats.errors[0][1], 'RuntimeError: model unavailable')
+        summarizer, _ = self.run_summaries()
+        self.assertEqual(len(summarizer.seen), 5)
+
+    def test_query_count_does_not_grow_when_unchanged(self):
+        self.run_summaries()
+        with self.assertNumQueries(1 + 2 * 3):  # ids, then people and conversations per batch of 2
+            self.run_summaries()
+
+
+class SummarizePeopleCommandTest(TestCase):
+    def test_command(self):
+        Person.objects.create(name="Alice", notes="Met at a conference. Loves hiking.")
+        out = StringIO()
+        call_command('summarize_people', stdout=out)
+        self.assertIn('1 summarized, 1 updated, 0 unchanged', out.getvalue())
+        self.assertEqual(Person.objects.get().ai_summary, "Met at a conference. Loves hiking.")
+
+        out = StringIO()
+        call_command('summarize_people', stdout=out)
+        self.assertIn('0 summarized, 0 updated, 1 unchanged', out.getvalue())
+
+    def test_failures(self):
+        Person.objects.create(name="Alice", notes="Loves hiking.")
+        with self.assertRaisesMessage(CommandError, '1 failed'):
+            call_command(
+                'summarize_people', summarizer='orbit.tests.test_summaries.FailingSummarizer',
+                stdout=StringIO(), stderr=StringIO(),
+            )
+
+    def test_unknown_summarizer(self):
+        with self.assertRaises(CommandError):
+            call_command('summarize_people', summarizer='orbit.nope.Summarizer', stdout=StringIO())
@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from orbit.models import Person, Conversation, ContactAttempt, Tombstone
+from orbit.sync import SYNC_TOKEN_HEADER, make_sync_token
+
+
+class DeltaSyncTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.alice = Person.objects.create(name="Alice", created_by=self.user)
+        self.bob = Person.objects.create(name="Bob", created_by=self.user)
+        self.conversation = Conversation.objects.create(
+            date=date.today(), type='phone', notes='Catch up', created_by=self.user
+        )
+        self.conversation.participants.add(self.alice)
+        # Everything above happened well before the client's last sync
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        for model in (Person, Conversation, ContactAttempt):
+            model.objects.update(updated_at=an_hour_ago)
+        self.token = make_sync_token(timezone.now() - timedelta(minutes=30))
+
+    def sync(self, url_name):
+        response = self.client.get(reverse(url_name), {'updated_since': self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_list_returns_token_header(self):
+        response = self.client.get(reverse('person-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(SYNC_TOKEN_HEADER, response)
+
+    def test_returns_only_changed_rows(self):
+        self.assertEqual(self.sync('person-list')['results'], [])
+        self.bob.notes = 'Moved to Denver'
+        self.bob.save()
+        data = self.sync('person-list')
+        self.assertEqual([item['id'] for item in data['results']], [str(self.bob.id)])
+        self.assertEqual(data['deleted'], [])
+        self.assertTrue(data['sync_token'])
+
+    def test_deleted_rows_are_reported(self):
+        bob_id = str(self.bob.id)
+        self.bob.delete()
+        data = self.sync('person-list')
+        self.assertEqual(data['deleted'], [bob_id])
+
+    def test_other_users_private_deletes_are_hidden(self):
+        private = Conversation.objects.create(
+            date=date.today(), type='text', private=True, created_by=self.other
+        )
+        private.delete()
+        self.assertEqual(self.sync('conversation-list')['deleted'], [])
+        self.assertEqual(Tombstone.objects.filter(owner=self.other).count(), 1)
+
+    def test_made_private_reads_as_deleted_for_others(self):
+        ping = ContactAttempt.objects.create(
+            person=self.alice, date=date.today(), type='text', created_by=self.other
+        )
+        ping.private = True
+        ping.save()
+        data = self.sync('contactattempt-list')
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['deleted'], [str(ping.id)])
+
+    def test_participant_change_touches_conversation(self):
+        self.conversation.participants.add(self.bob)
+        data = self.sync('conversation-list')
+        self.assertEqual([item['id'] for item in data['results']], [str(self.conversation.id)])
+
+    def test_rename_touches_related_conversations(self):
+        self.alice.name = 'Alicia'
+        self.alice.save()
+        data = self.sync('conversation-list')
+        self.assertEqual(data['results'][0]['participant_names'], ['Alicia'])
+
+    def test_invalid_token(self):
+        response = self.client.get(reverse('person-list'), {'updated_since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
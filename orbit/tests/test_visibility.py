@@ -0,0 +1,42 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.db.models import Max
+from django.test import TestCase
+from datetime import date
+from orbit.models import Person, Conversation, ContactAttempt
+
+
+class VisibleToTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.alice = Person.objects.create(name="Alice", created_by=self.user)
+        self.public = Conversation.objects.create(date=date(2024, 5, 1), type='phone', created_by=self.other)
+        self.mine = Conversation.objects.create(date=date(2024, 5, 2), type='text', private=True, created_by=self.user)
+        self.hidden = Conversation.objects.create(date=date(2024, 5, 3), type='text', private=True, created_by=self.other)
+        for conversation in [self.public, self.mine, self.hidden]:
+            conversation.participants.add(self.alice)
+        ContactAttempt.objects.create(person=self.alice, date=date(2024, 5, 4), type='text', created_by=self.other)
+        ContactAttempt.objects.create(person=self.alice, date=date(2024, 5, 5), type='text', private=True, created_by=self.other)
+
+    def test_public_and_own_private_rows(self):
+        visible = Conversation.objects.visible_to(self.user)
+        self.assertEqual(set(visible), {self.public, self.mine})
+        self.assertEqual(set(Conversation.objects.visible_to(self.other)), {self.public, self.hidden})
+        self.assertEqual(ContactAttempt.objects.visible_to(self.user).count(), 1)
+
+    def test_without_a_user_only_public_rows(self):
+        self.assertEqual(list(Conversation.objects.visible_to(None)), [self.public])
+        self.assertEqual(list(Conversation.objects.visible_to(AnonymousUser())), [self.public])
+
+    def test_chains_with_other_filters(self):
+        querysets = [
+            Conversation.objects.visible_to(self.user),
+            Conversation.objects.visible_to(self.user).filter(participants=self.alice),
+            ContactAttempt.objects.visible_to(self.other).filter(person=self.alice),
+            Conversation.objects.filter(date__gte=date(2024, 5, 2)).visible_to(self.user),
+            Conversation.objects.visible_to(self.other).annotate(latest=Max('participants__name')),
+            Conversation.objects.visible_to(self.user).prefetch_related('participants').select_related('created_by'),
+        ]
+        for queryset in querysets:
+            with self.subTest(query=str(queryset.query)):
+                self.assertEqual(queryset.count(), len(list(queryset)))
@@ -1,44 +1,340 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.response import Response
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q, Count, Max
+from django.db.models import Q, Count, Func, IntegerField, Max, OuterRef, Subquery, Sum, F
 from django.utils import timezone
-from datetime import datetime, timedelta
+import calendar
+import time
+import uuid
+from functools import partial
+from datetime import date, datetime, timedelta
 from .models import Person, Conversation, ContactAttempt, Relationship
 from .serializers import (
-    PersonSerializer, PersonDetailedSerializer, ConversationSerializer, 
+    PersonSerializer, PersonDetailedSerializer, PersonBirthdaySerializer, PersonThinSerializer, ConversationSerializer,
     ContactAttemptSerializer, RelationshipSerializer
 )
+from .activity import (
+    DEFAULT_WEEKS as ACTIVITY_DEFAULT_WEEKS, DEFAULT_WINDOW as ACTIVITY_DEFAULT_WINDOW,
+    MAX_WEEKS as ACTIVITY_MAX_WEEKS, MAX_WINDOW as ACTIVITY_MAX_WINDOW, person_activity
+)
+from .bulk import BulkWriteMixin
+from .conditional import ConditionalGetMixin, make_etag, not_modified, payload_etag, table_version
+from .graph import MAX_DEPTH as GRAPH_MAX_DEPTH, relationship_graph
+from .export import CONTENT_TYPES as EXPORT_CONTENT_TYPES, EXPORTS, PassthroughRenderer, stream_export
+from .dashboard_cache import get_cached_dashboard, cache_dashboard, dashboard_cache_stats
+from .parallel import run_concurrently
+from .pagination import DateKeysetPagination, DatePagination, SizedPagination
+from .person_stats import refresh_stale_person_stats, visible_stats
+from .reach_out import MAX_LIMIT as REACH_OUT_MAX_LIMIT, current_score, reach_out_ranking
+from .rollups import activity_by_day
+from .search import MAX_LIMIT as SEARCH_MAX_LIMIT, search
+from .suggestions import (
+    DEFAULT_LIMIT as SUGGESTION_DEFAULT_LIMIT, MAX_LIMIT as SUGGESTION_MAX_LIMIT,
+    conversation_locations, person_companies, person_locations
+)
+from .sync import DeltaSyncMixin, make_sync_token
+
+
+def is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
 
+def subquery_count(queryset):
+    """COUNT(*) of `queryset` as a correlated subquery, for use in annotate()"""
+    return Subquery(
+        queryset.order_by().annotate(count=Func('pk', function='COUNT')).values('count'),
+        output_field=IntegerField(),
+    )
 
-class PersonViewSet(viewsets.ModelViewSet):
+
+class PersonViewSet(ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = PersonSerializer
     permission_classes = [IsAuthenticated]
+    tombstone_model = 'person'
+    etag_models = [Person]
+    
+    # Allowed values for ?ordering=; never-contacted people sort as the most stale
+    ORDERINGS = {
+        'name': [F('name').asc()],
+        'last_contacted': [F('last_contacted').asc(nulls_first=True), F('name').asc()],
+        '-last_contacted': [F('last_contacted').desc(nulls_last=True), F('name').asc()],
+    }
     
     def get_queryset(self):
-        # People are shared across all family members
-        return Person.objects.all().select_related('created_by').annotate(last_contacted=Max('conversations__date')).order_by('name')
+        # People are shared across all family members, their private contacts are not
+        visible = visible_stats(self.request.user)
+        queryset = Person.objects.all().select_related('created_by').annotate(
+            last_contacted=Max('contact_stats__last_contacted', filter=visible),
+            last_pinged=Max('contact_stats__last_pinged', filter=visible),
+        )
+        ordering = self.request.query_params.get('ordering', 'name')
+        return queryset.order_by(*self.ORDERINGS.get(ordering, self.ORDERINGS['name']))
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+    
+    # Columns of the directory snapshot, in response order
+    SNAPSHOT_FIELDS = [
+        'id', 'name', 'name_ext', 'location', 'company',
+        'birthday_month', 'birthday_day', 'birth_year', 'last_contacted',
+    ]
+    
+    @action(detail=False)
+    def snapshot(self, request):
+        """The whole directory in one column-oriented response.
+
+        The version changes whenever a person is added, edited, deleted or
+        contacted, and is sent with the user in the ETag, since last_contacted
+        counts their private conversations, so clients can revalidate with
+        If-None-Match and skip the download.
+        """
+        state = Person.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+        version = f"{state['count']}-{make_sync_token(state['updated']) if state['updated'] else 0}"
+        etag = f'"{version}-{request.user.pk}"'
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        
+        rows = Person.objects.annotate(
+            last_contacted=Max('contact_stats__last_contacted', filter=visible_stats(request.user))
+        ).order_by('name', 'id').values_list(*self.SNAPSHOT_FIELDS)
+        columns = list(zip(*rows)) or [()] * len(self.SNAPSHOT_FIELDS)
+        return Response({
+            'version': version,
+            'count': state['count'],
+            'columns': {field: list(values) for field, values in zip(self.SNAPSHOT_FIELDS, columns)},
+        }, headers={'ETag': etag})
+
+    OVERVIEW_LIMIT = 10
+    OVERVIEW_MAX_LIMIT = 50
+    
+    @action(detail=True)
+    def overview(self, request, pk=None):
+        """Everything the person page shows, in one request.
+
+        Returns the person, counts of their visible conversations, pings and
+        relationships, and the most recent `limit` of each (default 10, at most
+        50). Each list carries a `next` link to the matching filtered list
+        endpoint when there is more to fetch: a cursor after the last row for
+        conversations and pings, page 2 at `limit` rows a page for
+        relationships. Runs in five queries at most.
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.OVERVIEW_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.OVERVIEW_MAX_LIMIT))
+        
+        user = request.user
+        person = get_object_or_404(self.get_queryset().annotate(
+            conversation_count=subquery_count(
+                Conversation.objects.visible_to(user).filter(participants=OuterRef('pk'))
+            ),
+            ping_count=subquery_count(ContactAttempt.objects.visible_to(user).filter(person=OuterRef('pk'))),
+            relationship_count=subquery_count(
+                Relationship.objects.filter(Q(person1=OuterRef('pk')) | Q(person2=OuterRef('pk')))
+            ),
+        ), pk=pk)
+        
+        # Ordered like the cursor-paginated lists, so `next` continues where these stop
+        conversations = list(
+            Conversation.objects.visible_to(user).filter(participants=person)
+            .select_related('created_by').prefetch_related('participants')
+            .order_by('-date', 'id')[:limit]
+        )
+        pings = list(
+            ContactAttempt.objects.visible_to(user).filter(person=person)
+            .select_related('person', 'created_by').order_by('-date', 'id')[:limit]
+        )
+        relationships = list(
+            Relationship.objects.filter(Q(person1=person) | Q(person2=person))
+            .select_related('person1', 'person2', 'created_by').order_by('person1__name', 'id')[:limit]
+        )
+        
+        def more(rows, count, url_name, param, **page):
+            if len(rows) >= count:
+                return None
+            url = replace_query_param(reverse(url_name, request=request), param, person.pk)
+            if not page:
+                page = {'cursor': DateKeysetPagination().encode_cursor(rows[-1])}
+            for key, value in page.items():
+                url = replace_query_param(url, key, value)
+            return url
+        
+        return Response({
+            'person': PersonSerializer(person, context={'request': request}).data,
+            'counts': {
+                'conversations': person.conversation_count,
+                'pings': person.ping_count,
+                'relationships': person.relationship_count,
+            },
+            'conversations': {
+                'results': ConversationSerializer(conversations, many=True).data,
+                'next': more(conversations, person.conversation_count, 'conversation-list', 'participant'),
+            },
+            'pings': {
+                'results': ContactAttemptSerializer(pings, many=True).data,
+                'next': more(pings, person.ping_count, 'contactattempt-list', 'person'),
+            },
+            'relationships': {
+                'results': RelationshipSerializer(relationships, many=True).data,
+                # The overview holds exactly one page of `limit` rows when there are more
+                'next': more(
+                    relationships, person.relationship_count, 'relationship-list', 'person', page=2, page_size=limit
+                ),
+            },
+        })
+    
+    # Relationship graph queries, answered from the in-memory graph
+    
+    def relationship_types(self):
+        """The ?relationship_type= filter as a set, or None for every type"""
+        value = self.request.query_params.get('relationship_type')
+        if not value:
+            return None
+        types = {item.strip() for item in value.split(',') if item.strip()}
+        valid = {choice for choice, _ in Relationship.RELATIONSHIP_TYPES}
+        if not types <= valid:
+            raise ValidationError({'relationship_type': f"Choose from {', '.join(sorted(valid))}"})
+        return types
+    
+    def graph_people(self, ids):
+        """{id: {id, name, name_ext}} for `ids`, in one query"""
+        rows = Person.objects.filter(id__in=ids).values('id', 'name', 'name_ext')
+        return {row['id']: row for row in rows}
+    
+    def graph_id(self, value):
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            raise NotFound()
+    
+    @action(detail=True)
+    def connections(self, request, pk=None):
+        """People directly related to this person, optionally filtered by relationship type"""
+        types = self.relationship_types()
+        root = self.graph_id(pk)
+        edges = relationship_graph.connections(root, types)
+        people = self.graph_people([root] + [neighbor for neighbor, _, _ in edges])
+        if root not in people:
+            raise NotFound()
+        connections = [
+            {'person': people[neighbor], 'relationship_id': relationship_id, 'relationship_type': relationship_type}
+            for neighbor, relationship_id, relationship_type in edges
+            if neighbor in people
+        ]
+        connections.sort(key=lambda item: (item['person']['name'], str(item['person']['id'])))
+        return Response({'person': people[root], 'connections': connections})
+    
+    @action(detail=True)
+    def neighborhood(self, request, pk=None):
+        """Everyone within ?depth= hops (default 2) and the relationships between them"""
+        types = self.relationship_types()
+        try:
+            depth = int(request.query_params.get('depth', 2))
+        except ValueError:
+            raise ValidationError({'depth': 'Must be an integer'})
+        depth = max(1, min(depth, GRAPH_MAX_DEPTH))
+        root = self.graph_id(pk)
+        distances, edges = relationship_graph.neighborhood(root, depth, types)
+        people = self.graph_people([root, *distances])
+        if root not in people:
+            raise NotFound()
+        members = sorted(
+            (dict(people[person], distance=distance) for person, distance in distances.items() if person in people),
+            key=lambda item: (item['distance'], item['name'], str(item['id'])),
+        )
+        relationships = [
+            {'id': relationship_id, 'person1': person1, 'person2': person2, 'relationship_type': relationship_type}
+            for relationship_id, person1, person2, relationship_type in edges
+            if person1 in people and person2 in people
+        ]
+        return Response({
+            'person': people[root],
+            'depth': depth,
+            'people': members,
+            'relationships': relationships,
+        })
+    
+    @action(detail=True, url_path=r'path/(?P<target>[^/.]+)')
+    def path(self, request, pk=None, target=None):
+        """The shortest chain of relationships from this person to `target`, or null if unconnected"""
+        types = self.relationship_types()
+        root, target = self.graph_id(pk), self.graph_id(target)
+        steps = relationship_graph.shortest_path(root, target, types)
+        people = self.graph_people({root, target, *(person for person, _, _ in steps or [])})
+        if root not in people or target not in people:
+            raise NotFound()
+        if steps is not None and any(person not in people for person, _, _ in steps):
+            # The graph still holds someone deleted by another process; treat as unconnected
+            steps = None
+        path = steps and [
+            {'person': people[person], 'relationship_id': relationship_id, 'relationship_type': relationship_type}
+            for person, relationship_id, relationship_type in steps
+        ]
+        return Response({
+            'person': people[root],
+            'target': people[target],
+            'degrees': len(path) - 1 if path else None,
+            'path': path,
+        })
+    
+    @action(detail=True)
+    def activity(self, request, pk=None):
+        """Weekly heatmaps and rolling frequency trends of the person's visible conversations and pings.
+
+        Covers the last ?weeks= weeks (default 52), counting contacts per
+        weekday, and for each week how many fell in the ?window= days (default
+        30) up to its end. Served from the in-memory activity store.
+        """
+        params = {}
+        for name, default, maximum in (
+            ('weeks', ACTIVITY_DEFAULT_WEEKS, ACTIVITY_MAX_WEEKS),
+            ('window', ACTIVITY_DEFAULT_WINDOW, ACTIVITY_MAX_WINDOW),
+        ):
+            try:
+                value = int(request.query_params.get(name, default))
+            except ValueError:
+                raise ValidationError({name: 'Must be an integer'})
+            params[name] = max(1, min(value, maximum))
+        root = self.graph_id(pk)
+        people = self.graph_people([root])
+        if root not in people:
+            raise NotFound()
+        activity = person_activity(root, request.user, timezone.localdate(), **params)
+        return Response({'person': people[root], **activity})
 
 
-class ConversationViewSet(viewsets.ModelViewSet):
+class ConversationViewSet(ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = ConversationSerializer
     permission_classes = [IsAuthenticated]
+    tombstone_model = 'conversation'
+    etag_models = [Conversation]
+    bulk_reference_fields = {'participant_ids': Person}
+    pagination_class = DatePagination
     
     def get_queryset(self):
-        # Include public conversations (private=False) and private conversations created by current user
-        queryset = Conversation.objects.filter(
-            Q(private=False) | Q(private=True, created_by=self.request.user)
-        ).prefetch_related('participants').select_related('created_by')
+        # Include public conversations and private conversations created by current user
+        queryset = Conversation.objects.visible_to(self.request.user).prefetch_related(
+            'participants'
+        ).select_related('created_by')
         
         # Filter by participant if provided
         participant_id = self.request.query_params.get('participant', None)
@@ -55,29 +351,53 @@ class ConversationViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
-class ContactAttemptViewSet(viewsets.ModelViewSet):
+class ContactAttemptViewSet(ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = ContactAttemptSerializer
     permission_classes = [IsAuthenticated]
+    tombstone_model = 'contactattempt'
+    etag_models = [ContactAttempt]
+    bulk_reference_fields = {'person': Person}
+    pagination_class = DatePagination
     
     def get_queryset(self):
-        # Include public contact attempts (private=False) and private attempts created by current user
-        return ContactAttempt.objects.filter(
-            Q(private=False) | Q(private=True, created_by=self.request.user)
-        ).select_related('person', 'created_by').order_by('-date')
+        # Include public contact attempts and private attempts created by current user
+        queryset = ContactAttempt.objects.visible_to(self.request.user).select_related('person', 'created_by')
+        
+        # Filter by person if provided
+        person_id = self.request.query_params.get('person')
+        if person_id:
+            if not is_uuid(person_id):
+                return ContactAttempt.objects.none()
+            queryset = queryset.filter(person_id=person_id)
+        
+        return queryset.order_by('-date')
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class RelationshipViewSet(viewsets.ModelViewSet):
+class RelationshipViewSet(ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     serializer_class = RelationshipSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SizedPagination
+    tombstone_model = 'relationship'
+    etag_models = [Relationship]
     
     def get_queryset(self):
         # Relationships are shared across all family members
-        return Relationship.objects.select_related(
+        queryset = Relationship.objects.select_related(
             'person1', 'person2', 'created_by',    
-        ).order_by('person1__name')
+        )
+        
+        # Filter to relationships in either direction involving a person, if provided
+        person_id = self.request.query_params.get('person')
+        if person_id:
+            if not is_uuid(person_id):
+                return Relationship.objects.none()
+            queryset = queryset.filter(Q(person1_id=person_id) | Q(person2_id=person_id))
+        
+        # Same order as the person overview, so its `next` page carries on from it
+        return queryset.order_by('person1__name', 'id')
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -152,234 +472,376 @@ def csrf_token(request):
     return Response({'csrfToken': get_token(request)})
 
 
-def get_upcoming_birthdays(days_ahead=30):
+def birthday_key(month, day):
+    """Encode a month and day the same way as Person.birthday_key"""
+    return month * 100 + day
+
+
+def next_birthday(month, day, today):
+    """Return the next occurrence of a birthday on or after today, or None if it is not a real date
+
+    Feb 29 birthdays are observed on Feb 28 in non-leap years.
+    """
+    for year in (today.year, today.year + 1):
+        if (month, day) == (2, 29) and not calendar.isleap(year):
+            occurrence = date(year, 2, 28)
+        else:
+            try:
+                occurrence = date(year, month, day)
+            except ValueError:
+                return None
+        if occurrence >= today:
+            return occurrence
+    return None
+
+
+def upcoming_birthday_filter(today, days_ahead):
+    """Filter on the indexed birthday_key for birthdays in the next `days_ahead` days"""
+    if days_ahead >= 365:
+        return Q(birthday_key__isnull=False)
+    end = today + timedelta(days=days_ahead)
+    start_key = birthday_key(today.month, today.day)
+    end_key = birthday_key(end.month, end.day)
+    if (end.month, end.day) == (2, 28) and not calendar.isleap(end.year):
+        # Feb 29 birthdays fall on the 28th this year
+        end_key = birthday_key(2, 29)
+    if end.year == today.year:
+        return Q(birthday_key__gte=start_key, birthday_key__lte=end_key)
+    # The range wraps past the end of the year
+    return Q(birthday_key__gte=start_key) | Q(birthday_key__lte=end_key)
+
+
+def get_upcoming_birthdays(days_ahead=30, today=None):
     """Get upcoming birthdays in the next N days"""
-    from datetime import date
-    from .serializers import PersonSerializer
-    
-    today = date.today()
+    today = today or date.today()
     birthdays = []
     
-    # Get all people with birthdays (month and day must be present)
     people_with_birthdays = Person.objects.filter(
-        birthday_month__isnull=False,
-        birthday_day__isnull=False
-    ).select_related('created_by')
+        upcoming_birthday_filter(today, days_ahead)
+    ).only('id', 'name', 'name_ext', 'birthday_month', 'birthday_day', 'birth_year')
     
     for person in people_with_birthdays:
-        # Calculate next birthday occurrence
-        try:
-            # Try this year first
-            birthday_this_year = date(today.year, person.birthday_month, person.birthday_day)
-            
-            if birthday_this_year >= today:
-                next_birthday = birthday_this_year
-            else:
-                # Birthday has passed this year, use next year
-                next_birthday = date(today.year + 1, person.birthday_month, person.birthday_day)
-                
-            days_until = (next_birthday - today).days
-            
-            if days_until <= days_ahead:
-                birthday_data = PersonSerializer(person).data
-                birthday_data['next_birthday'] = next_birthday.isoformat()
-                birthday_data['days_until'] = days_until
-                birthday_data['is_today'] = days_until == 0
-                birthdays.append(birthday_data)
-                
-        except ValueError:
-            # Handle invalid dates (like Feb 29 on non-leap years)
+        birthday = next_birthday(person.birthday_month, person.birthday_day, today)
+        if birthday is None:
+            # Skip impossible dates (like April 31)
             continue
+        
+        days_until = (birthday - today).days
+        if days_until <= days_ahead:
+            birthday_data = PersonBirthdaySerializer(person).data
+            birthday_data['next_birthday'] = birthday.isoformat()
+            birthday_data['days_until'] = days_until
+            birthday_data['is_today'] = days_until == 0
+            birthdays.append(birthday_data)
     
     # Sort by days until birthday
-    birthdays.sort(key=lambda x: x['days_until'])
+    birthdays.sort(key=lambda x: (x['days_until'], x['name']))
     return birthdays
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard_analytics(request):
-    """Get dashboard analytics data"""
-    now = timezone.now()
-    today = now.date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-    six_months_ago = today - timedelta(days=30 * 6)
-    year_ago = today - timedelta(days=365)
-    two_years_ago = today - timedelta(days=730)
-    
-    # Recent conversations (last 10, within past year)
-    recent_conversations = Conversation.objects.filter(
-        Q(date__gte=year_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).prefetch_related('participants').order_by('-date')[:10]
-    
-    # Top contacts by conversation count in past 1-2 years
-    top_contacts = Person.objects.annotate(
-        recent_conversation_count=Count(
-            'conversations',
-            filter=Q(conversations__date__gte=two_years_ago) &
-                   (Q(conversations__private=False) | Q(conversations__created_by=request.user))
-        )
-    ).filter(recent_conversation_count__gt=0).order_by('-recent_conversation_count')[:10]
-    
-    # Activity counts
-    conversations_week = Conversation.objects.filter(
-        Q(date__gte=week_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).count()
-    
-    conversations_month = Conversation.objects.filter(
-        Q(date__gte=month_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).count()
-    
-    conversations_year = Conversation.objects.filter(
-        Q(date__gte=year_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).count()
-    
-    contact_attempts_week = ContactAttempt.objects.filter(
-        Q(date__gte=week_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).count()
-    
-    contact_attempts_month = ContactAttempt.objects.filter(
-        Q(date__gte=month_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).count()
-    
-    contact_attempts_year = ContactAttempt.objects.filter(
-        Q(date__gte=year_ago) &
-        (Q(private=False) | Q(created_by=request.user))
-    ).count()
-    
-    # People to reach out to (those with conversations but none recently)
-    # Find people with conversations > 30 days ago but historically active
-    people_to_reach_out = Person.objects.filter(
-        conversations__isnull=False
-    ).annotate(
-        total_conversations=Count('conversations', filter=
-            (Q(conversations__private=False) | Q(conversations__created_by=request.user)) & Q(conversations__date__gte=two_years_ago)
-        ),
-        recent_conversations=Count('conversations', filter=
-            Q(conversations__date__gte=six_months_ago) &
-            (Q(conversations__private=False) | Q(conversations__created_by=request.user))
-        )
-    ).filter(
-        total_conversations__gte=3,  # At least 3 total conversations
-        recent_conversations=0       # But none recently
-    ).distinct()[:10]
-    
-    # Monthly activity data for chart (past 12 months)
-    monthly_data = []
+def chart_months(today):
+    """(first day, last day) of each of the past 12 months, newest first, ending today"""
+    months = []
     current_date = today.replace(day=1)  # Start of current month
     
     for month in range(12):
-        # Calculate the target month (going backwards)
-        if month == 0:
-            target_month = current_date
-        else:
-            # Go back month by month
-            year = current_date.year
-            month_num = current_date.month - month
-            while month_num <= 0:
-                month_num += 12
-                year -= 1
-            target_month = current_date.replace(year=year, month=month_num, day=1)
-        
-        # Calculate month boundaries
-        month_start = target_month
+        # Go back month by month
+        year = current_date.year
+        month_num = current_date.month - month
+        while month_num <= 0:
+            month_num += 12
+            year -= 1
+        month_start = current_date.replace(year=year, month=month_num, day=1)
         
         # Get the last day of this month
-        if target_month.month == 12:
-            next_month_start = target_month.replace(year=target_month.year + 1, month=1, day=1)
+        if month_start.month == 12:
+            next_month_start = month_start.replace(year=month_start.year + 1, month=1, day=1)
         else:
-            next_month_start = target_month.replace(month=target_month.month + 1, day=1)
+            next_month_start = month_start.replace(month=month_start.month + 1, day=1)
         month_end = next_month_start - timedelta(days=1)
         
         # For current month, don't go beyond today
         if month == 0:
             month_end = min(month_end, today)
         
-        conv_count = Conversation.objects.filter(
-            Q(date__gte=month_start) & Q(date__lte=month_end) &
-            (Q(private=False) | Q(created_by=request.user))
-        ).count()
-        
-        attempt_count = ContactAttempt.objects.filter(
-            Q(date__gte=month_start) & Q(date__lte=month_end) &
-            (Q(private=False) | Q(created_by=request.user))
-        ).count()
-        
-        monthly_data.append({
+        months.append((month_start, month_end))
+    return months
+
+
+def count_activity(activity, kind, start, end=None):
+    """Total of `kind` in activity_by_day() output between `start` and `end`"""
+    return sum(
+        total for (day, day_kind), total in activity.items()
+        if day_kind == kind and day >= start and (end is None or day <= end)
+    )
+
+
+def recent_conversations_section(user, today):
+    """Last 10 conversations within the past year"""
+    recent_conversations = Conversation.objects.visible_to(user).filter(
+        date__gte=today - timedelta(days=365)
+    ).prefetch_related('participants').select_related('created_by').order_by('-date')[:10]
+    return ConversationSerializer(recent_conversations, many=True).data
+
+
+def top_contacts_section(user, today):
+    """Top contacts by conversation count in past 1-2 years"""
+    top_contacts = Person.objects.select_related('created_by').annotate(
+        recent_conversation_count=Sum('contact_stats__conversations_2_years', filter=visible_stats(user)),
+        last_contacted=Max('contact_stats__last_contacted', filter=visible_stats(user)),
+    ).filter(recent_conversation_count__gt=0).order_by('-recent_conversation_count')[:10]
+    return PersonDetailedSerializer(top_contacts, many=True).data
+
+
+def people_to_reach_out_section(user, today):
+    """People with conversations in the past two years but none in six months"""
+    visible = visible_stats(user)
+    people_to_reach_out = Person.objects.select_related('created_by').annotate(
+        total_conversations=Sum('contact_stats__conversations_2_years', filter=visible),
+        recent_conversations=Sum('contact_stats__conversations_6_months', filter=visible),
+        last_contacted=Max('contact_stats__last_contacted', filter=visible),
+    ).filter(
+        total_conversations__gte=3,  # At least 3 total conversations
+        recent_conversations=0       # But none recently
+    ).order_by(F('last_contacted').asc(nulls_first=True))[:10]
+    return PersonSerializer(people_to_reach_out, many=True).data
+
+
+def activity_overview_section(activity, today):
+    """Conversation and ping counts for the past week, month and year"""
+    windows = {'week': 7, 'month': 30, 'year': 365}
+    return {
+        key: {window: count_activity(activity, kind, today - timedelta(days=days)) for window, days in windows.items()}
+        for key, kind in [('conversations', 'conversation'), ('contact_attempts', 'contact_attempt')]
+    }
+
+
+def monthly_activity_section(activity, today):
+    """Conversations and pings per month for the past 12 months, oldest first"""
+    return [
+        {
             'month_start': month_start,
             'month_end': month_end,
             'month_name': month_start.strftime('%B %Y'),
-            'conversations': conv_count,
-            'contact_attempts': attempt_count
+            'conversations': count_activity(activity, 'conversation', month_start, month_end),
+            'contact_attempts': count_activity(activity, 'contact_attempt', month_start, month_end)
+        }
+        for month_start, month_end in reversed(chart_months(today))
+    ]
+
+
+def upcoming_birthdays_section(user, today):
+    return get_upcoming_birthdays(days_ahead=30, today=today)
+
+
+# Payload keys in response order
+DASHBOARD_SECTIONS = [
+    'recent_conversations', 'top_contacts', 'activity_overview', 'people_to_reach_out', 'monthly_activity',
+    'upcoming_birthdays',
+]
+# Sections read from the stats table or the daily rollups, which are prepared once up front
+STATS_SECTIONS = {'top_contacts', 'people_to_reach_out'}
+ACTIVITY_SECTIONS = {'activity_overview', 'monthly_activity'}
+
+
+def dashboard_sections(value):
+    """Section names from a comma-separated ?sections= value, in response order; all when empty"""
+    if not value:
+        return list(DASHBOARD_SECTIONS)
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(DASHBOARD_SECTIONS)
+    if unknown:
+        raise ValidationError({
+            'sections': f"Unknown section(s): {', '.join(sorted(unknown))}. "
+                        f"Choose from: {', '.join(DASHBOARD_SECTIONS)}"
         })
-    
-    monthly_data.reverse()  # Show chronologically (oldest first)
-    
-    # Upcoming birthdays in the next 30 days
-    upcoming_birthdays = get_upcoming_birthdays(days_ahead=30)
-    
-    return Response({
-        'recent_conversations': ConversationSerializer(recent_conversations, many=True).data,
-        'top_contacts': PersonDetailedSerializer(top_contacts, many=True).data,
-        'activity_overview': {
-            'conversations': {
-                'week': conversations_week,
-                'month': conversations_month,
-                'year': conversations_year
-            },
-            'contact_attempts': {
-                'week': contact_attempts_week,
-                'month': contact_attempts_month,
-                'year': contact_attempts_year
-            }
-        },
-        'people_to_reach_out': PersonSerializer(people_to_reach_out, many=True).data,
-        'monthly_activity': monthly_data,
-        'upcoming_birthdays': upcoming_birthdays
+    return [name for name in DASHBOARD_SECTIONS if name in requested]
+
+
+def build_dashboard(user, sections=DASHBOARD_SECTIONS):
+    """Compute the requested dashboard sections for a user.
+
+    Returns the payload and how long each section took in milliseconds. The
+    sections are independent, so they run concurrently (see orbit.parallel).
+    """
+    today = timezone.localdate()
+    tasks = {}
+    if STATS_SECTIONS.intersection(sections):
+        # Trailing-window counts in the stats table go stale at midnight
+        refresh_stale_person_stats(today)
+    if ACTIVITY_SECTIONS.intersection(sections):
+        # Chart and activity counts all come from the daily rollups in one query
+        activity = activity_by_day(user, since=min(today - timedelta(days=365), chart_months(today)[-1][0]))
+        tasks['activity_overview'] = partial(activity_overview_section, activity, today)
+        tasks['monthly_activity'] = partial(monthly_activity_section, activity, today)
+    tasks.update({
+        'recent_conversations': partial(recent_conversations_section, user, today),
+        'top_contacts': partial(top_contacts_section, user, today),
+        'people_to_reach_out': partial(people_to_reach_out_section, user, today),
+        'upcoming_birthdays': partial(upcoming_birthdays_section, user, today),
     })
+    data, timings = run_concurrently({name: tasks[name] for name in sections})
+    return {name: data[name] for name in sections}, timings
+
+
+def server_timing(timings):
+    """A Server-Timing header value for {name: milliseconds}"""
+    return ', '.join(f'{name};dur={elapsed:.1f}' for name, elapsed in timings.items())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_analytics(request):
+    """Get dashboard analytics data, cached per user and set of sections until the next relevant write
+
+    ?sections=top_contacts,upcoming_birthdays computes and returns only those sections.
+    """
+    sections = dashboard_sections(request.query_params.get('sections'))
+    # The full dashboard keeps its own cache entry
+    cache_sections = None if sections == DASHBOARD_SECTIONS else sections
+    data, cache_key = get_cached_dashboard(request.user, cache_sections)
+    cache_status = 'hit'
+    timings = {}
+    if data is None:
+        cache_status = 'miss'
+        start = time.perf_counter()
+        data, timings = build_dashboard(request.user, sections)
+        timings['total'] = (time.perf_counter() - start) * 1000
+        cache_dashboard(cache_key, data)
+    etag = payload_etag(data)
+    response = not_modified(request, etag) or Response(data)
+    response['ETag'] = etag
+    response['X-Dashboard-Cache'] = cache_status
+    if timings:
+        response['Server-Timing'] = server_timing(timings)
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def dashboard_cache_status(request):
+    """Get dashboard cache hit/miss counters"""
+    return Response(dashboard_cache_stats())
+
+
+def suggestion_response(request, index, key):
+    """Values from `index` visible to the caller.
+
+    With ?q=, the values starting with q, most used first, up to `limit`.
+    Without it, every value alphabetically, revalidated with an ETag.
+    """
+    prefix = request.GET.get('q')
+    if prefix is None:
+        etag = make_etag(request, table_version(index.model, request.user))
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return Response({key: index.all_values(request.user)}, headers={'ETag': etag})
+    try:
+        limit = int(request.GET.get('limit', SUGGESTION_DEFAULT_LIMIT))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, SUGGESTION_MAX_LIMIT))
+    return Response({key: index.suggest(request.user, prefix, limit)})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def location_suggestions(request):
-    """Get unique location suggestions for auto-complete"""
-    locations = Person.objects.exclude(location='').values_list('location', flat=True).distinct()
-    return Response({'locations': sorted(set(locations))})
+    """Get location suggestions for auto-complete"""
+    return suggestion_response(request, person_locations, 'locations')
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def company_suggestions(request):
-    """Get unique company suggestions for auto-complete"""
-    companies = Person.objects.exclude(company='').values_list('company', flat=True).distinct()
-    return Response({'companies': sorted(set(companies))})
+    """Get company suggestions for auto-complete"""
+    return suggestion_response(request, person_companies, 'companies')
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def conversation_location_suggestions(request):
-    """Get unique conversation location suggestions for auto-complete"""
-    locations = Conversation.objects.exclude(location='').values_list('location', flat=True).distinct()
-    return Response({'locations': sorted(set(locations))})
+    """Get conversation location suggestions for auto-complete"""
+    return suggestion_response(request, conversation_locations, 'locations')
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def birthday_timeline(request):
     """Get birthday timeline starting from today"""
-    days_ahead = int(request.GET.get('days', 365))  # Default to 1 year
+    try:
+        days_ahead = int(request.GET.get('days', 365))  # Default to 1 year
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    etag = make_etag(request, table_version(Person, request.user))
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
     return Response({
         'birthdays': get_upcoming_birthdays(days_ahead=days_ahead)
+    }, headers={'ETag': etag})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def reach_out(request):
+    """People most overdue for contact relative to their usual cadence, most overdue first"""
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, REACH_OUT_MAX_LIMIT))
+    today = timezone.localdate()
+    return Response({
+        'results': [
+            {
+                'person': PersonThinSerializer(row.person).data,
+                'score': round(current_score(row, today), 3),
+                'cadence_days': row.cadence_days,
+                'last_contact': row.last_contact,
+                'days_since': (today - row.last_contact).days,
+                'contact_days': row.contact_days,
+            }
+            for row in reach_out_ranking(request.user, limit)
+        ]
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def full_text_search(request):
+    """Search people and conversations, best matches first"""
+    kind = request.GET.get('kind') or None
+    if kind not in (None, 'person', 'conversation'):
+        return Response({'error': 'kind must be person or conversation'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(request.GET.get('limit', 20))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    return Response({
+        'results': search(request.user, request.GET.get('q', ''), kind=kind, limit=limit)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, PassthroughRenderer])
+def export_data(request, kind, fmt):
+    """Stream every person, conversation or ping visible to the caller as CSV or NDJSON"""
+    if kind not in EXPORTS or fmt not in EXPORT_CONTENT_TYPES:
+        return Response({'error': 'Unknown export'}, status=status.HTTP_404_NOT_FOUND)
+    compress = request.GET.get('gzip') in ('1', 'true')
+    filename = f'orbit-{kind}.{fmt}'
+    response = StreamingHttpResponse(
+        stream_export(kind, fmt, request.user, compress=compress),
+        content_type='application/gzip' if compress else EXPORT_CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}{".gz" if compress else ""}"'
+    return response
+
+
 # Frontend view
 def index_view(request):
     """Serve the Vue.js frontend"""
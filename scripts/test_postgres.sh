@@ -0,0 +1,23 @@
+#!/usr/bin/env bash
+# Run the test suite against a throwaway PostgreSQL server.
+#
+# Starts a private postgres process on a temporary data directory, points
+# DATABASE_URL at it, runs `manage.py test` with any arguments given, and
+# stops the server again. Needs initdb and pg_ctl on PATH (or PG_BIN set to
+# their directory) and psycopg: pip install -r requirements-postgres.txt
+#
+# Usage: scripts/test_postgres.sh [test labels and options...]
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+PG_BIN=${PG_BIN:-$(dirname "$(command -v pg_ctl || echo pg_ctl)")}
+PORT=${PGPORT:-54329}
+DATA=$(mktemp -d)
+trap '"$PG_BIN/pg_ctl" -D "$DATA" -m immediate stop >/dev/null 2>&1 || true; rm -rf "$DATA"' EXIT
+
+"$PG_BIN/initdb" -D "$DATA" -U orbit -A trust >/dev/null
+"$PG_BIN/pg_ctl" -D "$DATA" -l "$DATA/server.log" -o "-p $PORT -k $DATA -h 127.0.0.1" -w start >/dev/null
+
+export DATABASE_URL="postgres://orbit@127.0.0.1:$PORT/orbit"
+export SECRET_KEY=${SECRET_KEY:-test}
+python manage.py test "$@"